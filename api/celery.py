@@ -39,6 +39,13 @@ app.conf.update(
     task_soft_time_limit=25 * 60,  # 25 minutes
     worker_prefetch_multiplier=1,
     worker_max_tasks_per_child=1000,
+    # Bounded, short-timeout broker connections (matches utils.redis_pool)
+    broker_pool_limit=int(os.getenv("REDIS_MAX_CONNECTIONS", "20")),
+    broker_connection_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.5")),
+    broker_connection_retry_on_startup=True,
+    redis_socket_connect_timeout=float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.5")),
+    redis_socket_timeout=float(os.getenv("REDIS_SOCKET_TIMEOUT", "1.0")),
+    redis_max_connections=int(os.getenv("REDIS_MAX_CONNECTIONS", "20")),
 )
 
 # Auto-discover tasks
@@ -51,12 +58,12 @@ logger.info(f"[Redis] Celery result backend set to {result_backend}")
 if broker_url == "memory://":
     logger.warning("[Redis] Running with in-memory broker - tasks will not persist across restarts")
 
-# Test Redis connection
-try:
-    if broker_url.startswith("redis://"):
-        from redis import Redis
-        redis_client = Redis.from_url(broker_url)
-        redis_client.ping()
-        logger.info("[Redis] Successfully connected to Redis")
-except Exception as e:
-    logger.warning(f"[Redis] Could not connect to Redis: {e}. Falling back to in-memory transport.")
+# Redis health is checked lazily through the shared pool manager (no blocking
+# PING at import time). The warm-up runs on a daemon thread.
+if broker_url.startswith("redis://") or broker_url.startswith("rediss://"):
+    try:
+        from utils.redis_pool import get_redis_manager
+    except ImportError:
+        from api.utils.redis_pool import get_redis_manager
+
+    get_redis_manager(broker_url).check_in_background()
@@ -6,21 +6,23 @@ Provides REST endpoints for managing curriculum, opportunities, and finances
 
 import sys
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Literal, Tuple
 import os
 import json
+import sqlite3
+import hashlib
 from datetime import datetime
+from contextlib import asynccontextmanager
 import subprocess
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Body, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-import yaml
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 import asyncio
 import time
 
@@ -34,6 +36,9 @@ load_dotenv()
 # Base directory for the project
 BASE_DIR = Path(__file__).parent.parent
 
+# YAML I/O (libyaml fast path with pure-Python fallback)
+from scripts import yaml_io
+
 # Import cv_builder functions
 try:
     from scripts.cv_builder import (
@@ -68,6 +73,20 @@ try:
 except ImportError:
     audit_logger = None
 
+# Import rate limiting (quota classes: chat, analysis, generation, bulk)
+from utils.rate_limit import rate_limit, get_rate_limit_status, RATE_LIMIT_HEADERS
+from utils.redis_pool import get_redis_manager, get_pool_metrics
+
+# Optimistic concurrency (ETag / If-Match) and JSON Patch
+from utils.etag import check_if_match, conditional_get, etag_from_digest, record_etag
+from utils.compression import CompressionMiddleware, precompressed_variant, remove_precompressed
+from utils.fast_json import FastJSONResponse, body_validation_error, json_body, json_response, raw_body
+from utils.json_patch import apply_patch, touched_roots, JsonPatchError, JsonPatchConflict
+
+# Import document store (cached YAML documents)
+from services.document_store import get_document_store
+document_store = get_document_store()
+
 # Import job service
 try:
     from services.cv_job_service import get_job_service, JobStatus
@@ -80,10 +99,28 @@ except ImportError:
 # FastAPI App Setup
 # ========================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup/shutdown hooks (never block startup on external services)"""
+    # Warm up the shared Redis pool in the background
+    get_redis_manager().check_in_background()
+    # Change events keep the document cache and directory listings fresh
+    await file_watcher.start()
+    yield
+    await file_watcher.stop()
+    # Persist opportunity edits still held by the write-behind buffer
+    opportunity_store.close()
+    # Save the conversation manifest if a debounced write is pending
+    conversation_index.flush()
+    await get_redis_manager().aclose()
+
+
 app = FastAPI(
     title="SerenityOps API",
     description="Personal intelligence system for career and financial management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse  # orjson rendering for every JSON response
 )
 
 # CORS configuration for React frontend
@@ -93,8 +130,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=RATE_LIMIT_HEADERS + ["ETag", "Last-Modified"],  # Quota state for back-off, validators for If-Match / If-None-Match
 )
 
+# gzip / brotli for JSON and HTML responses above COMPRESSION_MIN_SIZE
+app.add_middleware(CompressionMiddleware)
+
 # ========================
 # Helper Functions
 # ========================
@@ -362,9 +403,51 @@ OPPORTUNITIES_PATH = PROJECT_ROOT / "opportunities/structure.yaml"
 FINANCES_PATH = PROJECT_ROOT / "finances/structure.yaml"
 CV_OUTPUT_DIR = PROJECT_ROOT / "curriculum/versions"
 CONVERSATIONS_DIR = PROJECT_ROOT / "logs/conversations"
+# Compressed bundles of archived conversations (outside the watched directory)
+CONVERSATION_ARCHIVE_DIR = PROJECT_ROOT / "logs/conversations_archive"
 
 # Ensure directories exist
 CONVERSATIONS_DIR.mkdir(parents=True, exist_ok=True)
+CV_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# Directory listings and the file watcher feeding them (started in lifespan)
+from services.directory_index import DirectoryIndex
+from services.file_watcher import get_file_watcher
+cv_file_index = DirectoryIndex(CV_OUTPUT_DIR, ("cv_*.pdf", "cv_*.html", "cv_*.md"))
+# Session sidecars (*.json) and not-yet-migrated YAML conversations
+conversation_file_index = DirectoryIndex(CONVERSATIONS_DIR, ("*.json", "*.yaml"))
+file_watcher = get_file_watcher()
+for document_dir in {CURRICULUM_PATH.parent, OPPORTUNITIES_PATH.parent, FINANCES_PATH.parent}:
+    file_watcher.subscribe(
+        document_dir,
+        document_store.files_changed,
+        lambda watched, directory=document_dir: document_store.set_watched(directory, watched)
+    )
+for directory_index in (cv_file_index, conversation_file_index):
+    file_watcher.subscribe(directory_index.directory, directory_index.apply_changes, directory_index.set_watched)
+
+# Conversation metadata (name, counts, archived) for the chat listings, and
+# the append-only conversation logs that keep it updated
+from services.conversation_archive import ConversationArchive
+from services.conversation_index import ConversationIndex
+from services.conversation_search import SEARCH_DB_NAME, ConversationSearch, SearchError
+from services.conversation_store import ConversationStore, CursorError, read_listing_document
+conversation_index = ConversationIndex(conversation_file_index, read_listing_document)
+
+# Full-text index behind /api/chat/search (needs SQLite with FTS5)
+conversation_search = None
+try:
+    CONVERSATIONS_DIR.mkdir(parents=True, exist_ok=True)
+    conversation_search = ConversationSearch(CONVERSATIONS_DIR / SEARCH_DB_NAME)
+except sqlite3.Error as e:
+    print(f"Warning: conversation search disabled: {e}")
+
+conversation_archive = ConversationArchive(CONVERSATION_ARCHIVE_DIR)
+conversation_store = ConversationStore(CONVERSATIONS_DIR, conversation_index, conversation_search, conversation_archive)
+
+# Message history pages (?limit=/?before= on the conversation endpoints)
+DEFAULT_MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 500
 
 # Initialize Claude client
 claude_client = None
@@ -388,36 +471,73 @@ def root():
         "version": "1.0.0"
     }
 
+def patch_error(e: JsonPatchError) -> HTTPException:
+    """Map JSON Patch errors to HTTP: conflicts with the document -> 409, malformed -> 400"""
+    status_code = 409 if isinstance(e, JsonPatchConflict) else 400
+    return HTTPException(status_code=status_code, detail=f"JSON Patch failed: {str(e)}")
+
+
+# Validators for single curriculum sections (PATCH only re-validates what it touched)
+CURRICULUM_SECTION_ADAPTERS = {
+    name: TypeAdapter(field.annotation) for name, field in Curriculum.model_fields.items()
+}
+
+
+def validate_curriculum_sections(data: Any, sections) -> None:
+    """
+    Validate the given top-level curriculum sections ("" = whole document).
+
+    Raises:
+        HTTPException: 422 with the validation errors
+    """
+    try:
+        if "" in sections:
+            Curriculum.model_validate(data)
+            return
+        for section in sections:
+            adapter = CURRICULUM_SECTION_ADAPTERS.get(section)
+            if adapter is not None:
+                adapter.validate_python(data.get(section))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+
+
 @app.get("/api/curriculum")
-def get_curriculum() -> Dict[str, Any]:
+def get_curriculum(request: Request, response: Response) -> Dict[str, Any]:
     """
     Load current curriculum data from YAML.
 
     Returns:
-        Dictionary with all curriculum sections
+        Dictionary with all curriculum sections (ETag header for If-Match),
+        or 304 if If-None-Match / If-Modified-Since still match
     """
     try:
-        if not CURRICULUM_PATH.exists():
-            raise FileNotFoundError(f"Curriculum file not found: {CURRICULUM_PATH}")
-
-        with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        return data
+        entry = document_store.get_entry(CURRICULUM_PATH)
+        not_modified = conditional_get(request, response, etag_from_digest(entry.digest), entry.signature[0] / 1e9)
+        if not_modified:
+            return not_modified
+        return json_response(entry.data, response)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=f"Curriculum file not found: {CURRICULUM_PATH} (cwd: {Path.cwd()})")
-    except yaml.YAMLError as e:
+    except yaml_io.YAMLError as e:
         raise HTTPException(status_code=500, detail=f"YAML parsing error: {str(e)}")
 
 @app.put("/api/curriculum")
-def update_curriculum(curriculum: Curriculum):
+def update_curriculum(
+    response: Response,
+    curriculum: Curriculum = Depends(json_body(Curriculum)),
+    if_match: Optional[str] = Header(None)
+):
     """
     Save updated curriculum data to YAML.
 
     Args:
-        curriculum: Complete curriculum object with all sections
+        curriculum: Complete curriculum object with all sections (validated
+            from the raw request bytes)
+        if_match: Optional ETag from GET /api/curriculum (412 if the file changed since)
 
     Returns:
-        Success confirmation with timestamp
+        Success confirmation with timestamp (new ETag header)
     """
     try:
         # Convert Pydantic model to dict
@@ -427,18 +547,277 @@ def update_curriculum(curriculum: Curriculum):
         from datetime import datetime
         data['metadata']['last_updated'] = datetime.now().strftime("%Y-%m-%d")
 
-        # Write to YAML
-        with open(CURRICULUM_PATH, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Write to YAML (check + write under the document lock)
+        with document_store.lock(CURRICULUM_PATH):
+            if if_match is not None:
+                check_if_match(if_match, etag_from_digest(document_store.get_entry(CURRICULUM_PATH).digest))
+            entry = document_store.write(CURRICULUM_PATH, data, lock=False)
 
+        response.headers["ETag"] = etag_from_digest(entry.digest)
         return {
             "status": "saved",
             "path": str(CURRICULUM_PATH),
             "timestamp": data['metadata']['last_updated']
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save curriculum: {str(e)}")
 
+
+@app.patch("/api/curriculum")
+def patch_curriculum(
+    response: Response,
+    patch: List[Dict[str, Any]] = Body(..., media_type="application/json-patch+json"),
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Apply a JSON Patch (RFC 6902) to the curriculum.
+
+    Only the top-level sections the patch writes to are re-validated.
+
+    Request body:
+        [{"op": "replace", "path": "/summary", "value": "..."}, ...]
+
+    Headers:
+        If-Match: ETag from GET /api/curriculum (412 if the file changed since)
+
+    Returns:
+        Success confirmation with timestamp (new ETag header)
+    """
+    try:
+        with document_store.lock(CURRICULUM_PATH):
+            entry = document_store.get_entry(CURRICULUM_PATH)
+            check_if_match(if_match, etag_from_digest(entry.digest))
+
+            data = apply_patch(document_store.get_copy(CURRICULUM_PATH), patch)
+            validate_curriculum_sections(data, touched_roots(patch))
+
+            timestamp = datetime.now().strftime("%Y-%m-%d")
+            if isinstance(data.get('metadata'), dict):
+                data['metadata']['last_updated'] = timestamp
+
+            entry = document_store.write(CURRICULUM_PATH, data, lock=False)
+
+        response.headers["ETag"] = etag_from_digest(entry.digest)
+        return {
+            "status": "saved",
+            "path": str(CURRICULUM_PATH),
+            "timestamp": timestamp
+        }
+    except JsonPatchError as e:
+        raise patch_error(e)
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Curriculum file not found: {CURRICULUM_PATH}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to patch curriculum: {str(e)}")
+
+
+# Per-section ETags for the current curriculum file: (digest, {section: etag}),
+# replaced as a whole when the file changes
+_section_etags: Tuple[Optional[str], Dict[str, str]] = (None, {})
+
+
+def curriculum_section_name(section: str) -> str:
+    """Validate a section path parameter (404 for unknown sections)"""
+    if section not in CURRICULUM_SECTION_ADAPTERS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown curriculum section: {section} (expected one of: {', '.join(CURRICULUM_SECTION_ADAPTERS)})"
+        )
+    return section
+
+
+def curriculum_section_etag(entry, section: str) -> str:
+    """
+    Content ETag of one section (computed once per file version).
+
+    Depends only on the section's value, so edits to other sections don't
+    invalidate clients' cached copies of this one.
+    """
+    global _section_etags
+    digest, etags = _section_etags
+    if digest != entry.digest:
+        etags = {}
+        _section_etags = (entry.digest, etags)
+    if section not in etags:
+        etags[section] = record_etag(entry.data.get(section) if isinstance(entry.data, dict) else None)
+    return etags[section]
+
+
+def write_curriculum_section(section: str, if_match: Optional[str], update) -> Tuple[Any, str]:
+    """
+    Locked read-modify-write of one section.
+
+    Args:
+        section: Section name
+        if_match: Client's section ETag (None = unconditional)
+        update: Called with the current section value (a mutable copy);
+            returns the new, validated value
+
+    Returns:
+        (new value, new section ETag)
+    """
+    with document_store.lock(CURRICULUM_PATH):
+        entry = document_store.get_entry(CURRICULUM_PATH)
+        check_if_match(if_match, curriculum_section_etag(entry, section))
+
+        data = document_store.get_copy(CURRICULUM_PATH)
+        data[section] = update(data.get(section))
+        if isinstance(data.get('metadata'), dict):
+            data['metadata']['last_updated'] = datetime.now().strftime("%Y-%m-%d")
+
+        entry = document_store.write(CURRICULUM_PATH, data, lock=False)
+    return entry.data.get(section), curriculum_section_etag(entry, section)
+
+
+@app.get("/api/curriculum/{section}")
+def get_curriculum_section(section: str, request: Request, response: Response):
+    """
+    Load one curriculum section (personal, summary, experience, projects,
+    skills, education, certifications, languages, metadata).
+
+    Returns:
+        The section's value with a per-section ETag (304 if If-None-Match matches)
+    """
+    section = curriculum_section_name(section)
+    try:
+        entry = document_store.get_entry(CURRICULUM_PATH)
+        not_modified = conditional_get(request, response, curriculum_section_etag(entry, section))
+        if not_modified:
+            return not_modified
+        return json_response(entry.data.get(section), response)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Curriculum file not found: {CURRICULUM_PATH}")
+    except yaml_io.YAMLError as e:
+        raise HTTPException(status_code=500, detail=f"YAML parsing error: {str(e)}")
+
+
+@app.put("/api/curriculum/{section}")
+def update_curriculum_section(
+    section: str,
+    response: Response,
+    raw: bytes = Depends(raw_body),
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Replace one curriculum section.
+
+    Only this section is validated (from the raw request bytes); the rest of
+    the document is taken from the cache and the file is written atomically.
+
+    Request body:
+        The section's new value (e.g., the experience list)
+
+    Headers:
+        If-Match: ETag from GET /api/curriculum/{section} (412 if that section changed)
+
+    Returns:
+        Success confirmation (new section ETag header)
+    """
+    section = curriculum_section_name(section)
+    adapter = CURRICULUM_SECTION_ADAPTERS[section]
+    try:
+        value = adapter.dump_python(adapter.validate_json(raw))
+    except ValidationError as e:
+        raise body_validation_error(e, raw)
+
+    try:
+        _, etag = write_curriculum_section(section, if_match, lambda current: value)
+        response.headers["ETag"] = etag
+        return {
+            "status": "saved",
+            "section": section,
+            "timestamp": datetime.now().strftime("%Y-%m-%d")
+        }
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Curriculum file not found: {CURRICULUM_PATH}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save curriculum section: {str(e)}")
+
+
+@app.patch("/api/curriculum/{section}")
+def patch_curriculum_section(
+    section: str,
+    response: Response,
+    patch: List[Dict[str, Any]] = Body(..., media_type="application/json-patch+json"),
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Apply a JSON Patch (RFC 6902) to one curriculum section.
+
+    Paths are relative to the section, e.g. for /api/curriculum/experience:
+        [{"op": "replace", "path": "/0/achievements/2", "value": "..."}]
+
+    Headers:
+        If-Match: ETag from GET /api/curriculum/{section} (412 if that section changed)
+
+    Returns:
+        The patched section (new section ETag header)
+    """
+    section = curriculum_section_name(section)
+    adapter = CURRICULUM_SECTION_ADAPTERS[section]
+
+    def update(current):
+        patched = apply_patch(current, patch)
+        try:
+            return adapter.dump_python(adapter.validate_python(patched))
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+
+    try:
+        value, etag = write_curriculum_section(section, if_match, update)
+        response.headers["ETag"] = etag
+        return json_response(value, response)
+    except JsonPatchError as e:
+        raise patch_error(e)
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Curriculum file not found: {CURRICULUM_PATH}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to patch curriculum section: {str(e)}")
+
+@app.get("/api/rate-limit/status")
+def get_rate_limit_state():
+    """
+    Get per-class rate limit usage for the current user.
+
+    Returns:
+        Quota state for chat, analysis, generation and bulk classes
+    """
+    return get_rate_limit_status("default")
+
+@app.get("/api/watcher/status")
+def get_watcher_status():
+    """
+    Get file watcher state and the caches it keeps fresh.
+
+    Returns:
+        Watcher backend and event counts, document cache and directory index stats
+    """
+    return {
+        "watcher": file_watcher.stats(),
+        "documents": document_store.stats(),
+        "indexes": [cv_file_index.stats(), conversation_file_index.stats(), conversation_index.stats()],
+        "conversations": conversation_store.stats(),
+        "search": conversation_search.stats() if conversation_search is not None else None,
+    }
+
+@app.get("/api/redis/metrics")
+def get_redis_metrics():
+    """
+    Get shared Redis connection pool state and utilization.
+
+    Returns:
+        Pool metrics keyed by Redis URL
+    """
+    return get_pool_metrics()
+
 @app.get("/api/notifications/summary")
 def get_notification_summary() -> Dict[str, int]:
     """
@@ -460,36 +839,27 @@ def get_notification_summary() -> Dict[str, int]:
             "projects": 0
         }
 
-        # Count recent conversations (last 7 days)
-        conversations_dir = BASE_DIR / "logs" / "conversations"
-        if conversations_dir.exists():
-            cutoff_date = datetime.now() - timedelta(days=7)
-            for conv_file in conversations_dir.glob("conv_*.yaml"):
-                try:
-                    file_date_str = conv_file.stem.split('_')[1]  # Extract date from filename
-                    file_date = datetime.strptime(file_date_str, "%Y%m%d")
-                    if file_date >= cutoff_date:
-                        counts["chat"] += 1
-                except (IndexError, ValueError):
-                    pass
+        # Count recent conversations (last 7 days) - listings come from the watched indexes
+        cutoff_date = datetime.now() - timedelta(days=7)
+        for conversation in conversation_index.list():
+            if not conversation.stem.startswith("conv_"):
+                continue
+            try:
+                file_date_str = conversation.stem.split('_')[1]  # Extract date from filename
+                file_date = datetime.strptime(file_date_str, "%Y%m%d")
+                if file_date >= cutoff_date:
+                    counts["chat"] += 1
+            except (IndexError, ValueError):
+                pass
 
         # Count all available CVs (pdf, html, md)
-        cv_versions_dir = BASE_DIR / "curriculum" / "versions"
-        if cv_versions_dir.exists():
-            for cv_file in cv_versions_dir.glob("cv_*"):
-                if cv_file.is_file():
-                    counts["cvs"] += 1
-
-        # Count active opportunities (not closed)
-        opportunities_file = BASE_DIR / "opportunities" / "structure.yaml"
-        if opportunities_file.exists():
-            with open(opportunities_file, 'r', encoding='utf-8') as f:
-                opps_data = yaml.safe_load(f)
-                if opps_data and 'pipeline' in opps_data:
-                    for opp in opps_data['pipeline']:
-                        status = opp.get('stage') or opp.get('status', '')
-                        if status.lower() not in ['closed', 'rejected', 'declined']:
-                            counts["opportunities"] += 1
+        counts["cvs"] = len(cv_file_index.files())
+
+        # Count active opportunities (not closed) from the maintained aggregates
+        try:
+            counts["opportunities"] = opportunity_store.aggregates().active
+        except FileNotFoundError:
+            pass
 
         # Count projects needing attention (optional - placeholder)
         # This could be based on projects without recent commits, missing tests, etc.
@@ -506,7 +876,7 @@ def get_notification_summary() -> Dict[str, int]:
             "projects": 0
         }
 
-@app.post("/api/cv/generate")
+@app.post("/api/cv/generate", dependencies=[Depends(rate_limit("generation"))])
 def generate_cv_endpoint(request: CVGenerateRequest, background_tasks: BackgroundTasks):
     """
     Start CV generation job with progress tracking
@@ -602,8 +972,20 @@ def get_cv_job_status(job_id: str):
 
     return job
 
+_templates_etag: Optional[str] = None
+TEMPLATES_LOADED_AT = time.time()
+
+
+def templates_etag() -> str:
+    """ETag of the template list (computed once)"""
+    global _templates_etag
+    if _templates_etag is None:
+        _templates_etag = record_etag(template_engine.list_templates())
+    return _templates_etag
+
+
 @app.get("/api/cv/templates")
-def list_cv_templates():
+def list_cv_templates(request: Request, response: Response):
     """
     List all available CV templates with metadata.
 
@@ -624,6 +1006,8 @@ def list_cv_templates():
 
     Raises:
         503: If template engine is unavailable
+
+    Returns 304 when If-None-Match / If-Modified-Since still match.
     """
     if not template_engine:
         raise HTTPException(
@@ -632,6 +1016,11 @@ def list_cv_templates():
         )
 
     try:
+        # Templates are loaded once at startup, so the list never changes
+        not_modified = conditional_get(request, response, templates_etag(), TEMPLATES_LOADED_AT)
+        if not_modified:
+            return not_modified
+
         templates = template_engine.list_templates()
         return {
             "templates": templates,
@@ -694,10 +1083,13 @@ def get_cv_template_details(template_id: str):
         )
 
 @app.get("/api/cv/file/{filename}")
-def serve_cv_file(filename: str):
+def serve_cv_file(filename: str, request: Request):
     """
     Serve CV file for preview in browser.
 
+    Generated CVs never change, so HTML/Markdown files are compressed once
+    into .gz / .br siblings and those are served to clients that accept them.
+
     Args:
         filename: Name of the generated CV file
 
@@ -719,6 +1111,15 @@ def serve_cv_file(filename: str):
     else:
         media_type = "application/octet-stream"
 
+    variant = precompressed_variant(file_path, request.headers.get("accept-encoding"))
+    if variant:
+        compressed_path, encoding = variant
+        return FileResponse(
+            path=compressed_path,
+            media_type=media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+        )
+
     return FileResponse(
         path=file_path,
         media_type=media_type
@@ -775,30 +1176,29 @@ def delete_cv(filename: str):
 
     try:
         file_path.unlink()
+        remove_precompressed(file_path)
         return {"status": "deleted", "filename": filename}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete file: {str(e)}")
 
 @app.get("/api/cv/list")
-def list_generated_cvs():
+def list_generated_cvs(request: Request, response: Response):
     """
     List all generated CV files from versions folder.
 
     Returns:
-        List of all CV files (PDF, HTML, MD) with metadata
+        List of all CV files (PDF, HTML, MD) with metadata, or 304 if the
+        folder hasn't changed since the client's copy
     """
     try:
-        if not CV_OUTPUT_DIR.exists():
-            CV_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-            return {"count": 0, "files": []}
+        # All CV files (pdf, html, md), most recent first - the index is kept
+        # current by the file watcher, so no glob/stat per request
+        cv_files = cv_file_index.files()
 
-        # Get all CV files (pdf, html, md)
-        all_files = []
-        for pattern in ["cv_*.pdf", "cv_*.html", "cv_*.md"]:
-            all_files.extend(CV_OUTPUT_DIR.glob(pattern))
-
-        # Sort by modification time (most recent first)
-        cv_files = sorted(all_files, key=lambda p: p.stat().st_mtime, reverse=True)
+        # The listing digest changes with any file added, removed or rewritten
+        not_modified = conditional_get(request, response, etag_from_digest(cv_file_index.digest()))
+        if not_modified:
+            return not_modified
 
         from datetime import datetime
 
@@ -809,8 +1209,8 @@ def list_generated_cvs():
 
             files_data.append({
                 "filename": f.name,
-                "size_kb": round(f.stat().st_size / 1024, 1),
-                "created_at": datetime.fromtimestamp(f.stat().st_mtime).isoformat(),
+                "size_kb": round(f.size / 1024, 1),
+                "created_at": datetime.fromtimestamp(f.mtime).isoformat(),
                 "format": format_type,
                 "download_url": f"/api/cv/download/{f.name}",
                 "preview_url": f"/api/cv/file/{f.name}"
@@ -824,20 +1224,22 @@ def list_generated_cvs():
         raise HTTPException(status_code=500, detail=f"Failed to list CVs: {str(e)}")
 
 @app.get("/api/finances")
-def get_finances():
+def get_finances(request: Request, response: Response):
     """
     Load finances data from YAML.
 
     Returns:
-        Dictionary with financial structure
+        Dictionary with financial structure, or 304 if the client's copy is current
     """
     try:
         if not FINANCES_PATH.exists():
             return {"finances": {}}
 
-        with open(FINANCES_PATH, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        return data
+        entry = document_store.get_entry(FINANCES_PATH)
+        not_modified = conditional_get(request, response, etag_from_digest(entry.digest), entry.signature[0] / 1e9)
+        if not_modified:
+            return not_modified
+        return json_response(entry.data, response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load finances: {str(e)}")
 
@@ -845,7 +1247,7 @@ def get_finances():
 # AI-Powered Endpoints
 # ========================
 
-@app.post("/api/ingest/parse")
+@app.post("/api/ingest/parse", dependencies=[Depends(rate_limit("analysis"))])
 async def parse_unstructured_text(request: ParseTextRequest):
     """
     Parse unstructured text using Claude API to extract CV information.
@@ -941,49 +1343,43 @@ async def merge_parsed_data(request: MergeFieldsRequest):
         Updated curriculum with merged data
     """
     try:
-        # Load existing curriculum
-        with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-            curriculum = yaml.safe_load(f)
-
-        parsed = request.parsed_data
-
-        # Merge projects (avoid duplicates by name)
-        if "projects" in parsed:
-            existing_project_names = {p.get("name", "").lower() for p in curriculum.get("projects", [])}
-            for project in parsed["projects"]:
-                if project.get("name", "").lower() not in existing_project_names:
-                    curriculum.setdefault("projects", []).append(project)
-
-        # Merge experience
-        if "experience" in parsed:
-            curriculum.setdefault("experience", []).extend(parsed["experience"])
-
-        # Merge skills
-        if "skills" in parsed:
-            curr_skills = curriculum.setdefault("skills", {})
-            parsed_skills = parsed["skills"]
-
-            # Merge language lists
-            if "languages" in parsed_skills:
-                existing_langs = {lang.get("name", "").lower() for lang in curr_skills.get("languages", [])}
-                for lang in parsed_skills["languages"]:
-                    if lang.get("name", "").lower() not in existing_langs:
-                        curr_skills.setdefault("languages", []).append(lang)
-
-            # Merge other skill arrays
-            for key in ["cloud_devops", "tools", "domain_expertise"]:
-                if key in parsed_skills:
-                    existing_items = set(curr_skills.get(key, []))
-                    for item in parsed_skills[key]:
-                        if item not in existing_items:
-                            curr_skills.setdefault(key, []).append(item)
-
-        # Update metadata
-        curriculum["metadata"]["last_updated"] = datetime.now().strftime("%Y-%m-%d")
-
-        # Save updated curriculum
-        with open(CURRICULUM_PATH, 'w', encoding='utf-8') as f:
-            yaml.dump(curriculum, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Locked read-modify-write; saved atomically when the block exits
+        async with document_store.atransaction(CURRICULUM_PATH) as curriculum:
+            parsed = request.parsed_data
+
+            # Merge projects (avoid duplicates by name)
+            if "projects" in parsed:
+                existing_project_names = {p.get("name", "").lower() for p in curriculum.get("projects", [])}
+                for project in parsed["projects"]:
+                    if project.get("name", "").lower() not in existing_project_names:
+                        curriculum.setdefault("projects", []).append(project)
+
+            # Merge experience
+            if "experience" in parsed:
+                curriculum.setdefault("experience", []).extend(parsed["experience"])
+
+            # Merge skills
+            if "skills" in parsed:
+                curr_skills = curriculum.setdefault("skills", {})
+                parsed_skills = parsed["skills"]
+
+                # Merge language lists
+                if "languages" in parsed_skills:
+                    existing_langs = {lang.get("name", "").lower() for lang in curr_skills.get("languages", [])}
+                    for lang in parsed_skills["languages"]:
+                        if lang.get("name", "").lower() not in existing_langs:
+                            curr_skills.setdefault("languages", []).append(lang)
+
+                # Merge other skill arrays
+                for key in ["cloud_devops", "tools", "domain_expertise"]:
+                    if key in parsed_skills:
+                        existing_items = set(curr_skills.get(key, []))
+                        for item in parsed_skills[key]:
+                            if item not in existing_items:
+                                curr_skills.setdefault(key, []).append(item)
+
+            # Update metadata
+            curriculum["metadata"]["last_updated"] = datetime.now().strftime("%Y-%m-%d")
 
         return {
             "status": "merged",
@@ -998,8 +1394,8 @@ async def merge_parsed_data(request: MergeFieldsRequest):
             detail=f"Merge failed: {str(e)}\n{traceback.format_exc()}"
         )
 
-@app.post("/api/chat/message")
-async def chat_message(request: ChatMessageRequest):
+@app.post("/api/chat/message", dependencies=[Depends(rate_limit("chat"))])
+def chat_message(request: ChatMessageRequest):
     """
     Conversational interface with context awareness.
 
@@ -1013,32 +1409,26 @@ async def chat_message(request: ChatMessageRequest):
 
     try:
         # Load context
-        with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-            curriculum = yaml.safe_load(f)
-
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities = yaml.safe_load(f) or {}
+        curriculum = document_store.get(CURRICULUM_PATH)
+        opportunities = document_store.get(OPPORTUNITIES_PATH) or {}
 
         # Load or create conversation
         conversation_id = request.conversation_id or f"conv_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        conv_file = CONVERSATIONS_DIR / f"{conversation_id}.yaml"
+        new_session = {
+            "id": conversation_id,
+            "date": datetime.now().isoformat(),
+            "type": "career_chat"
+        }
 
-        if conv_file.exists():
-            with open(conv_file, 'r', encoding='utf-8') as f:
-                conversation = yaml.safe_load(f) or {"session": {}, "messages": []}
-        else:
-            conversation = {
-                "session": {
-                    "id": conversation_id,
-                    "date": datetime.now().isoformat(),
-                    "type": "career_chat"
-                },
-                "messages": []
-            }
+        # Last 10 messages, read from the end of the log (not the whole conversation)
+        try:
+            recent_messages = conversation_store.tail(conversation_id, 10)
+        except FileNotFoundError:
+            recent_messages = []
 
         # Format conversation history
         conv_history = ""
-        for msg in conversation["messages"][-10:]:  # Last 10 messages
+        for msg in recent_messages:
             conv_history += f"{msg['role'].upper()}: {msg['content']}\n"
 
         # Build context-aware prompt
@@ -1085,22 +1475,19 @@ ACTION: {{"type": "cv_update_suggested", "field": "projects", "data": {{...}}}}"
 
         assistant_message = response.content[0].text
 
-        # Store conversation
-        conversation["messages"].append({
-            "role": "user",
-            "timestamp": datetime.now().isoformat(),
-            "content": request.message
-        })
-
-        conversation["messages"].append({
-            "role": "assistant",
-            "timestamp": datetime.now().isoformat(),
-            "content": assistant_message
-        })
-
-        # Save conversation
-        with open(conv_file, 'w', encoding='utf-8') as f:
-            yaml.dump(conversation, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Store conversation: two appended log lines (created on the first turn)
+        conversation_store.append(conversation_id, [
+            {
+                "role": "user",
+                "timestamp": datetime.now().isoformat(),
+                "content": request.message
+            },
+            {
+                "role": "assistant",
+                "timestamp": datetime.now().isoformat(),
+                "content": assistant_message
+            }
+        ], session=new_session)
 
         # Check if assistant suggests CV update
         action_suggested = None
@@ -1125,21 +1512,33 @@ ACTION: {{"type": "cv_update_suggested", "field": "projects", "data": {{...}}}}"
         )
 
 @app.get("/api/chat/conversations")
-async def list_conversations():
+def list_conversations():
     """
     List all saved conversations
     """
     try:
+        # Metadata comes from the maintained index (no per-file parse)
         conversations = []
-        for conv_file in sorted(CONVERSATIONS_DIR.glob("*.yaml"), key=lambda p: p.stat().st_mtime, reverse=True):
-            with open(conv_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                conversations.append({
-                    "id": data["session"]["id"],
-                    "date": data["session"]["date"],
-                    "message_count": len(data.get("messages", [])),
-                    "last_updated": datetime.fromtimestamp(conv_file.stat().st_mtime).isoformat()
-                })
+        hot = set()
+        for meta in conversation_index.list():
+            hot.add(meta.stem)
+            conversations.append({
+                "id": meta.id or meta.stem,
+                "date": meta.date,
+                "message_count": meta.message_count,
+                "last_updated": datetime.fromtimestamp(meta.mtime).isoformat()
+            })
+
+        # Then archived ones, from the archive's index
+        for conversation_id, entry in conversation_archive.list():
+            if conversation_id in hot:
+                continue
+            conversations.append({
+                "id": entry["session"].get("id") or conversation_id,
+                "date": entry["session"].get("date"),
+                "message_count": entry["message_count"],
+                "last_updated": entry["archived_at"]
+            })
 
         return {
             "count": len(conversations),
@@ -1149,81 +1548,156 @@ async def list_conversations():
         raise HTTPException(status_code=500, detail=f"Failed to list conversations: {str(e)}")
 
 @app.get("/api/chat/conversation/{conversation_id}")
-async def get_conversation(conversation_id: str):
+def get_conversation(
+    conversation_id: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_MESSAGE_PAGE_SIZE),
+    before: Optional[str] = None,
+):
     """
-    Get full conversation history
+    Get conversation history
+
+    Without parameters returns the full conversation. With limit and/or
+    before returns one page of messages, newest first:
+    {"session", "messages", "message_count", "next_cursor"} - pass
+    next_cursor as ?before= to load older messages (null at the start).
     """
     try:
-        conv_file = CONVERSATIONS_DIR / f"{conversation_id}.yaml"
-        if not conv_file.exists():
+        if not conversation_store.exists(conversation_id):
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        with open(conv_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        if limit is None and before is None:
+            data = conversation_store.load(conversation_id)
+        else:
+            data = conversation_store.page(conversation_id, limit or DEFAULT_MESSAGE_PAGE_SIZE, before)
 
-        return data
+        return json_response(data)
     except HTTPException:
         raise
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load conversation: {str(e)}")
 
 @app.get("/api/chat/last")
-async def get_last_conversation():
+def get_last_conversation(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_MESSAGE_PAGE_SIZE),
+    before: Optional[str] = None,
+):
     """
     Get the most recent conversation for auto-loading
 
     Returns:
-        The latest conversation with full message history
+        The latest conversation with full message history, or its latest
+        page of messages when limit/before is given (see get_conversation)
     """
     try:
         if not CONVERSATIONS_DIR.exists():
             CONVERSATIONS_DIR.mkdir(parents=True, exist_ok=True)
             return {"conversation": None}
 
-        conv_files = sorted(CONVERSATIONS_DIR.glob("*.yaml"), key=lambda p: p.stat().st_mtime, reverse=True)
+        latest = conversation_index.latest()
+        latest_id = latest.stem if latest is not None else None
 
-        if not conv_files:
+        # Archiving counts as the archived chat's last update
+        archived = conversation_archive.latest()
+        if archived is not None and (
+            latest is None
+            or datetime.fromisoformat(archived[1]["archived_at"]) > datetime.fromtimestamp(latest.mtime)
+        ):
+            latest_id = archived[0]
+
+        if latest_id is None:
             return {"conversation": None}
 
-        # Load the most recent conversation
-        with open(conv_files[0], 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        if limit is None and before is None:
+            data = conversation_store.load(latest_id)
+        else:
+            data = conversation_store.page(latest_id, limit or DEFAULT_MESSAGE_PAGE_SIZE, before)
 
-        return {"conversation": data}
+        return json_response({"conversation": data})
+    except CursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to load last conversation: {str(e)}")
 
 @app.get("/api/chat/list")
-async def list_chats_with_metadata():
+def list_chats_with_metadata():
     """
     Enhanced conversation list with full metadata for Chat Manager
     Returns conversations with name, message_count, timestamps, archived status
     """
     try:
+        # Metadata comes from the maintained index, most recently updated first
         chats = []
-        for conv_file in CONVERSATIONS_DIR.glob("*.yaml"):
-            with open(conv_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-
-                session = data.get("session", {})
-                chats.append({
-                    "id": session.get("id", conv_file.stem),
-                    "name": session.get("name", f"Conversation {conv_file.stem}"),
-                    "message_count": len(data.get("messages", [])),
-                    "created_at": session.get("date", datetime.fromtimestamp(conv_file.stat().st_ctime).isoformat()),
-                    "last_updated": datetime.fromtimestamp(conv_file.stat().st_mtime).isoformat(),
-                    "archived": session.get("archived", False)
-                })
-
-        # Sort by last_updated descending
-        chats.sort(key=lambda x: x["last_updated"], reverse=True)
+        hot = set()
+        for meta in conversation_index.list():
+            hot.add(meta.stem)
+            chats.append({
+                "id": meta.id or meta.stem,
+                "name": meta.name or f"Conversation {meta.stem}",
+                "message_count": meta.message_count,
+                "created_at": meta.date or datetime.fromtimestamp(meta.ctime).isoformat(),
+                "last_updated": datetime.fromtimestamp(meta.mtime).isoformat(),
+                "archived": meta.archived
+            })
+
+        # Then archived chats, from the archive's index (bundles aren't read)
+        for conversation_id, entry in conversation_archive.list():
+            if conversation_id in hot:
+                continue  # restored; the archived copy is about to be dropped
+            session = entry["session"]
+            chats.append({
+                "id": session.get("id") or conversation_id,
+                "name": session.get("name") or f"Conversation {conversation_id}",
+                "message_count": entry["message_count"],
+                "created_at": session.get("date") or entry["archived_at"],
+                "last_updated": entry["archived_at"],
+                "archived": True
+            })
 
         return {"chats": chats}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list chats: {str(e)}")
 
+@app.get("/api/chat/search")
+def search_chats(
+    q: str = Query(..., min_length=1, max_length=500),
+    limit: int = Query(20, ge=1, le=100),
+    include_archived: bool = True,
+):
+    """
+    Full-text search over the messages of all conversations
+
+    Every word must appear in the message (the last one as a prefix).
+    With include_archived, archived conversations whose name matches
+    follow the message hits (their messages aren't indexed).
+
+    Returns:
+        Hits ranked by relevance: conversation id and name, message_id
+        (position in the conversation, usable with the history endpoints),
+        role, timestamp and a snippet with the matches in **bold**
+    """
+    if conversation_search is None:
+        raise HTTPException(status_code=503, detail="Conversation search is not available")
+    try:
+        # Catch up with changes made outside this process (no-op when the
+        # conversation directory is unchanged since the last sync)
+        conversation_search.sync(
+            conversation_index.list,
+            conversation_store.load_own,
+            tag=conversation_file_index.digest()
+        )
+        hits = conversation_search.search(q, limit=limit, include_archived=include_archived)
+        if include_archived and len(hits) < limit:
+            hits += conversation_archive.search(q, limit=limit - len(hits))
+        return {"query": q, "count": len(hits), "results": hits}
+    except SearchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to search chats: {str(e)}")
+
 @app.post("/api/chat/create")
-async def create_chat(request: ChatCreateRequest):
+def create_chat(request: ChatCreateRequest):
     """
     Create a new conversation with optional custom name
     """
@@ -1231,8 +1705,9 @@ async def create_chat(request: ChatCreateRequest):
         # Generate conversation ID
         conversation_id = f"conv_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
 
-        # Count existing conversations for auto-naming
-        existing_count = len(list(CONVERSATIONS_DIR.glob("*.yaml")))
+        # Count existing conversations for auto-naming (archived ones too,
+        # so default names don't repeat)
+        existing_count = len(conversation_index) + len(conversation_archive)
         default_name = request.name or f"Chat {existing_count + 1}"
 
         # Create conversation structure
@@ -1247,10 +1722,8 @@ async def create_chat(request: ChatCreateRequest):
             "messages": []
         }
 
-        # Save to file
-        conv_file = CONVERSATIONS_DIR / f"{conversation_id}.yaml"
-        with open(conv_file, 'w', encoding='utf-8') as f:
-            yaml.dump(conversation, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Save to files (empty log + session sidecar)
+        conversation_store.create(conversation_id, conversation["session"])
 
         return {
             "id": conversation_id,
@@ -1265,25 +1738,16 @@ async def create_chat(request: ChatCreateRequest):
         raise HTTPException(status_code=500, detail=f"Failed to create chat: {str(e)}\n{traceback.format_exc()}")
 
 @app.patch("/api/chat/{conversation_id}/rename")
-async def rename_chat(conversation_id: str, request: ChatRenameRequest):
+def rename_chat(conversation_id: str, request: ChatRenameRequest):
     """
     Rename an existing conversation
     """
     try:
-        conv_file = CONVERSATIONS_DIR / f"{conversation_id}.yaml"
-        if not conv_file.exists():
+        if not conversation_store.exists(conversation_id):
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        # Load conversation
-        with open(conv_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-
-        # Update name
-        data["session"]["name"] = request.name
-
-        # Save back
-        with open(conv_file, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Update name (session sidecar only - the message log isn't touched)
+        conversation_store.update_session(conversation_id, name=request.name)
 
         return {
             "id": conversation_id,
@@ -1296,16 +1760,15 @@ async def rename_chat(conversation_id: str, request: ChatRenameRequest):
         raise HTTPException(status_code=500, detail=f"Failed to rename chat: {str(e)}")
 
 @app.delete("/api/chat/{conversation_id}")
-async def delete_chat(conversation_id: str):
+def delete_chat(conversation_id: str):
     """
     Delete a conversation permanently
     """
     try:
-        conv_file = CONVERSATIONS_DIR / f"{conversation_id}.yaml"
-        if not conv_file.exists():
+        if not conversation_store.exists(conversation_id):
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        conv_file.unlink()
+        conversation_store.delete(conversation_id)
 
         return {"success": True, "deleted_id": conversation_id}
     except HTTPException:
@@ -1314,45 +1777,37 @@ async def delete_chat(conversation_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to delete chat: {str(e)}")
 
 @app.post("/api/chat/{conversation_id}/duplicate")
-async def duplicate_chat(conversation_id: str):
+def duplicate_chat(conversation_id: str):
     """
     Duplicate an existing conversation
+
+    The copy references the original's messages (copy-on-write) and only
+    stores the messages added to it afterwards.
     """
     try:
-        conv_file = CONVERSATIONS_DIR / f"{conversation_id}.yaml"
-        if not conv_file.exists():
+        if not conversation_store.exists(conversation_id):
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        # Load original conversation
-        with open(conv_file, 'r', encoding='utf-8') as f:
-            original = yaml.safe_load(f)
+        original_name = conversation_store.session(conversation_id).get("name", "Conversation")
 
-        # Create new conversation with copied messages
         new_id = f"conv_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-        original_name = original["session"].get("name", "Conversation")
-
-        duplicated = {
-            "session": {
-                "id": new_id,
-                "name": f"{original_name} (Copy)",
-                "date": datetime.now().isoformat(),
-                "type": "career_chat",
-                "archived": False
-            },
-            "messages": original.get("messages", []).copy()
+        session = {
+            "id": new_id,
+            "name": f"{original_name} (Copy)",
+            "date": datetime.now().isoformat(),
+            "type": "career_chat",
+            "archived": False
         }
 
-        # Save duplicated conversation
-        new_conv_file = CONVERSATIONS_DIR / f"{new_id}.yaml"
-        with open(new_conv_file, 'w', encoding='utf-8') as f:
-            yaml.dump(duplicated, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        # Fork: no messages are copied
+        sidecar = conversation_store.duplicate(conversation_id, new_id, session)
 
         return {
             "id": new_id,
-            "name": duplicated["session"]["name"],
-            "message_count": len(duplicated["messages"]),
-            "created_at": duplicated["session"]["date"],
-            "last_updated": duplicated["session"]["date"],
+            "name": session["name"],
+            "message_count": sidecar["message_count"],
+            "created_at": session["date"],
+            "last_updated": session["date"],
             "archived": False
         }
     except HTTPException:
@@ -1362,25 +1817,24 @@ async def duplicate_chat(conversation_id: str):
         raise HTTPException(status_code=500, detail=f"Failed to duplicate chat: {str(e)}\n{traceback.format_exc()}")
 
 @app.patch("/api/chat/{conversation_id}/archive")
-async def archive_chat(conversation_id: str, request: ChatArchiveRequest):
+def archive_chat(conversation_id: str, request: ChatArchiveRequest):
     """
     Archive or unarchive a conversation
+
+    Archiving moves the conversation into compressed cold storage (it can
+    still be viewed); unarchiving restores it.
     """
     try:
-        conv_file = CONVERSATIONS_DIR / f"{conversation_id}.yaml"
-        if not conv_file.exists():
+        if not conversation_store.exists(conversation_id):
             raise HTTPException(status_code=404, detail="Conversation not found")
 
-        # Load conversation
-        with open(conv_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-
-        # Update archived status
-        data["session"]["archived"] = request.archived
-
-        # Save back
-        with open(conv_file, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        if request.archived:
+            conversation_store.archive(conversation_id)
+        elif conversation_store.is_archived(conversation_id):
+            conversation_store.restore(conversation_id)
+        else:
+            # Flagged archived before cold storage existed
+            conversation_store.update_session(conversation_id, archived=False)
 
         return {
             "id": conversation_id,
@@ -1486,19 +1940,10 @@ async def execute_action(action: ActionRequest):
             # Track new opportunity
             opportunity_data = payload.get("opportunity", {})
 
-            # Load opportunities
-            if OPPORTUNITIES_PATH.exists():
-                with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-                    opportunities = yaml.safe_load(f) or {"opportunities": []}
-            else:
-                opportunities = {"opportunities": []}
-
-            # Add new opportunity
-            opportunities["opportunities"].append(opportunity_data)
-
-            # Save
-            with open(OPPORTUNITIES_PATH, 'w', encoding='utf-8') as f:
-                yaml.dump(opportunities, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            # Load opportunities, add and save under the file lock (a missing
+            # or empty file starts a new document)
+            async with document_store.atransaction(OPPORTUNITIES_PATH, default={}) as opportunities:
+                opportunities.setdefault("opportunities", []).append(opportunity_data)
 
             response = {
                 "status": "success",
@@ -1543,7 +1988,7 @@ async def execute_action(action: ActionRequest):
 class TailorCVRequest(BaseModel):
     job_description: str
 
-@app.post("/api/projects/sync")
+@app.post("/api/projects/sync", dependencies=[Depends(rate_limit("bulk"))])
 async def sync_projects_from_portfolio():
     """
     Sync projects from Bernard's portfolio API with Claude enrichment.
@@ -1573,12 +2018,13 @@ async def sync_projects_from_portfolio():
 
         portfolio_projects = response.json()
 
-        # Load current curriculum
-        with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-            curriculum = yaml.safe_load(f)
+        # Existing names from the cached snapshot; enrichment runs outside the lock
+        curriculum = document_store.get(CURRICULUM_PATH)
 
         existing_project_names = {p.get("name", "").lower() for p in curriculum.get("projects", [])}
 
+        new_projects = []
+
         synced_projects = []
         skipped_projects = []
 
@@ -1622,15 +2068,19 @@ Return ONLY the description text, no formatting."""
                 except Exception as e:
                     print(f"Warning: Could not enrich {proj_name}: {e}")
 
-            # Add to curriculum
-            curriculum.setdefault("projects", []).append(curriculum_project)
-            synced_projects.append(proj_name)
+            new_projects.append(curriculum_project)
 
-        # Save updated curriculum
-        curriculum["metadata"]["last_updated"] = datetime.now().strftime("%Y-%m-%d")
+        # Re-read under the lock and add projects nobody else added meanwhile
+        async with document_store.atransaction(CURRICULUM_PATH) as curriculum:
+            current_names = {p.get("name", "").lower() for p in curriculum.get("projects", [])}
+            for curriculum_project in new_projects:
+                if curriculum_project["name"].lower() in current_names:
+                    skipped_projects.append(curriculum_project["name"])
+                    continue
+                curriculum.setdefault("projects", []).append(curriculum_project)
+                synced_projects.append(curriculum_project["name"])
 
-        with open(CURRICULUM_PATH, 'w', encoding='utf-8') as f:
-            yaml.dump(curriculum, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+            curriculum["metadata"]["last_updated"] = datetime.now().strftime("%Y-%m-%d")
 
         return {
             "status": "success",
@@ -1653,7 +2103,7 @@ Return ONLY the description text, no formatting."""
             detail=f"Sync failed: {str(e)}\n{traceback.format_exc()}"
         )
 
-@app.post("/api/cv/tailor")
+@app.post("/api/cv/tailor", dependencies=[Depends(rate_limit("generation"))])
 async def tailor_cv_to_job(request: TailorCVRequest):
     """
     Tailor CV to specific job posting using Claude analysis.
@@ -1671,8 +2121,7 @@ async def tailor_cv_to_job(request: TailorCVRequest):
 
     try:
         # Load curriculum
-        with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-            curriculum = yaml.safe_load(f)
+        curriculum = document_store.get(CURRICULUM_PATH)
 
         personal = curriculum.get("personal", {})
         skills = curriculum.get("skills", {})
@@ -1893,6 +2342,19 @@ async def get_single_icon(tech_name: str):
 # Path to opportunities structure
 OPPORTUNITIES_PATH = BASE_DIR / "opportunities" / "structure.yaml"
 
+# Opportunity store (YAML by default, SQLite with OPPORTUNITIES_BACKEND=sqlite)
+from services.opportunity_store import get_opportunity_store
+from services.opportunity_index import BatchIdAllocator
+from services.opportunity_query import DEFAULT_LIST_FIELDS, QueryError, paginate, parse_fields
+opportunity_store = get_opportunity_store(OPPORTUNITIES_PATH)
+
+# Upper bound on operations per POST /api/opportunities/bulk
+MAX_BULK_OPERATIONS = 1000
+
+# GET /api/opportunities list view
+DEFAULT_OPPORTUNITY_PAGE_SIZE = 50
+MAX_OPPORTUNITY_PAGE_SIZE = 500
+
 # Pydantic models for opportunities
 class OpportunityContact(BaseModel):
     name: str
@@ -1955,27 +2417,138 @@ class CreateOpportunityRequest(BaseModel):
     notes: Optional[List[OpportunityNote]] = None
 
 
+class BulkOpportunityOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None                  # update / delete
+    data: Optional[Dict[str, Any]] = None     # create: CreateOpportunityRequest, update: partial fields
+    if_match: Optional[str] = None            # update / delete: ETag from GET /api/opportunities/{id}
+
+class BulkOpportunityRequest(BaseModel):
+    operations: List[BulkOpportunityOperation] = Field(..., max_length=MAX_BULK_OPERATIONS)
+    atomic: bool = False   # True: any failed operation discards the whole batch
+
+
+def new_opportunity_record(request: CreateOpportunityRequest, new_id: str) -> Dict[str, Any]:
+    """Pipeline record for a new opportunity (timeline starts today)"""
+    return {
+        'id': new_id,
+        'company': request.company,
+        'role': request.role,
+        'stage': request.stage,
+        'priority': request.priority,
+        'outcome': None,
+        'details': request.details.model_dump(),
+        'timeline': {
+            'discovered': datetime.now().strftime('%Y-%m-%d'),
+            'applied': None,
+            'first_interview': None,
+            'final_interview': None,
+            'offer_received': None,
+            'decision_deadline': None,
+            'closed': None
+        },
+        'contacts': [contact.model_dump() for contact in (request.contacts or [])],
+        'notes': [note.model_dump() for note in (request.notes or [])],
+        'fit_analysis': {
+            'technical_match': None,
+            'cultural_match': None,
+            'growth_potential': None,
+            'decline_reason': None,
+            'red_flags': [],
+            'green_flags': []
+        }
+    }
+
+
+def merge_opportunity_updates(opportunity: Dict[str, Any], updates: Dict[str, Any]) -> None:
+    """Apply a partial update in place (nested dicts are merged, lists replaced)"""
+    for key, value in updates.items():
+        if key in ['details', 'timeline', 'fit_analysis'] and isinstance(value, dict):
+            # Merge nested dicts
+            if key not in opportunity:
+                opportunity[key] = {}
+            opportunity[key].update(value)
+        elif key in ['contacts', 'notes'] and isinstance(value, list):
+            # Replace lists
+            opportunity[key] = value
+        else:
+            opportunity[key] = value
+
+
 @app.get("/api/opportunities")
-def get_opportunities():
+def get_opportunities(
+    request: Request,
+    response: Response,
+    stage: Optional[str] = None,
+    priority: Optional[str] = None,
+    company: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_OPPORTUNITY_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
     Get all opportunities data from opportunities/structure.yaml
 
+    Without query parameters the complete document is returned. Any of the
+    parameters below switches to a paginated list view served from the
+    opportunity index:
+
+    Query parameters:
+        stage / priority: Exact match
+        company: Case-insensitive substring
+        fields: Comma-separated (dotted) fields, e.g. "company,stage,details.location";
+            default id,company,role,stage,priority; "*" for whole records
+        sort: position (default), id, company, role, stage, priority, discovered,
+            applied; prefix "-" for descending
+        limit: Page size (default 50)
+        cursor: next_cursor from the previous page
+
     Returns:
-        Complete opportunities data including pipeline, active_count, and goals
+        Complete opportunities data including pipeline, active_count, and goals,
+        or {"items", "count", "total", "next_cursor", "active_count"};
+        304 if If-None-Match / If-Modified-Since still match
     """
     try:
-        if not OPPORTUNITIES_PATH.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"Opportunities file not found: {OPPORTUNITIES_PATH}"
-            )
-
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        return opportunities_data
-
-    except yaml.YAMLError as e:
+        list_view = any(param is not None for param in (stage, priority, company, fields, sort, limit, cursor))
+
+        # Validators come from the file state (or write-behind version), so a
+        # 304 costs a stat() - no parsing, querying or serialization
+        digest, last_modified = opportunity_store.validators()
+        if list_view:
+            digest = hashlib.sha256(f"{digest}?{request.url.query}".encode()).hexdigest()
+        not_modified = conditional_get(request, response, etag_from_digest(digest), last_modified)
+        if not_modified:
+            return not_modified
+
+        if not list_view:
+            return json_response(opportunity_store.document(), response)
+
+        records = opportunity_store.query(stage=stage, priority=priority, company=company)
+        index = opportunity_store.index()
+        positions = [
+            index.position(record.get('id')) if record.get('id') in index else len(index) + offset
+            for offset, record in enumerate(records)
+        ]
+        page = paginate(
+            records,
+            positions,
+            sort=sort,
+            limit=limit or DEFAULT_OPPORTUNITY_PAGE_SIZE,
+            cursor=cursor,
+            fields=parse_fields(fields) if fields is not None else list(DEFAULT_LIST_FIELDS)
+        )
+        page["active_count"] = index.aggregates.active_count()
+        return json_response(page, response)
+
+    except QueryError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Opportunities file not found: {OPPORTUNITIES_PATH}"
+        )
+    except yaml_io.YAMLError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error parsing YAML: {str(e)}"
@@ -1987,8 +2560,31 @@ def get_opportunities():
         )
 
 
+@app.get("/api/opportunities/aggregates")
+def get_opportunity_aggregates():
+    """
+    Get pipeline counters without scanning opportunities
+
+    Returns:
+        Totals plus counts by stage, priority and outcome
+    """
+    try:
+        return opportunity_store.aggregates().summary()
+
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Opportunities file not found: {OPPORTUNITIES_PATH}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error reading opportunity aggregates: {str(e)}"
+        )
+
+
 @app.get("/api/opportunities/{opportunity_id}")
-def get_opportunity_by_id(opportunity_id: str):
+def get_opportunity_by_id(opportunity_id: str, response: Response):
     """
     Get a specific opportunity by ID
 
@@ -1996,23 +2592,20 @@ def get_opportunity_by_id(opportunity_id: str):
         opportunity_id: Unique identifier for the opportunity
 
     Returns:
-        Single opportunity object
+        Single opportunity object (ETag header for If-Match)
     """
     try:
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        # Find opportunity in pipeline
-        for opportunity in opportunities_data.get('pipeline', []):
-            if opportunity.get('id') == opportunity_id:
-                return opportunity
+        opportunity = opportunity_store.get(opportunity_id)
+        if opportunity is not None:
+            response.headers["ETag"] = record_etag(opportunity)
+            return json_response(opportunity, response)
 
         raise HTTPException(
             status_code=404,
             detail=f"Opportunity not found: {opportunity_id}"
         )
 
-    except yaml.YAMLError as e:
+    except yaml_io.YAMLError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error parsing YAML: {str(e)}"
@@ -2038,84 +2631,31 @@ def create_opportunity(request: CreateOpportunityRequest):
         Created opportunity object with generated ID
     """
     try:
-        # Load existing data
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        # Generate new ID
-        existing_ids = [opp.get('id', '') for opp in opportunities_data.get('pipeline', [])]
-        # Extract company prefix and number
-        company_prefix = request.company.lower().replace(' ', '-')[:10]
-        max_num = 0
-        for existing_id in existing_ids:
-            if existing_id.startswith(company_prefix):
-                try:
-                    num = int(existing_id.split('-')[-1])
-                    max_num = max(max_num, num)
-                except:
-                    pass
-        new_id = f"{company_prefix}-{max_num + 1:03d}"
-
-        # Create new opportunity
-        new_opportunity = {
-            'id': new_id,
-            'company': request.company,
-            'role': request.role,
-            'stage': request.stage,
-            'priority': request.priority,
-            'outcome': None,
-            'details': request.details.model_dump(),
-            'timeline': {
-                'discovered': datetime.now().strftime('%Y-%m-%d'),
-                'applied': None,
-                'first_interview': None,
-                'final_interview': None,
-                'offer_received': None,
-                'decision_deadline': None,
-                'closed': None
-            },
-            'contacts': [contact.model_dump() for contact in (request.contacts or [])],
-            'notes': [note.model_dump() for note in (request.notes or [])],
-            'fit_analysis': {
-                'technical_match': None,
-                'cultural_match': None,
-                'growth_potential': None,
-                'decline_reason': None,
-                'red_flags': [],
-                'green_flags': []
-            }
-        }
+        # Locked read-modify-write; saved atomically when the block exits
+        # (a create touches no existing record)
+        with opportunity_store.transaction(touched=()) as opportunities_data:
+            # Generate new ID (company prefix + next sequence, from the index)
+            new_id = opportunity_store.next_id(request.company)
 
-        # Add to pipeline
-        if 'pipeline' not in opportunities_data:
-            opportunities_data['pipeline'] = []
-        opportunities_data['pipeline'].append(new_opportunity)
-
-        # Update active_count
-        stage_counts = {}
-        for opp in opportunities_data['pipeline']:
-            stage = opp.get('stage', 'discovered')
-            stage_counts[stage] = stage_counts.get(stage, 0) + 1
-
-        opportunities_data['active_count'] = {
-            'discovered': stage_counts.get('discovered', 0),
-            'applied': stage_counts.get('applied', 0),
-            'interviewing': stage_counts.get('interviewing', 0),
-            'offer': stage_counts.get('offer', 0),
-            'closed': stage_counts.get('closed', 0),
-            'total': sum(1 for opp in opportunities_data['pipeline'] if opp.get('stage') != 'closed')
-        }
+            # Create new opportunity
+            new_opportunity = new_opportunity_record(request, new_id)
 
-        # Update last_updated
-        opportunities_data['meta']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
+            # Add to pipeline
+            if 'pipeline' not in opportunities_data:
+                opportunities_data['pipeline'] = []
+            opportunities_data['pipeline'].append(new_opportunity)
 
-        # Save updated data
-        with open(OPPORTUNITIES_PATH, 'w', encoding='utf-8') as f:
-            yaml.dump(opportunities_data, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
+            # Update active_count (O(1) delta on the maintained aggregates)
+            counts = opportunity_store.aggregates().copy()
+            counts.add(new_opportunity)
+            opportunities_data['active_count'] = counts.active_count()
+
+            # Update last_updated
+            opportunities_data['meta']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
 
         return new_opportunity
 
-    except yaml.YAMLError as e:
+    except yaml_io.YAMLError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error writing YAML: {str(e)}"
@@ -2128,7 +2668,12 @@ def create_opportunity(request: CreateOpportunityRequest):
 
 
 @app.put("/api/opportunities/{opportunity_id}")
-def update_opportunity(opportunity_id: str, updates: Dict[str, Any]):
+def update_opportunity(
+    opportunity_id: str,
+    updates: Dict[str, Any],
+    response: Response,
+    if_match: Optional[str] = Header(None)
+):
     """
     Update an existing opportunity
 
@@ -2138,69 +2683,49 @@ def update_opportunity(opportunity_id: str, updates: Dict[str, Any]):
     Request body:
         Partial opportunity object with fields to update
 
+    Headers:
+        If-Match: Optional ETag from GET /api/opportunities/{id} (412 if stale)
+
     Returns:
-        Updated opportunity object
+        Updated opportunity object (new ETag header)
     """
     try:
-        # Load existing data
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        # Find and update opportunity
-        found = False
-        for i, opportunity in enumerate(opportunities_data.get('pipeline', [])):
-            if opportunity.get('id') == opportunity_id:
-                # Deep merge updates
-                for key, value in updates.items():
-                    if key in ['details', 'timeline', 'fit_analysis'] and isinstance(value, dict):
-                        # Merge nested dicts
-                        if key not in opportunity:
-                            opportunity[key] = {}
-                        opportunity[key].update(value)
-                    elif key in ['contacts', 'notes'] and isinstance(value, list):
-                        # Replace lists
-                        opportunity[key] = value
-                    else:
-                        opportunity[key] = value
-
-                opportunities_data['pipeline'][i] = opportunity
-                found = True
-                break
-
-        if not found:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Opportunity not found: {opportunity_id}"
-            )
-
-        # Update active_count
-        stage_counts = {}
-        for opp in opportunities_data['pipeline']:
-            stage = opp.get('stage', 'discovered')
-            stage_counts[stage] = stage_counts.get(stage, 0) + 1
-
-        opportunities_data['active_count'] = {
-            'discovered': stage_counts.get('discovered', 0),
-            'applied': stage_counts.get('applied', 0),
-            'interviewing': stage_counts.get('interviewing', 0),
-            'offer': stage_counts.get('offer', 0),
-            'closed': stage_counts.get('closed', 0),
-            'total': sum(1 for opp in opportunities_data['pipeline'] if opp.get('stage') != 'closed')
-        }
+        # Locked read-modify-write; saved atomically when the block exits
+        with opportunity_store.transaction(touched=[opportunity_id]) as opportunities_data:
+            previous = opportunity_store.get(opportunity_id)
+            if previous is not None:
+                check_if_match(if_match, record_etag(previous))
+
+            # Find and update opportunity
+            found = False
+            for i, opportunity in enumerate(opportunities_data.get('pipeline', [])):
+                if opportunity.get('id') == opportunity_id:
+                    merge_opportunity_updates(opportunity, updates)
+                    opportunities_data['pipeline'][i] = opportunity
+                    found = True
+                    break
+
+            if not found:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Opportunity not found: {opportunity_id}"
+                )
 
-        # Update last_updated
-        opportunities_data['meta']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
+            # Update active_count (O(1) delta for a stage/priority/outcome change)
+            counts = opportunity_store.aggregates().copy()
+            counts.replace(previous, opportunity)
+            opportunities_data['active_count'] = counts.active_count()
 
-        # Save updated data
-        with open(OPPORTUNITIES_PATH, 'w', encoding='utf-8') as f:
-            yaml.dump(opportunities_data, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
+            # Update last_updated
+            opportunities_data['meta']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
 
         # Return updated opportunity
         for opportunity in opportunities_data['pipeline']:
             if opportunity.get('id') == opportunity_id:
+                response.headers["ETag"] = record_etag(opportunity)
                 return opportunity
 
-    except yaml.YAMLError as e:
+    except yaml_io.YAMLError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error writing YAML: {str(e)}"
@@ -2214,6 +2739,75 @@ def update_opportunity(opportunity_id: str, updates: Dict[str, Any]):
         )
 
 
+@app.patch("/api/opportunities/{opportunity_id}")
+def patch_opportunity(
+    opportunity_id: str,
+    response: Response,
+    patch: List[Dict[str, Any]] = Body(..., media_type="application/json-patch+json"),
+    if_match: Optional[str] = Header(None)
+):
+    """
+    Apply a JSON Patch (RFC 6902) to one opportunity
+
+    Path parameters:
+        opportunity_id: Unique identifier for the opportunity
+
+    Request body:
+        Operations relative to the opportunity, e.g.
+        [{"op": "replace", "path": "/stage", "value": "interviewing"},
+         {"op": "add", "path": "/notes/-", "value": {"date": "...", "content": "..."}}]
+
+    Headers:
+        If-Match: ETag from GET /api/opportunities/{id} (412 if stale)
+
+    Returns:
+        Patched opportunity object (new ETag header)
+    """
+    try:
+        # Locked read-modify-write; saved atomically when the block exits
+        with opportunity_store.transaction(touched=[opportunity_id]) as opportunities_data:
+            previous = opportunity_store.get(opportunity_id)
+            if previous is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Opportunity not found: {opportunity_id}"
+                )
+            check_if_match(if_match, record_etag(previous))
+
+            pipeline = opportunities_data['pipeline']
+            position = next(i for i, opp in enumerate(pipeline) if opp.get('id') == opportunity_id)
+            patched = apply_patch(pipeline[position], patch)
+            if not isinstance(patched, dict):
+                raise HTTPException(status_code=422, detail="Patched opportunity must be an object")
+            pipeline[position] = patched
+
+            # Update active_count (O(1) delta for a stage/priority/outcome change)
+            counts = opportunity_store.aggregates().copy()
+            counts.replace(previous, patched)
+            opportunities_data['active_count'] = counts.active_count()
+
+            # Update last_updated
+            opportunities_data['meta']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
+
+        response.headers["ETag"] = record_etag(patched)
+        return patched
+
+    except JsonPatchError as e:
+        raise patch_error(e)
+    except yaml_io.YAMLError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error writing YAML: {str(e)}"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error patching opportunity: {str(e)}"
+        )
+
+
 @app.delete("/api/opportunities/{opportunity_id}")
 def delete_opportunity(opportunity_id: str):
     """
@@ -2226,48 +2820,34 @@ def delete_opportunity(opportunity_id: str):
         Success message
     """
     try:
-        # Load existing data
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        # Find and remove opportunity
-        initial_count = len(opportunities_data.get('pipeline', []))
-        opportunities_data['pipeline'] = [
-            opp for opp in opportunities_data.get('pipeline', [])
-            if opp.get('id') != opportunity_id
-        ]
-
-        if len(opportunities_data['pipeline']) == initial_count:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Opportunity not found: {opportunity_id}"
-            )
-
-        # Update active_count
-        stage_counts = {}
-        for opp in opportunities_data['pipeline']:
-            stage = opp.get('stage', 'discovered')
-            stage_counts[stage] = stage_counts.get(stage, 0) + 1
-
-        opportunities_data['active_count'] = {
-            'discovered': stage_counts.get('discovered', 0),
-            'applied': stage_counts.get('applied', 0),
-            'interviewing': stage_counts.get('interviewing', 0),
-            'offer': stage_counts.get('offer', 0),
-            'closed': stage_counts.get('closed', 0),
-            'total': sum(1 for opp in opportunities_data['pipeline'] if opp.get('stage') != 'closed')
-        }
+        # Locked read-modify-write; saved atomically when the block exits
+        # (a delete changes no remaining record)
+        with opportunity_store.transaction(touched=()) as opportunities_data:
+            # Find and remove opportunity
+            removed = [opp for opp in opportunities_data.get('pipeline', []) if opp.get('id') == opportunity_id]
+            opportunities_data['pipeline'] = [
+                opp for opp in opportunities_data.get('pipeline', [])
+                if opp.get('id') != opportunity_id
+            ]
+
+            if not removed:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Opportunity not found: {opportunity_id}"
+                )
 
-        # Update last_updated
-        opportunities_data['meta']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
+            # Update active_count (O(1) delta per removed opportunity)
+            counts = opportunity_store.aggregates().copy()
+            for opp in removed:
+                counts.remove(opp)
+            opportunities_data['active_count'] = counts.active_count()
 
-        # Save updated data
-        with open(OPPORTUNITIES_PATH, 'w', encoding='utf-8') as f:
-            yaml.dump(opportunities_data, f, allow_unicode=True, sort_keys=False, default_flow_style=False)
+            # Update last_updated
+            opportunities_data['meta']['last_updated'] = datetime.now().strftime('%Y-%m-%d')
 
         return {"message": f"Opportunity {opportunity_id} deleted successfully"}
 
-    except yaml.YAMLError as e:
+    except yaml_io.YAMLError as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error writing YAML: {str(e)}"
@@ -2281,6 +2861,123 @@ def delete_opportunity(opportunity_id: str):
         )
 
 
+@app.post("/api/opportunities/bulk")
+def bulk_opportunities(request: BulkOpportunityRequest):
+    """
+    Apply many create / update / delete operations in one transaction
+
+    The document is loaded once, active_count is updated with one delta per
+    operation and the result is written once, so importing 100
+    opportunities costs one write instead of 100.
+
+    Request body:
+        {"operations": [
+            {"op": "create", "data": {"company": "...", "role": "...", "details": {...}}},
+            {"op": "update", "id": "acme-001", "data": {"stage": "applied"}, "if_match": "..."},
+            {"op": "delete", "id": "globex-002"}
+         ],
+         "atomic": false}
+
+    Returns:
+        Per-operation results ({index, op, id, status, opportunity?, etag?, error?})
+        in request order. Failed operations are skipped; with "atomic": true
+        any failure returns 409 with the results and nothing is saved.
+    """
+    results = []
+    try:
+        # Locked read-modify-write; saved atomically when the block exits
+        # (only updates and deletes name existing records)
+        touched = {operation.id for operation in request.operations if operation.id}
+        with opportunity_store.transaction(touched=touched) as opportunities_data:
+            pipeline = opportunities_data.setdefault('pipeline', [])
+            positions: Dict[str, int] = {}
+            for position, opportunity in enumerate(pipeline):
+                if isinstance(opportunity, dict):
+                    positions.setdefault(opportunity.get('id'), position)
+
+            counts = opportunity_store.aggregates().copy()
+            allocator = BatchIdAllocator(opportunity_store.next_id)
+            deleted = False
+
+            for index, operation in enumerate(request.operations):
+                result: Dict[str, Any] = {"index": index, "op": operation.op, "id": operation.id}
+                results.append(result)
+
+                if operation.op == "create":
+                    try:
+                        create = CreateOpportunityRequest.model_validate(operation.data or {})
+                    except ValidationError as e:
+                        result.update(status=422, error=str(e))
+                        continue
+                    new_opportunity = new_opportunity_record(create, allocator.next_id(create.company))
+                    positions[new_opportunity['id']] = len(pipeline)
+                    pipeline.append(new_opportunity)
+                    counts.add(new_opportunity)
+                    result.update(
+                        id=new_opportunity['id'], status=201,
+                        opportunity=new_opportunity, etag=record_etag(new_opportunity)
+                    )
+                    continue
+
+                position = positions.get(operation.id)
+                if position is None:
+                    result.update(status=404, error=f"Opportunity not found: {operation.id}")
+                    continue
+                opportunity = pipeline[position]
+                try:
+                    check_if_match(operation.if_match, record_etag(opportunity))
+                except HTTPException as e:
+                    result.update(status=e.status_code, error=e.detail["message"], etag=e.headers["ETag"])
+                    continue
+
+                if operation.op == "update":
+                    previous = dict(opportunity)   # counters only read top-level fields
+                    merge_opportunity_updates(opportunity, operation.data or {})
+                    counts.replace(previous, opportunity)
+                    result.update(status=200, opportunity=opportunity, etag=record_etag(opportunity))
+                else:
+                    pipeline[position] = None
+                    del positions[operation.id]
+                    counts.remove(opportunity)
+                    deleted = True
+                    result.update(status=200)
+
+            failed = sum(1 for result in results if result["status"] >= 400)
+            if failed and request.atomic:
+                raise HTTPException(
+                    status_code=409,
+                    detail={
+                        "error": "bulk_failed",
+                        "message": f"{failed} operation(s) failed; nothing was saved",
+                        "results": results
+                    }
+                )
+
+            if deleted:
+                opportunities_data['pipeline'] = [opp for opp in pipeline if opp is not None]
+            opportunities_data['active_count'] = counts.active_count()
+            opportunities_data.setdefault('meta', {})['last_updated'] = datetime.now().strftime('%Y-%m-%d')
+
+        return {
+            "results": results,
+            "applied": len(results) - failed,
+            "failed": failed
+        }
+
+    except yaml_io.YAMLError as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error writing YAML: {str(e)}"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error applying bulk operations: {str(e)}"
+        )
+
+
 # ========================
 # Opportunities Claude Actions
 # ========================
@@ -2309,7 +3006,7 @@ class CareerStrategyRequest(BaseModel):
     time_horizon: str  # 3_months | 6_months | 1_year
 
 
-@app.post("/api/opportunities/analyze")
+@app.post("/api/opportunities/analyze", dependencies=[Depends(rate_limit("analysis"))])
 async def analyze_job_description(request: AnalyzeJobDescriptionRequest):
     """
     Analyze job description using Claude AI
@@ -2380,7 +3077,7 @@ Rules:
         )
 
 
-@app.post("/api/opportunities/{opportunity_id}/pitch/improve")
+@app.post("/api/opportunities/{opportunity_id}/pitch/improve", dependencies=[Depends(rate_limit("analysis"))])
 async def improve_pitch(opportunity_id: str, request: ImprovePitchRequest):
     """
     Improve elevator pitch using Claude AI
@@ -2395,14 +3092,7 @@ async def improve_pitch(opportunity_id: str, request: ImprovePitchRequest):
 
     try:
         # Load opportunity for context
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        opportunity = None
-        for opp in opportunities_data.get('pipeline', []):
-            if opp.get('id') == opportunity_id:
-                opportunity = opp
-                break
+        opportunity = opportunity_store.get(opportunity_id)
 
         if not opportunity:
             raise HTTPException(status_code=404, detail="Opportunity not found")
@@ -2462,7 +3152,7 @@ Guidelines:
         )
 
 
-@app.post("/api/opportunities/{opportunity_id}/mock-interview")
+@app.post("/api/opportunities/{opportunity_id}/mock-interview", dependencies=[Depends(rate_limit("analysis"))])
 async def generate_mock_interview(opportunity_id: str, request: MockInterviewRequest):
     """
     Generate mock interview questions using Claude AI
@@ -2477,14 +3167,7 @@ async def generate_mock_interview(opportunity_id: str, request: MockInterviewReq
 
     try:
         # Load opportunity for context
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        opportunity = None
-        for opp in opportunities_data.get('pipeline', []):
-            if opp.get('id') == opportunity_id:
-                opportunity = opp
-                break
+        opportunity = opportunity_store.get(opportunity_id)
 
         if not opportunity:
             raise HTTPException(status_code=404, detail="Opportunity not found")
@@ -2553,7 +3236,7 @@ Guidelines:
         )
 
 
-@app.post("/api/opportunities/compare")
+@app.post("/api/opportunities/compare", dependencies=[Depends(rate_limit("analysis"))])
 async def compare_opportunities(request: CompareOpportunitiesRequest):
     """
     Compare two opportunities using Claude AI
@@ -2568,16 +3251,8 @@ async def compare_opportunities(request: CompareOpportunitiesRequest):
 
     try:
         # Load opportunities
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        opp_a = None
-        opp_b = None
-        for opp in opportunities_data.get('pipeline', []):
-            if opp.get('id') == request.opportunity_a_id:
-                opp_a = opp
-            if opp.get('id') == request.opportunity_b_id:
-                opp_b = opp
+        opp_a = opportunity_store.get(request.opportunity_a_id)
+        opp_b = opportunity_store.get(request.opportunity_b_id)
 
         if not opp_a or not opp_b:
             raise HTTPException(status_code=404, detail="One or both opportunities not found")
@@ -2649,7 +3324,7 @@ Return ONLY valid JSON:
         )
 
 
-@app.post("/api/opportunities/career-strategy")
+@app.post("/api/opportunities/career-strategy", dependencies=[Depends(rate_limit("generation"))])
 async def generate_career_strategy(request: CareerStrategyRequest):
     """
     Generate career strategy using Claude AI
@@ -2664,18 +3339,10 @@ async def generate_career_strategy(request: CareerStrategyRequest):
 
     try:
         # Load opportunities and curriculum for context
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        with open(CURRICULUM_PATH, 'r', encoding='utf-8') as f:
-            curriculum = yaml.safe_load(f)
+        curriculum = document_store.get(CURRICULUM_PATH)
 
         # Get selected opportunities
-        selected_opps = []
-        for opp_id in request.current_opportunities:
-            for opp in opportunities_data.get('pipeline', []):
-                if opp.get('id') == opp_id:
-                    selected_opps.append(opp)
+        selected_opps = opportunity_store.get_many(request.current_opportunities)
 
         opps_summary = '\n'.join([
             f"- {opp.get('company')}: {opp.get('role')} (Stage: {opp.get('stage')})"
@@ -2816,14 +3483,7 @@ async def get_feedback_history(opportunity_id: str):
     """
     try:
         # Load opportunity to get company name
-        with open(OPPORTUNITIES_PATH, 'r', encoding='utf-8') as f:
-            opportunities_data = yaml.safe_load(f)
-
-        opportunity = None
-        for opp in opportunities_data.get('pipeline', []):
-            if opp.get('id') == opportunity_id:
-                opportunity = opp
-                break
+        opportunity = opportunity_store.get(opportunity_id)
 
         if not opportunity:
             raise HTTPException(status_code=404, detail="Opportunity not found")
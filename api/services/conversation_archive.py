@@ -0,0 +1,346 @@
+"""
+Conversation Archive
+
+Cold storage for archived conversations, outside the conversations
+directory so the file watcher, the conversation index and the full-text
+index only hold the hot set. Listings and name search still include
+archived chats, read from this archive's index.
+
+- bundle_NNNN.gz   concatenated gzip members, one per archived conversation
+                   (its JSONL message log); a new bundle starts once the
+                   current one reaches BUNDLE_MAX_BYTES
+- index.json       offset index: conversation id -> bundle, offset, length,
+                   session fields and message count; per bundle, its size
+                   and the bytes no longer referenced (restored or deleted)
+
+Reading one conversation seeks to its member and decompresses only that.
+Listing archived chats, and searching their names, reads only the index. Removing a conversation just
+marks its member dead; repack() rewrites bundles to reclaim the space.
+
+Bytes in, bytes out: the conversation store encodes and decodes the
+message logs.
+"""
+
+import gzip
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .conversation_search import SNIPPET_CLOSE, SNIPPET_OPEN, query_terms
+from .document_store import atomic_write_bytes, file_lock
+
+INDEX_NAME = "index.json"
+INDEX_FORMAT = 1
+BUNDLE_PREFIX = "bundle_"
+BUNDLE_SUFFIX = ".gz"
+
+# Start a new bundle past this size
+BUNDLE_MAX_BYTES = 64 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class ConversationArchive:
+    """
+    Compressed bundles of archived conversation logs
+
+    Usage:
+        archive = ConversationArchive(CONVERSATION_ARCHIVE_DIR)
+        archive.put("conv_1", session, message_count, log_bytes)
+        archive.read("conv_1")          # the JSONL log, decompressed
+        archive.remove("conv_1")        # after restoring it
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.index_path = self.directory / INDEX_NAME
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[Tuple[int, int], Dict[str, Any]]] = None  # (signature, index)
+        self._stats = {"puts": 0, "reads": 0, "removes": 0, "repacks": 0}
+
+    # ---------- index ----------
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {"format": INDEX_FORMAT, "conversations": {}, "bundles": {}}
+
+    def _index(self) -> Dict[str, Any]:
+        """Current index (re-read when the file changed; one stat otherwise)"""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return self._empty()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._cached is None or self._cached[0] != signature:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get("format") != INDEX_FORMAT:
+                    raise ValueError(f"Unsupported archive index format in {self.index_path}")
+                self._cached = (signature, index)
+            return self._cached[1]
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        atomic_write_bytes(self.index_path, json.dumps(index, ensure_ascii=False, separators=(",", ":"), default=str).encode('utf-8'))
+        with self._lock:
+            self._cached = None
+
+    def _bundle_path(self, name: str) -> Path:
+        return self.directory / name
+
+    def _locked_index(self) -> Dict[str, Any]:
+        """Private copy of the index to modify (caller holds the index lock)"""
+        return json.loads(json.dumps(self._index()))
+
+    @staticmethod
+    def _next_bundle(index: Dict[str, Any]) -> str:
+        bundles = sorted(index["bundles"])
+        number = int(bundles[-1][len(BUNDLE_PREFIX):-len(BUNDLE_SUFFIX)]) + 1 if bundles else 1
+        return f"{BUNDLE_PREFIX}{number:04d}{BUNDLE_SUFFIX}"
+
+    def _current_bundle(self, index: Dict[str, Any]) -> str:
+        bundles = sorted(index["bundles"])
+        if bundles and index["bundles"][bundles[-1]]["size"] < BUNDLE_MAX_BYTES:
+            return bundles[-1]
+        return self._next_bundle(index)
+
+    @staticmethod
+    def _release(index: Dict[str, Any], entry: Dict[str, Any]) -> Optional[str]:
+        """
+        Mark a member dead.
+
+        Returns:
+            Its bundle's name if nothing in it is referenced any more (to
+            delete once the index is saved)
+        """
+        bundle = index["bundles"][entry["bundle"]]
+        bundle["dead"] += entry["length"]
+        if bundle["dead"] >= bundle["size"]:
+            del index["bundles"][entry["bundle"]]
+            return entry["bundle"]
+        return None
+
+    def _unlink_bundles(self, names: Iterable[Optional[str]]) -> None:
+        for name in names:
+            if name is None:
+                continue
+            try:
+                self._bundle_path(name).unlink()
+            except FileNotFoundError:
+                pass
+
+    # ---------- writes ----------
+
+    def put(self, conversation_id: str, session: Dict[str, Any], message_count: int, raw: bytes) -> Dict[str, Any]:
+        """
+        Store a conversation's log (replacing an archived copy with that id).
+
+        Returns:
+            Its index entry
+        """
+        member = gzip.compress(raw, compresslevel=COMPRESSION_LEVEL, mtime=0)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.index_path):
+            index = self._locked_index()
+            name = self._current_bundle(index)
+            path = self._bundle_path(name)
+            with open(path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(member)
+                f.flush()
+                os.fsync(f.fileno())
+
+            bundle = index["bundles"].setdefault(name, {"size": 0, "dead": 0})
+            # A torn write from a crash before the index was saved stays as dead bytes
+            bundle["dead"] += offset - bundle["size"]
+            bundle["size"] = offset + len(member)
+            previous = index["conversations"].get(conversation_id)
+            emptied = self._release(index, previous) if previous is not None else None
+            entry = index["conversations"][conversation_id] = {
+                "bundle": name,
+                "offset": offset,
+                "length": len(member),
+                "log_bytes": len(raw),
+                "message_count": message_count,
+                "session": session,
+                "archived_at": datetime.now().isoformat(),
+            }
+            self._write_index(index)
+            self._unlink_bundles([emptied])
+            self._stats["puts"] += 1
+            return entry
+
+    def update_session(self, conversation_id: str, **changes: Any) -> Dict[str, Any]:
+        """
+        Change session fields of an archived conversation (index only).
+
+        Raises:
+            FileNotFoundError: If the conversation isn't archived
+        """
+        with file_lock(self.index_path):
+            index = self._locked_index()
+            entry = index["conversations"].get(conversation_id)
+            if entry is None:
+                raise FileNotFoundError(f"{conversation_id} is not archived")
+            entry["session"] = {**entry["session"], **changes}
+            self._write_index(index)
+            return entry
+
+    def remove(self, conversation_id: str) -> None:
+        """
+        Drop an archived conversation (restored or deleted).
+
+        Raises:
+            FileNotFoundError: If the conversation isn't archived
+        """
+        with file_lock(self.index_path):
+            index = self._locked_index()
+            entry = index["conversations"].pop(conversation_id, None)
+            if entry is None:
+                raise FileNotFoundError(f"{conversation_id} is not archived")
+            emptied = self._release(index, entry)
+            self._write_index(index)
+            self._unlink_bundles([emptied])
+            self._stats["removes"] += 1
+
+    def repack(self) -> int:
+        """
+        Copy the live members of bundles with dead ones into new bundles.
+
+        Readers holding the old index find the old bundle gone rather than
+        reading the wrong bytes.
+
+        Returns:
+            Bytes reclaimed
+        """
+        with file_lock(self.index_path):
+            index = self._locked_index()
+            reclaimed = 0
+            replaced = []
+            for name, bundle in sorted(index["bundles"].items()):
+                if not bundle["dead"]:
+                    continue
+                members = sorted(
+                    (entry for entry in index["conversations"].values() if entry["bundle"] == name),
+                    key=lambda entry: entry["offset"]
+                )
+                chunks = []
+                with open(self._bundle_path(name), 'rb') as f:
+                    for entry in members:
+                        f.seek(entry["offset"])
+                        chunks.append(f.read(entry["length"]))
+
+                new_name = self._next_bundle(index)
+                atomic_write_bytes(self._bundle_path(new_name), b"".join(chunks))
+                offset = 0
+                for entry, chunk in zip(members, chunks):
+                    entry["bundle"], entry["offset"] = new_name, offset
+                    offset += len(chunk)
+                index["bundles"][new_name] = {"size": offset, "dead": 0}
+                del index["bundles"][name]
+                reclaimed += bundle["size"] - offset
+                replaced.append(name)
+
+            self._write_index(index)
+            self._unlink_bundles(replaced)
+            self._stats["repacks"] += 1
+            return reclaimed
+
+    # ---------- reads ----------
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Index entry (session, message_count, archived_at, ...) or None"""
+        return self._index()["conversations"].get(conversation_id)
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return self.get(conversation_id) is not None
+
+    def read(self, conversation_id: str) -> bytes:
+        """
+        The conversation's JSONL log, decompressed.
+
+        Raises:
+            FileNotFoundError: If the conversation isn't archived
+        """
+        entry = self.get(conversation_id)
+        if entry is None:
+            raise FileNotFoundError(f"{conversation_id} is not archived")
+        with open(self._bundle_path(entry["bundle"]), 'rb') as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        self._stats["reads"] += 1
+        return gzip.decompress(member)
+
+    def list(self) -> List[Tuple[str, Dict[str, Any]]]:
+        """(conversation id, index entry), most recently archived first"""
+        return sorted(self._index()["conversations"].items(), key=lambda item: item[1]["archived_at"], reverse=True)
+
+    def latest(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(conversation id, index entry) of the most recently archived, or None"""
+        conversations = self._index()["conversations"]
+        if not conversations:
+            return None
+        return max(conversations.items(), key=lambda item: item[1]["archived_at"])
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Archived conversations whose name has every word of `query`, the
+        last one as a prefix (their messages aren't in the full-text index).
+
+        Returns:
+            Hits shaped like ConversationSearch.search's, most recently
+            archived first; message_id and role are None and the snippet is
+            the highlighted name
+
+        Raises:
+            SearchError: If the query has no words
+        """
+        terms = query_terms(query)
+        whole, prefix = set(terms[:-1]), terms[-1]
+
+        def matches(word: str) -> bool:
+            return word in whole or word.startswith(prefix)
+
+        hits = []
+        for conversation_id, entry in self.list():
+            name = entry["session"].get("name") or ""
+            words = set(_WORD.findall(name.lower()))
+            if not whole <= words or not any(word.startswith(prefix) for word in words):
+                continue
+            hits.append({
+                "conversation_id": conversation_id,
+                "conversation_name": name,
+                "archived": True,
+                "message_id": None,
+                "role": None,
+                "timestamp": entry["archived_at"],
+                "snippet": _WORD.sub(
+                    lambda m: f"{SNIPPET_OPEN}{m.group(0)}{SNIPPET_CLOSE}" if matches(m.group(0).lower()) else m.group(0),
+                    name
+                ),
+                "score": 0.0,
+            })
+            if len(hits) >= limit:
+                break
+        return hits
+
+    def __len__(self) -> int:
+        return len(self._index()["conversations"])
+
+    def stats(self) -> Dict[str, Any]:
+        index = self._index()
+        bundles = index["bundles"].values()
+        return {
+            **self._stats,
+            "directory": str(self.directory),
+            "conversations": len(index["conversations"]),
+            "bundles": len(index["bundles"]),
+            "bundle_bytes": sum(bundle["size"] for bundle in bundles),
+            "dead_bytes": sum(bundle["dead"] for bundle in bundles),
+            "log_bytes": sum(entry["log_bytes"] for entry in index["conversations"].values()),
+        }
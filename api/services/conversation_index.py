@@ -0,0 +1,284 @@
+"""
+Conversation Index
+
+Maintained metadata (name, date, message count, archived flag) for every
+saved conversation, so the chat listings don't open and parse every
+conversation file on each call.
+
+- The conversation store calls record() after each write (create,
+  rename, archive, duplicate, message append) and remove() after a delete
+- Entries carry the file's (mtime_ns, size); listing compares them with the
+  watched directory index and re-reads only files changed behind our back
+  (hand edits, other workers)
+- record() stats only the file written; it never rescans the directory
+- The index is persisted as a compact JSON manifest (.index.json in the
+  conversations directory), so a restart doesn't re-read every file. Writes
+  only mark it dirty: it is saved once they pause for MANIFEST_DELAY
+  seconds, by a listing that finds it dirty, and by flush() at shutdown
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .directory_index import DirectoryIndex, FileInfo
+
+MANIFEST_NAME = ".index.json"
+MANIFEST_FORMAT = 1
+# Debounce of manifest writes after record() / remove()
+MANIFEST_DELAY = 2.0
+
+
+@dataclass(frozen=True)
+class ConversationMeta:
+    """Listing metadata of one conversation file"""
+    stem: str                   # conversation file name without its suffix
+    id: Optional[str]           # session.id
+    name: Optional[str]         # session.name
+    date: Optional[str]         # session.date (creation)
+    message_count: int
+    archived: bool
+    mtime: float
+    ctime: float
+    mtime_ns: int
+    size: int
+    parent: Optional[str] = None    # conversation a fork was duplicated from
+
+    @classmethod
+    def from_document(cls, info: FileInfo, document: Any) -> "ConversationMeta":
+        document = document if isinstance(document, dict) else {}
+        session = document.get("session") or {}
+        return cls(
+            stem=info.stem,
+            id=session.get("id"),
+            name=session.get("name"),
+            date=session.get("date"),
+            # Session sidecars carry the count; legacy YAML files hold the messages
+            message_count=document.get("message_count", len(document.get("messages") or [])),
+            archived=bool(session.get("archived", False)),
+            mtime=info.mtime,
+            ctime=info.ctime,
+            mtime_ns=info.mtime_ns,
+            size=info.size,
+            parent=(document.get("parent") or {}).get("id"),
+        )
+
+    def matches(self, info: FileInfo) -> bool:
+        return self.mtime_ns == info.mtime_ns and self.size == info.size
+
+
+class ConversationIndex:
+    """
+    Metadata index over a directory of conversation files (session
+    sidecars and legacy YAML)
+
+    Usage:
+        index = ConversationIndex(conversation_file_index, read_listing_document)
+        index.record(conv_file, conversation)   # after writing it
+        index.list()                            # most recently updated first
+        index.latest()                          # just the first of those
+        index.flush()                           # save the manifest now (shutdown)
+    """
+
+    def __init__(self, files: DirectoryIndex, load: Callable[[Path], Any], delay: float = MANIFEST_DELAY):
+        self.files = files
+        self._load = load
+        self.delay = delay
+        self.manifest_path = files.directory / MANIFEST_NAME
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, ConversationMeta]] = None
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._stats = {"reads": 0, "file_loads": 0, "manifest_writes": 0}
+        atexit.register(self.flush)
+
+    # ---------- manifest ----------
+
+    def _read_manifest(self) -> Dict[str, ConversationMeta]:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("format") != MANIFEST_FORMAT:
+                return {}
+            return {stem: ConversationMeta(**fields) for stem, fields in manifest["conversations"].items()}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            # Missing or unreadable: rebuilt from the files
+            return {}
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "conversations": {stem: asdict(meta) for stem, meta in self._entries.items()},
+        }
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=str(self.manifest_path.parent), prefix=f"{MANIFEST_NAME}.", suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, separators=(",", ":"), default=str)
+            os.replace(tmp_name, self.manifest_path)
+            self._stats["manifest_writes"] += 1
+        except OSError:
+            try:
+                os.unlink(tmp_name)
+            except FileNotFoundError:
+                pass
+
+    def _mark_dirty(self) -> None:
+        # Debounce: every change pushes the write back by `delay`
+        self._dirty = True
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> bool:
+        """
+        Save the manifest now if it has unsaved changes.
+
+        Returns:
+            True if it was written
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty or self._entries is None:
+                return False
+            self._write_manifest()
+            self._dirty = False
+            return True
+
+    def _entries_loaded(self) -> Dict[str, ConversationMeta]:
+        if self._entries is None:
+            self._entries = self._read_manifest()
+        return self._entries
+
+    # ---------- updates ----------
+
+    def record(self, path: Path, document: Any) -> ConversationMeta:
+        """
+        Index a conversation the caller has just written.
+
+        Args:
+            path: Conversation file
+            document: The content written to it
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+        """
+        path = Path(path)
+        with self._lock:
+            # Our own writes are visible to the listing immediately (without
+            # waiting for the watcher's event); one stat, no rescan
+            info = self.files.stat(path)
+            if info is None:
+                raise FileNotFoundError(path)
+            meta = ConversationMeta.from_document(info, document)
+            self._entries_loaded()[meta.stem] = meta
+            self._mark_dirty()
+            return meta
+
+    def remove(self, path: Path) -> None:
+        """Drop a deleted (or converted) conversation file"""
+        path = Path(path)
+        with self._lock:
+            self.files.apply_changes([path])
+            # A converted conversation keeps its entry (now from the sidecar)
+            if any(info.stem == path.stem for info in self.files.files()):
+                return
+            if self._entries_loaded().pop(path.stem, None) is not None:
+                self._mark_dirty()
+
+    # ---------- reads ----------
+
+    def list(self) -> List[ConversationMeta]:
+        """
+        All conversations, most recently updated first.
+
+        Files whose (mtime_ns, size) differ from their entry are re-read;
+        entries of files that no longer exist are dropped.
+        """
+        with self._lock:
+            self._stats["reads"] += 1
+            entries = self._entries_loaded()
+            listing = self.files.files()
+            # A conversation being migrated briefly has both files: the sidecar wins
+            sidecars = {info.stem for info in listing if info.suffix != ".yaml"}
+            listing = [info for info in listing if info.suffix != ".yaml" or info.stem not in sidecars]
+            changed = False
+
+            result = []
+            for info in listing:
+                meta = entries.get(info.stem)
+                if meta is None or not meta.matches(info):
+                    meta = self._refresh(info)
+                    if meta is None:
+                        continue
+                    changed = True
+                result.append(meta)
+
+            present = {info.stem for info in listing}
+            for stem in [stem for stem in entries if stem not in present]:
+                del entries[stem]
+                changed = True
+
+            # The listing paid for the full pass already: save pending changes too
+            self._dirty = self._dirty or changed
+            self.flush()
+            return result
+
+    def _refresh(self, info: FileInfo) -> Optional[ConversationMeta]:
+        """Re-read one changed file into its entry (None if it's gone)"""
+        try:
+            document = self._load(info.path)
+        except FileNotFoundError:
+            return None
+        self._stats["file_loads"] += 1
+        meta = self._entries_loaded()[info.stem] = ConversationMeta.from_document(info, document)
+        return meta
+
+    def latest(self) -> Optional[ConversationMeta]:
+        """
+        Most recently updated conversation, without building the listing.
+
+        Uses the directory index's newest-file pointer and validates only
+        that entry; falls back to list() while a conversation is mid-migration.
+        """
+        with self._lock:
+            info = self.files.newest()
+            if info is None:
+                return None
+            if info.suffix == ".yaml" and self.files.get(info.stem + ".json") is not None:
+                listing = self.list()
+                return listing[0] if listing else None
+            self._stats["reads"] += 1
+            meta = self._entries_loaded().get(info.stem)
+            if meta is None or not meta.matches(info):
+                meta = self._refresh(info)
+                if meta is None:
+                    listing = self.list()
+                    return listing[0] if listing else None
+                self._mark_dirty()
+            return meta
+
+    def get(self, stem: str) -> Optional[ConversationMeta]:
+        return next((meta for meta in self.list() if meta.stem == stem), None)
+
+    def __len__(self) -> int:
+        return len({info.stem for info in self.files.files()})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "conversations": len(self._entries or {}),
+            "manifest_dirty": self._dirty,
+            "manifest": str(self.manifest_path),
+        }
@@ -0,0 +1,384 @@
+"""
+Conversation Search
+
+Full-text index over the messages of every saved conversation, so
+GET /api/chat/search answers from an index instead of reading every log.
+
+- SQLite FTS5 (bm25 ranking, snippets), stored next to the conversations
+  as .search.db
+- The conversation store updates it on every write: appended messages are
+  added, compaction/migration re-indexes that conversation, deletes drop it
+- sync() reconciles it with the conversation listing (hand edits, other
+  workers, a deleted database); it's skipped while the directory digest
+  matches the last synced one
+- Index writes never fail a chat write: an error marks the index for a
+  full sync before the next search
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .conversation_index import ConversationMeta
+
+SEARCH_DB_NAME = ".search.db"
+SEARCH_FORMAT = "1"
+
+# Highlight markers around matched terms in snippets (markdown bold, as the
+# chat renders message content as markdown)
+SNIPPET_OPEN = "**"
+SNIPPET_CLOSE = "**"
+SNIPPET_TOKENS = 16
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS conversations (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    archived INTEGER NOT NULL DEFAULT 0,
+    message_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- rowid shared with message_text
+CREATE TABLE IF NOT EXISTS messages (
+    rowid INTEGER PRIMARY KEY,
+    conversation_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT,
+    timestamp TEXT,
+    UNIQUE (conversation_id, seq)
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS message_text USING fts5(
+    content,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+class SearchError(ValueError):
+    """Query with nothing to search for (HTTP 400)"""
+
+
+def query_terms(query: str) -> List[str]:
+    """
+    Lowercased words of a free-text query.
+
+    Raises:
+        SearchError: If the query has no words
+    """
+    terms = _TERM.findall(query.lower())
+    if not terms:
+        raise SearchError("Search query must contain at least one word")
+    return terms
+
+
+def build_match(query: str) -> str:
+    """
+    FTS5 MATCH expression for free text: every word must appear, the last
+    one as a prefix (search as you type). Operators and quotes in the input
+    are treated as plain text.
+
+    Raises:
+        SearchError: If the query has no words
+    """
+    quoted = [f'"{term}"' for term in query_terms(query)]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _text(content: Any) -> str:
+    if content is None:
+        return ""
+    return content if isinstance(content, str) else json.dumps(content, ensure_ascii=False, default=str)
+
+
+class ConversationSearch:
+    """
+    FTS5 index of conversation messages
+
+    Usage:
+        search = ConversationSearch(CONVERSATIONS_DIR / ".search.db")
+        store = ConversationStore(CONVERSATIONS_DIR, index, search)   # keeps it updated
+        search.sync(conversation_index.list, store.load_own, tag=files.digest())
+        search.search("system design", limit=20)
+
+    Raises:
+        sqlite3.OperationalError: If SQLite was built without FTS5
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._dirty = False
+        self._stats = {"searches": 0, "indexed_messages": 0, "reindexed": 0, "syncs": 0, "errors": 0}
+
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'format'").fetchone()
+            if row is None or row[0] != SEARCH_FORMAT:
+                conn.executescript("DELETE FROM conversations; DELETE FROM messages; DELETE FROM message_text; DELETE FROM meta;")
+                conn.execute("INSERT INTO meta (key, value) VALUES ('format', ?)", (SEARCH_FORMAT,))
+        finally:
+            conn.close()
+
+    # ---------- connections ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (sync endpoints run in a threadpool)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    @contextmanager
+    def _hook(self) -> Iterator[None]:
+        """Write on behalf of the conversation store: errors only mark the index stale"""
+        try:
+            yield
+        except sqlite3.Error as e:
+            self._dirty = True
+            self._stats["errors"] += 1
+            print(f"Warning: conversation search index not updated: {e}")
+
+    def close(self) -> None:
+        """Close this thread's database connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ---------- rows ----------
+
+    def _set_conversation(self, conn: sqlite3.Connection, conversation_id: str, session: Dict[str, Any], message_count: int) -> None:
+        conn.execute(
+            "INSERT INTO conversations (id, name, archived, message_count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, archived = excluded.archived, "
+            "message_count = excluded.message_count",
+            (conversation_id, session.get("name"), int(bool(session.get("archived", False))), message_count)
+        )
+
+    def _insert_messages(self, conn: sqlite3.Connection, conversation_id: str, start: int, messages: Iterable[Dict[str, Any]]) -> int:
+        # Positions already indexed from a write that never finished
+        self._delete_messages(conn, conversation_id, start)
+        count = 0
+        for seq, message in enumerate(messages, start=start):
+            if not isinstance(message, dict):
+                message = {"content": message}
+            cursor = conn.execute(
+                "INSERT INTO messages (conversation_id, seq, role, timestamp) VALUES (?, ?, ?, ?)",
+                (conversation_id, seq, message.get("role"), _text(message.get("timestamp")) or None)
+            )
+            conn.execute("INSERT INTO message_text (rowid, content) VALUES (?, ?)", (cursor.lastrowid, _text(message.get("content"))))
+            count += 1
+        self._stats["indexed_messages"] += count
+        return count
+
+    def _delete_messages(self, conn: sqlite3.Connection, conversation_id: str, start: int = 0) -> None:
+        conn.execute(
+            "DELETE FROM message_text WHERE rowid IN (SELECT rowid FROM messages WHERE conversation_id = ? AND seq >= ?)",
+            (conversation_id, start)
+        )
+        conn.execute("DELETE FROM messages WHERE conversation_id = ? AND seq >= ?", (conversation_id, start))
+
+    def _delete_conversation(self, conn: sqlite3.Connection, conversation_id: str) -> None:
+        self._delete_messages(conn, conversation_id)
+        conn.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
+
+    def _replace(
+        self,
+        conn: sqlite3.Connection,
+        conversation_id: str,
+        session: Dict[str, Any],
+        messages: List[Dict[str, Any]],
+        start: int = 0
+    ) -> None:
+        self._delete_conversation(conn, conversation_id)
+        self._insert_messages(conn, conversation_id, start, messages)
+        self._set_conversation(conn, conversation_id, session, start + len(messages))
+        self._stats["reindexed"] += 1
+
+    # ---------- store hooks ----------
+
+    def add(self, conversation_id: str, session: Dict[str, Any], start: int, messages: List[Dict[str, Any]]) -> None:
+        """Index messages appended at position `start` of a conversation"""
+        with self._hook(), self._write() as conn:
+            self._insert_messages(conn, conversation_id, start, messages)
+            self._set_conversation(conn, conversation_id, session, start + len(messages))
+
+    def replace(self, conversation_id: str, session: Dict[str, Any], messages: List[Dict[str, Any]], start: int = 0) -> None:
+        """
+        Re-index a whole conversation (created, compacted or migrated).
+
+        A fork passes only its own messages, starting at position `start`;
+        the ones it shares are found under the original conversation.
+        """
+        with self._hook(), self._write() as conn:
+            self._replace(conn, conversation_id, session, messages, start)
+
+    def update_session(self, conversation_id: str, session: Dict[str, Any]) -> None:
+        """Renamed or (un)archived - messages are unchanged"""
+        with self._hook(), self._write() as conn:
+            conn.execute(
+                "UPDATE conversations SET name = ?, archived = ? WHERE id = ?",
+                (session.get("name"), int(bool(session.get("archived", False))), conversation_id)
+            )
+
+    def remove(self, conversation_id: str) -> None:
+        with self._hook(), self._write() as conn:
+            self._delete_conversation(conn, conversation_id)
+
+    # ---------- reconciliation ----------
+
+    def sync(
+        self,
+        conversations: Callable[[], Iterable[ConversationMeta]],
+        load: Callable[[str], Dict[str, Any]],
+        tag: Optional[str] = None
+    ) -> int:
+        """
+        Bring the index in line with the conversation listing.
+
+        Conversations whose message count differs from the indexed one are
+        re-indexed (load(stem) -> {"session", "messages", "start"}); indexed
+        conversations missing from the listing are dropped.
+
+        Args:
+            conversations: Returns the current listing (ConversationIndex.list)
+            load: Loads a conversation's own messages by id
+                (ConversationStore.load_own)
+            tag: Listing version (directory digest); when it matches the
+                last synced tag the listing isn't compared at all
+
+        Returns:
+            Number of conversations re-indexed
+        """
+        if tag is not None and not self._dirty:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'synced'").fetchone()
+            if row is not None and row[0] == tag:
+                return 0
+
+        self._dirty = False
+        self._stats["syncs"] += 1
+        reindexed = 0
+        present = set()
+        with self._write() as conn:
+            indexed = {
+                row[0]: (row[1], bool(row[2]), row[3])
+                for row in conn.execute("SELECT id, name, archived, message_count FROM conversations")
+            }
+            for meta in conversations():
+                present.add(meta.stem)
+                current = indexed.get(meta.stem)
+                if current is not None and current[2] == meta.message_count:
+                    if current[:2] != (meta.name, meta.archived):
+                        conn.execute(
+                            "UPDATE conversations SET name = ?, archived = ? WHERE id = ?",
+                            (meta.name, int(meta.archived), meta.stem)
+                        )
+                    continue
+                try:
+                    document = load(meta.stem)
+                except FileNotFoundError:
+                    continue
+                self._replace(
+                    conn,
+                    meta.stem,
+                    document.get("session") or {},
+                    document.get("messages") or [],
+                    document.get("start", 0)
+                )
+                reindexed += 1
+            for conversation_id in set(indexed) - present:
+                self._delete_conversation(conn, conversation_id)
+            if tag is not None:
+                conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('synced', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (tag,)
+                )
+        return reindexed
+
+    # ---------- queries ----------
+
+    def search(self, query: str, limit: int = 20, include_archived: bool = True) -> List[Dict[str, Any]]:
+        """
+        Messages matching every word of `query`, best bm25 score first.
+
+        Conversations in cold storage aren't indexed (see
+        ConversationArchive.search); include_archived covers the ones
+        flagged archived in place.
+
+        Returns:
+            [{"conversation_id", "conversation_name", "archived", "message_id"
+              (position in the conversation), "role", "timestamp", "snippet",
+              "score"}]
+
+        Raises:
+            SearchError: If the query has no words
+        """
+        match = build_match(query)
+        self._stats["searches"] += 1
+        rows = self._conn.execute(
+            "SELECT m.conversation_id, c.name, c.archived, m.seq, m.role, m.timestamp, "
+            "       snippet(message_text, 0, ?, ?, '...', ?), message_text.rank "
+            "FROM message_text "
+            "JOIN messages m ON m.rowid = message_text.rowid "
+            "JOIN conversations c ON c.id = m.conversation_id "
+            "WHERE message_text MATCH ? AND (? OR c.archived = 0) "
+            "ORDER BY message_text.rank LIMIT ?",
+            (SNIPPET_OPEN, SNIPPET_CLOSE, SNIPPET_TOKENS, match, int(include_archived), limit)
+        ).fetchall()
+        return [
+            {
+                "conversation_id": conversation_id,
+                "conversation_name": name,
+                "archived": bool(archived),
+                "message_id": seq,
+                "role": role,
+                "timestamp": timestamp,
+                "snippet": snippet,
+                # bm25 is lower-is-better; flip so higher means more relevant
+                "score": round(-rank, 6),
+            }
+            for conversation_id, name, archived, seq, role, timestamp, snippet, rank in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn
+        return {
+            **self._stats,
+            "db_path": str(self.db_path),
+            "conversations": conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0],
+            "messages": conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0],
+        }
@@ -0,0 +1,892 @@
+"""
+Conversation Store
+
+Append-only storage for chat conversations:
+
+- conv_<id>.jsonl   one JSON message per line, only ever appended to
+- conv_<id>.json    small session sidecar: session fields, message count
+                    and the log size it accounts for
+
+A chat turn appends two lines and rewrites the sidecar, so its cost no
+longer grows with the conversation. tail() and page() read a window of
+messages by seeking back from the end of the log (or from a cursor's byte
+offset), so opening a long chat doesn't read all of it.
+
+duplicate() forks a conversation copy-on-write: the fork's sidecar points
+at the original's log up to its current size (the fork point) and its own
+log starts empty. Reads stitch the two; compacting or deleting the original
+first flattens its forks (copies the shared messages into them).
+
+With a ConversationArchive attached, archive() moves a conversation into
+compressed bundles outside the directory; reads decompress it on demand
+and restore() (or the next append) moves it back.
+
+With a ConversationSearch attached, every write also updates the
+full-text index (appended messages only; compaction and migration
+re-index the conversation).
+
+If a log stops matching its sidecar (a crash between the two writes, a torn
+last line, a hand edit), the next write compacts it: the log is rewritten
+with its valid lines only and the sidecar is recounted.
+
+Conversations still stored as a single YAML file (conv_<id>.yaml) are read
+as-is and converted on their first write; scripts/conversation_logs.py
+converts them all at once.
+"""
+
+import base64
+import binascii
+import json
+import os
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from .conversation_archive import ConversationArchive
+from .conversation_index import ConversationIndex
+from .conversation_search import ConversationSearch
+from .document_store import atomic_write_bytes, file_lock, yaml_snapshot
+
+LOG_SUFFIX = ".jsonl"
+SESSION_SUFFIX = ".json"
+LEGACY_SUFFIX = ".yaml"
+SESSION_FORMAT = 1
+
+# Bytes read per step when scanning the log backwards
+TAIL_BLOCK_SIZE = 64 * 1024
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """One log line (newlines inside strings are escaped by JSON)"""
+    return json.dumps(message, ensure_ascii=False, separators=(",", ":"), default=str).encode('utf-8') + b"\n"
+
+
+def decode_lines(raw: bytes) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Messages from log bytes.
+
+    Returns:
+        (messages, number of invalid lines skipped - torn or corrupt)
+    """
+    messages, invalid = [], 0
+    for line in raw.split(b"\n"):
+        if not line.strip():
+            continue
+        try:
+            message = json.loads(line)
+        except ValueError:
+            invalid += 1
+            continue
+        if isinstance(message, dict):
+            messages.append(message)
+        else:
+            invalid += 1
+    return messages, invalid
+
+
+class CursorError(ValueError):
+    """Malformed or foreign pagination cursor (HTTP 400)"""
+
+
+def encode_cursor(seq: int, offset: Optional[int] = None, inode: Optional[int] = None) -> str:
+    """
+    Opaque position before message `seq`.
+
+    The byte offset lets the next page start reading right there; the log's
+    inode tells whether the offset is still valid (compaction replaces the
+    file).
+    """
+    raw = json.dumps({"s": seq, "o": offset, "i": inode}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(payload.get("s"), int) or payload["s"] < 0:
+            raise ValueError("seq")
+        if payload.get("o") is not None and (not isinstance(payload["o"], int) or payload["o"] < 0):
+            raise ValueError("offset")
+    except (binascii.Error, ValueError, AttributeError, TypeError):
+        raise CursorError("Invalid cursor")
+    return payload
+
+
+def _read_lines_before(f: BinaryIO, end: int, count: int) -> Tuple[List[bytes], int]:
+    """
+    Up to `count` complete lines ending at byte `end`, read backwards in blocks.
+
+    Returns:
+        (lines without their newlines, byte offset where the first one starts)
+    """
+    if count <= 0 or end <= 0:
+        return [], end
+    position = end
+    buffer = b""
+    # One extra newline: the first line in the buffer may be partial
+    while position > 0 and buffer.count(b"\n") <= count:
+        step = min(TAIL_BLOCK_SIZE, position)
+        position -= step
+        f.seek(position)
+        buffer = f.read(step) + buffer
+
+    lines = buffer.split(b"\n")
+    if lines and lines[-1] == b"":
+        lines.pop()  # after the last newline
+    if position > 0:
+        lines = lines[1:]  # partial (belongs to an older message)
+    lines = lines[-count:]
+    return lines, end - sum(len(line) + 1 for line in lines)
+
+
+@dataclass(frozen=True)
+class LogSegment:
+    """The part of one log file that belongs to a conversation"""
+    conversation_id: str   # owner of the log file
+    path: Path
+    end: int               # bytes of the log that belong to the conversation
+    start: int             # position of its first message in the conversation
+    count: int             # messages in those bytes
+
+
+def read_listing_document(path: Path) -> Dict[str, Any]:
+    """
+    Session sidecar (or legacy YAML conversation) for the conversation index.
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    path = Path(path)
+    if path.suffix == LEGACY_SUFFIX:
+        return yaml_snapshot.load(path) or {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class ConversationStore:
+    """
+    JSONL conversation logs with session sidecars
+
+    Usage:
+        store = ConversationStore(CONVERSATIONS_DIR, conversation_index)
+        store.create("conv_1", {"id": "conv_1", "name": "Chat 1", ...})
+        store.append("conv_1", [user_message, assistant_message])
+        store.tail("conv_1", 10)     # last 10 messages
+        store.load("conv_1")         # {"session": {...}, "messages": [...]}
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        index: Optional[ConversationIndex] = None,
+        search: Optional[ConversationSearch] = None,
+        cold: Optional[ConversationArchive] = None
+    ):
+        self.directory = Path(directory)
+        self.index = index
+        self.search = search
+        self.cold = cold
+        self._stats = {"appends": 0, "tails": 0, "pages": 0, "full_loads": 0, "compactions": 0, "migrations": 0, "forks": 0, "flattens": 0, "archived": 0, "restored": 0}
+
+    # ---------- paths ----------
+
+    def log_path(self, conversation_id: str) -> Path:
+        return self.directory / f"{conversation_id}{LOG_SUFFIX}"
+
+    def session_path(self, conversation_id: str) -> Path:
+        return self.directory / f"{conversation_id}{SESSION_SUFFIX}"
+
+    def legacy_path(self, conversation_id: str) -> Path:
+        return self.directory / f"{conversation_id}{LEGACY_SUFFIX}"
+
+    def is_legacy(self, conversation_id: str) -> bool:
+        return not self.session_path(conversation_id).exists() and self.legacy_path(conversation_id).exists()
+
+    def is_archived(self, conversation_id: str) -> bool:
+        """Stored in the compressed archive (and not in the conversations directory)"""
+        return (
+            self.cold is not None
+            and not self.session_path(conversation_id).exists()
+            and not self.legacy_path(conversation_id).exists()
+            and conversation_id in self.cold
+        )
+
+    def exists(self, conversation_id: str) -> bool:
+        return (
+            self.session_path(conversation_id).exists()
+            or self.legacy_path(conversation_id).exists()
+            or self.is_archived(conversation_id)
+        )
+
+    # ---------- sidecar ----------
+
+    def _read_sidecar(self, conversation_id: str) -> Dict[str, Any]:
+        with open(self.session_path(conversation_id), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_sidecar(
+        self,
+        conversation_id: str,
+        session: Dict[str, Any],
+        message_count: int,
+        log_bytes: int,
+        parent: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        sidecar = {
+            "format": SESSION_FORMAT,
+            "session": session,
+            "message_count": message_count,
+            "log_bytes": log_bytes,
+        }
+        if parent:
+            sidecar["parent"] = parent
+        path = self.session_path(conversation_id)
+        atomic_write_bytes(path, json.dumps(sidecar, ensure_ascii=False, indent=2, default=str).encode('utf-8'))
+        if self.index is not None:
+            self.index.record(path, sidecar)
+        return sidecar
+
+    def session(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Session fields of a conversation.
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        if self.is_legacy(conversation_id):
+            return (yaml_snapshot.load(self.legacy_path(conversation_id)) or {}).get("session", {})
+        if self.is_archived(conversation_id):
+            return self.cold.get(conversation_id)["session"]
+        return self._read_sidecar(conversation_id)["session"]
+
+    # ---------- reads ----------
+
+    def load(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Full conversation in the original document shape.
+
+        Returns:
+            {"session": {...}, "messages": [...]}
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        self._stats["full_loads"] += 1
+        if self.is_legacy(conversation_id):
+            document = yaml_snapshot.load(self.legacy_path(conversation_id)) or {}
+            return {"session": document.get("session", {}), "messages": document.get("messages") or []}
+        if self.is_archived(conversation_id):
+            # Decompresses this conversation's member only; it stays archived
+            messages, _ = decode_lines(self.cold.read(conversation_id))
+            return {"session": self.cold.get(conversation_id)["session"], "messages": messages}
+
+        sidecar = self._read_sidecar(conversation_id)
+        messages = []
+        for segment in self._segments(conversation_id, sidecar):
+            messages.extend(decode_lines(self._read_segment(segment))[0])
+        return {"session": sidecar["session"], "messages": messages}
+
+    def load_own(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Messages stored in the conversation's own log - a fork's inherited
+        messages are left out.
+
+        Returns:
+            {"session": {...}, "messages": [...], "start": position of the first one}
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        if self.is_legacy(conversation_id) or self.is_archived(conversation_id):
+            return {**self.load(conversation_id), "start": 0}
+        sidecar = self._read_sidecar(conversation_id)
+        segment = self._segments(conversation_id, sidecar, inherited=False)[-1]
+        messages, _ = decode_lines(self._read_segment(segment))
+        return {"session": sidecar["session"], "messages": messages, "start": segment.start}
+
+    # ---------- forks ----------
+
+    @staticmethod
+    def _inherited(sidecar: Dict[str, Any]) -> int:
+        """Number of messages a fork shares with its parent"""
+        parent = sidecar.get("parent")
+        return parent["message_count"] if parent else 0
+
+    def _segments(self, conversation_id: str, sidecar: Dict[str, Any], inherited: bool = True) -> List[LogSegment]:
+        """
+        Log ranges holding a conversation's messages, oldest first: for a
+        fork, its parents' logs up to each fork point, then its own log.
+        """
+        segments = []
+        end, count = sidecar["log_bytes"], sidecar["message_count"]
+        while True:
+            prefix = self._inherited(sidecar)
+            segments.append(LogSegment(conversation_id, self.log_path(conversation_id), end, prefix, count - prefix))
+            parent = sidecar.get("parent")
+            if not parent or not inherited:
+                break
+            conversation_id = parent["id"]
+            sidecar = self._read_sidecar(conversation_id)
+            end, count = parent["log_bytes"], parent["message_count"]
+        segments.reverse()
+        return segments
+
+    @staticmethod
+    def _read_segment(segment: LogSegment) -> bytes:
+        try:
+            with open(segment.path, 'rb') as f:
+                return f.read(segment.end)
+        except FileNotFoundError:
+            return b""
+
+    def tail(self, conversation_id: str, count: int) -> List[Dict[str, Any]]:
+        """
+        Last `count` messages, read backwards from the end of the log.
+
+        Only the blocks holding those messages are read, however long the
+        conversation is.
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        self._stats["tails"] += 1
+        if count <= 0:
+            return []
+        return self.page(conversation_id, count)["messages"]
+
+    def page(self, conversation_id: str, limit: int, before: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One window of a conversation, newest messages first in page order.
+
+        Args:
+            conversation_id: Conversation to read
+            limit: Maximum number of messages
+            before: next_cursor of the previously returned (newer) page;
+                None for the latest messages
+
+        Returns:
+            {"session", "messages" (chronological), "message_count" (total),
+             "next_cursor" (older messages; None at the start)}
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+            CursorError: If `before` isn't a cursor issued for this conversation
+        """
+        cursor = decode_cursor(before) if before is not None else None
+        self._stats["pages"] += 1
+
+        if self.is_legacy(conversation_id) or self.is_archived(conversation_id):
+            document = self.load(conversation_id)
+            messages = document["messages"]
+            end = min(cursor["s"], len(messages)) if cursor else len(messages)
+            start = max(0, end - limit)
+            return {
+                "session": document["session"],
+                "messages": messages[start:end],
+                "message_count": len(messages),
+                "next_cursor": encode_cursor(start) if start > 0 else None,
+            }
+
+        sidecar = self._read_sidecar(conversation_id)
+        total = sidecar["message_count"]
+        segments = self._segments(conversation_id, sidecar)
+
+        with ExitStack() as stack:
+            opened: Dict[int, Tuple[Optional[BinaryIO], Optional[int], int]] = {}
+
+            def open_segment(k: int) -> Tuple[Optional[BinaryIO], Optional[int], int]:
+                """(file, inode, readable end) of segment k"""
+                if k not in opened:
+                    try:
+                        f = stack.enter_context(open(segments[k].path, 'rb'))
+                    except FileNotFoundError:
+                        opened[k] = (None, None, 0)
+                    else:
+                        stat = os.fstat(f.fileno())
+                        # The sidecar's size matches its message count (appends may be in flight)
+                        opened[k] = (f, stat.st_ino, min(segments[k].end, stat.st_size))
+                return opened[k]
+
+            def lines_before(k: int, end: int, count: int) -> Tuple[List[bytes], int]:
+                f, _, _ = open_segment(k)
+                return _read_lines_before(f, end, count) if f is not None else ([], 0)
+
+            k = len(segments) - 1
+            if cursor is None:
+                end_seq, offset = total, open_segment(k)[2]
+            else:
+                end_seq = min(cursor["s"], total)
+                located = None
+                if cursor.get("o") is not None:
+                    for index, segment in enumerate(segments):
+                        _, inode, readable = open_segment(index)
+                        if inode == cursor.get("i") and cursor["o"] <= readable and segment.start <= end_seq <= segment.start + segment.count:
+                            located = index
+                            break
+                if located is not None:
+                    k, offset = located, cursor["o"]
+                else:
+                    # Log rewritten since the cursor was issued (compaction):
+                    # locate the position by message number instead
+                    while k > 0 and segments[k].start >= end_seq:
+                        k -= 1
+                    segment = segments[k]
+                    _, offset = lines_before(k, open_segment(k)[2], segment.start + segment.count - end_seq)
+
+            lines: List[bytes] = []
+            while True:
+                found, offset = lines_before(k, offset, limit - len(lines))
+                lines = found + lines
+                if len(lines) >= limit or k == 0:
+                    break
+                # Continue in the parent's log, before the fork point
+                k -= 1
+                offset = open_segment(k)[2]
+
+            if offset > 0:
+                next_position = (offset, open_segment(k)[1])
+            elif k > 0:
+                _, inode, readable = open_segment(k - 1)
+                next_position = (readable, inode)
+            else:
+                next_position = None
+
+        messages, _ = decode_lines(b"\n".join(lines))
+        start_seq = max(0, end_seq - len(lines))
+        return {
+            "session": sidecar["session"],
+            "messages": messages,
+            "message_count": total,
+            "next_cursor": encode_cursor(start_seq, *next_position) if next_position and start_seq > 0 else None,
+        }
+
+    # ---------- writes ----------
+
+    def create(
+        self,
+        conversation_id: str,
+        session: Dict[str, Any],
+        messages: Iterable[Dict[str, Any]] = ()
+    ) -> Dict[str, Any]:
+        """
+        Create a conversation (replacing any existing one with that id).
+
+        Returns:
+            The session sidecar
+        """
+        messages = list(messages)
+        raw = b"".join(encode_message(message) for message in messages)
+        with file_lock(self.session_path(conversation_id)):
+            self._release_forks_unlocked(conversation_id)
+            atomic_write_bytes(self.log_path(conversation_id), raw)
+            sidecar = self._write_sidecar(conversation_id, dict(session), raw.count(b"\n"), len(raw))
+            if self.search is not None:
+                self.search.replace(conversation_id, sidecar["session"], messages)
+            return sidecar
+
+    def append(
+        self,
+        conversation_id: str,
+        messages: List[Dict[str, Any]],
+        session: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Append messages to a conversation's log.
+
+        Args:
+            conversation_id: Conversation to append to
+            messages: Messages in order
+            session: Session fields to create the conversation with if it
+                doesn't exist yet (otherwise a missing conversation raises)
+
+        Returns:
+            The updated session sidecar
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist and no
+                session was given
+        """
+        raw = b"".join(encode_message(message) for message in messages)
+        with file_lock(self.session_path(conversation_id)):
+            if self.is_legacy(conversation_id):
+                self._migrate_unlocked(conversation_id)
+            elif self.is_archived(conversation_id):
+                self._restore_unlocked(conversation_id)
+            try:
+                sidecar = self._read_sidecar(conversation_id)
+            except FileNotFoundError:
+                if session is None:
+                    raise
+                atomic_write_bytes(self.log_path(conversation_id), raw)
+                sidecar = self._write_sidecar(conversation_id, dict(session), raw.count(b"\n"), len(raw))
+                if self.search is not None:
+                    self.search.replace(conversation_id, sidecar["session"], messages)
+                return sidecar
+
+            log_path = self.log_path(conversation_id)
+            try:
+                log_bytes = os.path.getsize(log_path)
+            except FileNotFoundError:
+                log_bytes = 0
+            if log_bytes != sidecar.get("log_bytes"):
+                # Torn write or outside edit: rebuild before appending
+                sidecar = self._compact_unlocked(conversation_id, sidecar)
+
+            fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, raw)
+            finally:
+                os.close(fd)
+
+            self._stats["appends"] += 1
+            if self.search is not None:
+                self.search.add(conversation_id, sidecar["session"], sidecar["message_count"], messages)
+            return self._write_sidecar(
+                conversation_id,
+                sidecar["session"],
+                sidecar["message_count"] + len(messages),
+                sidecar["log_bytes"] + len(raw),
+                sidecar.get("parent"),
+            )
+
+    def update_session(self, conversation_id: str, **changes: Any) -> Dict[str, Any]:
+        """
+        Change session fields (name, archived, ...) - the log isn't touched.
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        with file_lock(self.session_path(conversation_id)):
+            if self.is_archived(conversation_id):
+                # Renaming an archived chat doesn't bring it back
+                entry = self.cold.update_session(conversation_id, **changes)
+                return {"session": entry["session"], "message_count": entry["message_count"]}
+            if self.is_legacy(conversation_id):
+                self._migrate_unlocked(conversation_id)
+            sidecar = self._read_sidecar(conversation_id)
+            sidecar = self._write_sidecar(
+                conversation_id,
+                {**sidecar["session"], **changes},
+                sidecar["message_count"],
+                sidecar["log_bytes"],
+                sidecar.get("parent"),
+            )
+            if self.search is not None:
+                self.search.update_session(conversation_id, sidecar["session"])
+            return sidecar
+
+    def delete(self, conversation_id: str) -> None:
+        """
+        Delete a conversation's files.
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        if not self.exists(conversation_id):
+            raise FileNotFoundError(self.session_path(conversation_id))
+        # The lock file stays: a worker already waiting on it would otherwise
+        # hold a lock on an unlinked inode while the next one locks a new file
+        with file_lock(self.session_path(conversation_id)):
+            if self.is_archived(conversation_id):
+                self.cold.remove(conversation_id)
+            else:
+                self._release_forks_unlocked(conversation_id)
+                self._remove_files_unlocked(conversation_id)
+
+    def _remove_files_unlocked(self, conversation_id: str) -> None:
+        session_path = self.session_path(conversation_id)
+        legacy_path = self.legacy_path(conversation_id)
+        for path in (session_path, self.log_path(conversation_id), legacy_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        yaml_snapshot.remove(legacy_path)
+        if self.index is not None:
+            self.index.remove(session_path)
+            self.index.remove(legacy_path)
+        if self.search is not None:
+            self.search.remove(conversation_id)
+
+    # ---------- cold storage ----------
+
+    def archive(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Move a conversation into the compressed archive (marked archived).
+
+        Its files leave the conversations directory and its messages leave
+        the full-text index; the archive's own index keeps its session and
+        message count, so listings and name search still include it.
+        load(), page() and session() still read it, and restore() - or
+        appending to it - brings it back.
+
+        Returns:
+            Its archive index entry
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+            ValueError: If the store has no archive
+        """
+        if self.cold is None:
+            raise ValueError("No conversation archive configured")
+        session_path = self.session_path(conversation_id)
+        with file_lock(session_path):
+            if self.is_archived(conversation_id):
+                return self.cold.get(conversation_id)
+            if not self.exists(conversation_id):
+                raise FileNotFoundError(session_path)
+            # Forks point into this log; the archived copy is self-contained
+            self._release_forks_unlocked(conversation_id)
+            document = self.load(conversation_id)
+            raw = b"".join(encode_message(message) for message in document["messages"])
+            entry = self.cold.put(
+                conversation_id,
+                {**document["session"], "archived": True},
+                len(document["messages"]),
+                raw,
+            )
+            self._remove_files_unlocked(conversation_id)
+            self._stats["archived"] += 1
+        return entry
+
+    def _restore_unlocked(self, conversation_id: str) -> Dict[str, Any]:
+        entry = self.cold.get(conversation_id)
+        if entry is None:
+            raise FileNotFoundError(self.session_path(conversation_id))
+        raw = self.cold.read(conversation_id)
+        session = {**entry["session"], "archived": False}
+        atomic_write_bytes(self.log_path(conversation_id), raw)
+        sidecar = self._write_sidecar(conversation_id, session, entry["message_count"], len(raw))
+        if self.search is not None:
+            self.search.replace(conversation_id, session, decode_lines(raw)[0])
+        self.cold.remove(conversation_id)
+        self._stats["restored"] += 1
+        return sidecar
+
+    def restore(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Bring an archived conversation back into the conversations directory
+        (unarchived).
+
+        Returns:
+            Its session sidecar
+
+        Raises:
+            FileNotFoundError: If the conversation isn't archived
+        """
+        with file_lock(self.session_path(conversation_id)):
+            if self.cold is None or not self.is_archived(conversation_id):
+                raise FileNotFoundError(self.session_path(conversation_id))
+            return self._restore_unlocked(conversation_id)
+
+    # ---------- maintenance ----------
+
+    def _compact_unlocked(self, conversation_id: str, sidecar: Dict[str, Any]) -> Dict[str, Any]:
+        # Forks point into this log by byte offset
+        self._release_forks_unlocked(conversation_id)
+        try:
+            with open(self.log_path(conversation_id), 'rb') as f:
+                messages, _ = decode_lines(f.read())
+        except FileNotFoundError:
+            messages = []
+        raw = b"".join(encode_message(message) for message in messages)
+        atomic_write_bytes(self.log_path(conversation_id), raw)
+        self._stats["compactions"] += 1
+        inherited = self._inherited(sidecar)
+        if self.search is not None:
+            self.search.replace(conversation_id, sidecar["session"], messages, start=inherited)
+        return self._write_sidecar(
+            conversation_id,
+            sidecar["session"],
+            inherited + len(messages),
+            len(raw),
+            sidecar.get("parent"),
+        )
+
+    def compact(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Rewrite a log with its valid lines only and recount the sidecar.
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        with file_lock(self.session_path(conversation_id)):
+            return self._compact_unlocked(conversation_id, self._read_sidecar(conversation_id))
+
+    def needs_compaction(self, conversation_id: str) -> bool:
+        """True if the log doesn't match its sidecar or has invalid lines"""
+        sidecar = self._read_sidecar(conversation_id)
+        try:
+            with open(self.log_path(conversation_id), 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b""
+        messages, invalid = decode_lines(raw)
+        return (
+            bool(invalid)
+            or len(raw) != sidecar.get("log_bytes")
+            or self._inherited(sidecar) + len(messages) != sidecar.get("message_count")
+        )
+
+    def duplicate(self, conversation_id: str, new_id: str, session: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Fork a conversation without copying its messages.
+
+        The new conversation references the original's log up to its current
+        end and stores only the messages appended to it afterwards; reads
+        stitch both. Forks of forks chain the same way.
+
+        Returns:
+            The new conversation's session sidecar
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        if self.is_archived(conversation_id):
+            # The copy doesn't keep the archived original busy
+            return self.create(new_id, session, self.load(conversation_id)["messages"])
+
+        with file_lock(self.session_path(conversation_id)):
+            if self.is_legacy(conversation_id):
+                self._migrate_unlocked(conversation_id)
+            sidecar = self._read_sidecar(conversation_id)
+            try:
+                log_bytes = os.path.getsize(self.log_path(conversation_id))
+            except FileNotFoundError:
+                log_bytes = 0
+            if log_bytes != sidecar.get("log_bytes"):
+                sidecar = self._compact_unlocked(conversation_id, sidecar)
+
+            # The original stays locked until the fork exists, so it can't be
+            # compacted or deleted without the fork being released first
+            parent = {
+                "id": conversation_id,
+                "message_count": sidecar["message_count"],
+                "log_bytes": sidecar["log_bytes"],
+            }
+            with file_lock(self.session_path(new_id)):
+                atomic_write_bytes(self.log_path(new_id), b"")
+                forked = self._write_sidecar(new_id, dict(session), sidecar["message_count"], 0, parent)
+            if self.search is not None:
+                # Inherited messages stay indexed under the original only
+                self.search.replace(new_id, forked["session"], [], start=sidecar["message_count"])
+            self._stats["forks"] += 1
+            return forked
+
+    def forks(self, conversation_id: str) -> List[str]:
+        """
+        Conversations forked directly from this one.
+
+        Rescans the directory first: a fork another worker has just created
+        may not have reached this process's watched listing yet.
+        """
+        if self.index is not None:
+            self.index.files.rescan()
+            candidates = [meta.stem for meta in self.index.list() if meta.parent == conversation_id]
+        else:
+            candidates = self.ids()
+        forks = []
+        for candidate in candidates:
+            try:
+                parent = self._read_sidecar(candidate).get("parent")
+            except FileNotFoundError:
+                continue
+            if parent and parent["id"] == conversation_id:
+                forks.append(candidate)
+        return forks
+
+    def _flatten_unlocked(self, conversation_id: str, sidecar: Dict[str, Any]) -> Dict[str, Any]:
+        if not sidecar.get("parent"):
+            return sidecar
+        # Its own forks point into the log about to be rewritten
+        self._release_forks_unlocked(conversation_id)
+        messages = []
+        for segment in self._segments(conversation_id, sidecar):
+            messages.extend(decode_lines(self._read_segment(segment))[0])
+        raw = b"".join(encode_message(message) for message in messages)
+        atomic_write_bytes(self.log_path(conversation_id), raw)
+        if self.search is not None:
+            self.search.replace(conversation_id, sidecar["session"], messages)
+        self._stats["flattens"] += 1
+        return self._write_sidecar(conversation_id, sidecar["session"], len(messages), len(raw))
+
+    def _release_forks_unlocked(self, conversation_id: str) -> None:
+        """Give every fork of a conversation its own copy of the shared messages"""
+        for fork_id in self.forks(conversation_id):
+            with file_lock(self.session_path(fork_id)):
+                try:
+                    fork = self._read_sidecar(fork_id)
+                except FileNotFoundError:
+                    continue
+                if (fork.get("parent") or {}).get("id") == conversation_id:
+                    self._flatten_unlocked(fork_id, fork)
+
+    def flatten(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Copy a fork's inherited messages into its own log, detaching it from
+        the conversation it was duplicated from (no-op for other conversations).
+
+        Raises:
+            FileNotFoundError: If the conversation doesn't exist
+        """
+        with file_lock(self.session_path(conversation_id)):
+            return self._flatten_unlocked(conversation_id, self._read_sidecar(conversation_id))
+
+    def _migrate_unlocked(self, conversation_id: str, keep_legacy: bool = False) -> Dict[str, Any]:
+        legacy_path = self.legacy_path(conversation_id)
+        document = yaml_snapshot.load(legacy_path) or {}
+        session = document.get("session") or {"id": conversation_id, "date": datetime.now().isoformat()}
+        messages = document.get("messages") or []
+        raw = b"".join(encode_message(message) for message in messages)
+
+        atomic_write_bytes(self.log_path(conversation_id), raw)
+        sidecar = self._write_sidecar(conversation_id, session, raw.count(b"\n"), len(raw))
+        if self.search is not None:
+            self.search.replace(conversation_id, session, messages)
+        if not keep_legacy:
+            legacy_path.unlink()
+            yaml_snapshot.remove(legacy_path)
+            if self.index is not None:
+                self.index.remove(legacy_path)
+        self._stats["migrations"] += 1
+        return sidecar
+
+    def migrate(self, conversation_id: str, keep_legacy: bool = False) -> Dict[str, Any]:
+        """
+        Convert a YAML conversation to log + sidecar.
+
+        Args:
+            conversation_id: Conversation stored as conv_<id>.yaml
+            keep_legacy: Leave the YAML file in place (it's ignored once the
+                sidecar exists)
+
+        Raises:
+            FileNotFoundError: If there's no YAML file for the conversation
+        """
+        with file_lock(self.session_path(conversation_id)):
+            if not self.legacy_path(conversation_id).exists():
+                raise FileNotFoundError(self.legacy_path(conversation_id))
+            return self._migrate_unlocked(conversation_id, keep_legacy=keep_legacy)
+
+    def legacy_ids(self) -> List[str]:
+        """Conversations still stored as YAML only"""
+        return sorted(
+            path.stem for path in self.directory.glob(f"*{LEGACY_SUFFIX}")
+            if not path.name.startswith('.') and not self.session_path(path.stem).exists()
+        )
+
+    def ids(self) -> List[str]:
+        """Conversations stored as log + sidecar"""
+        return sorted(
+            path.stem for path in self.directory.glob(f"*{SESSION_SUFFIX}")
+            if not path.name.startswith('.')
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "directory": str(self.directory),
+            "archive": self.cold.stats() if self.cold is not None else None,
+        }
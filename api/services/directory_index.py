@@ -0,0 +1,197 @@
+"""
+Directory Index
+
+In-memory listing (name, size, mtime) of the files in one directory that
+match a set of glob patterns - generated CVs, saved conversations.
+
+- Without a watcher every read rescans the directory (glob + stat, the
+  cost the endpoints paid before)
+- With the file watcher attached, change events update single entries and
+  reads never touch the filesystem
+"""
+
+import fnmatch
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class FileInfo:
+    """Stat snapshot of one indexed file"""
+    name: str
+    path: Path
+    size: int
+    mtime: float
+    mtime_ns: int
+    ctime: float
+
+    @property
+    def stem(self) -> str:
+        return Path(self.name).stem
+
+    @property
+    def suffix(self) -> str:
+        return Path(self.name).suffix
+
+
+class DirectoryIndex:
+    """
+    Watched listing of matching files in one directory
+
+    Usage:
+        cvs = DirectoryIndex(CV_OUTPUT_DIR, ("cv_*.pdf", "cv_*.html", "cv_*.md"))
+        watcher.subscribe(cvs.directory, cvs.apply_changes, cvs.set_watched)
+        cvs.files()            # newest first
+        cvs.digest()           # content tag for ETags
+    """
+
+    def __init__(self, directory: Path, patterns: Sequence[str]):
+        # Resolved, to match the paths the watcher reports
+        self.directory = Path(directory).resolve()
+        self.patterns = tuple(patterns)
+        self._lock = threading.RLock()
+        self._files: Dict[str, FileInfo] = {}
+        self._watched = False
+        self._stale = True
+        self._digest: Optional[str] = None
+        self._ordered: Optional[List[FileInfo]] = None
+        # Most recently modified file, kept across events (None: recompute)
+        self._newest: Optional[FileInfo] = None
+        self._stats = {"rescans": 0, "events": 0, "reads": 0}
+
+    def matches(self, name: str) -> bool:
+        # Hidden files (locks, temp files, snapshots, manifests) are never listed
+        return not name.startswith('.') and any(fnmatch.fnmatchcase(name, pattern) for pattern in self.patterns)
+
+    @staticmethod
+    def _info(path: Path) -> Optional[FileInfo]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        return FileInfo(path.name, path, stat.st_size, stat.st_mtime, stat.st_mtime_ns, stat.st_ctime)
+
+    def _changed(self) -> None:
+        self._digest = None
+        self._ordered = None
+
+    def _rescan(self) -> None:
+        files: Dict[str, FileInfo] = {}
+        if self.directory.is_dir():
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if self.matches(entry.name):
+                        info = self._info(Path(entry.path))
+                        if info is not None:
+                            files[info.name] = info
+        if files != self._files:
+            self._files = files
+            self._changed()
+            self._newest = None
+        self._stale = False
+        self._stats["rescans"] += 1
+
+    # ---------- watcher callbacks ----------
+
+    def set_watched(self, watched: bool) -> None:
+        """Watcher started (trust events after one catch-up rescan) or stopped"""
+        with self._lock:
+            self._watched = watched
+            self._stale = True
+
+    def apply_changes(self, paths: Iterable[Path]) -> None:
+        """Re-stat the files a watcher event reported"""
+        with self._lock:
+            if self._stale:
+                return  # the next read rescans anyway
+            for path in paths:
+                path = Path(path)
+                if path.parent != self.directory or not self.matches(path.name):
+                    continue
+                self._stats["events"] += 1
+                self._apply(path.name, self._info(path))
+
+    def _apply(self, name: str, info: Optional[FileInfo]) -> None:
+        if info is None:
+            if self._files.pop(name, None) is not None:
+                self._changed()
+                if self._newest is not None and self._newest.name == name:
+                    self._newest = None
+        elif self._files.get(name) != info:
+            self._files[name] = info
+            self._changed()
+            if self._newest is not None and (self._newest.name == name or info.mtime_ns > self._newest.mtime_ns):
+                self._newest = info if info.mtime_ns >= self._newest.mtime_ns else None
+
+    def stat(self, path: Path) -> Optional[FileInfo]:
+        """
+        Stat one file the caller has just written (or deleted).
+
+        Updates its entry like a watcher event would, without the rescan
+        get() does when no watcher is running.
+
+        Returns:
+            Its info, or None if it doesn't exist
+        """
+        path = Path(path)
+        info = self._info(path)
+        with self._lock:
+            if not self._stale and path.parent == self.directory and self.matches(path.name):
+                self._apply(path.name, info)
+        return info
+
+    def rescan(self) -> None:
+        """Re-read the directory now, even while watched (events may lag)"""
+        with self._lock:
+            self._rescan()
+
+    # ---------- reads ----------
+
+    def files(self) -> List[FileInfo]:
+        """Matching files, most recently modified first"""
+        with self._lock:
+            self._stats["reads"] += 1
+            if self._stale or not self._watched:
+                self._rescan()
+            if self._ordered is None:
+                self._ordered = sorted(self._files.values(), key=lambda info: info.mtime_ns, reverse=True)
+            return list(self._ordered)
+
+    def get(self, name: str) -> Optional[FileInfo]:
+        with self._lock:
+            if self._stale or not self._watched:
+                self._rescan()
+            return self._files.get(name)
+
+    def newest(self) -> Optional[FileInfo]:
+        """Most recently modified file, without copying or sorting the listing"""
+        with self._lock:
+            self._stats["reads"] += 1
+            if self._stale or not self._watched:
+                self._rescan()
+            if self._newest is None and self._files:
+                self._newest = max(self._files.values(), key=lambda info: info.mtime_ns)
+            return self._newest
+
+    def digest(self) -> str:
+        """sha256 over (name, size, mtime) of every file - changes with the listing"""
+        with self._lock:
+            files = self.files()
+            if self._digest is None:
+                listing = "\n".join(f"{info.name}:{info.size}:{info.mtime_ns}" for info in sorted(files, key=lambda i: i.name))
+                self._digest = hashlib.sha256(listing.encode('utf-8')).hexdigest()
+            return self._digest
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "directory": str(self.directory),
+            "files": len(self._files),
+            "watched": self._watched,
+        }
@@ -0,0 +1,552 @@
+"""
+Document Store Service
+
+In-memory cache of parsed YAML documents (curriculum, opportunities, finances).
+
+- Parsed documents are kept in memory and revalidated with a single os.stat()
+  per access (mtime_ns, size, inode); the file is only re-read when that
+  signature changes
+- When the signature changes but the content hash doesn't (touch, copy),
+  the parsed document is reused without re-parsing
+- Readers get immutable snapshots (FrozenDict / FrozenList) that can be
+  shared across requests safely; writers take a mutable copy with
+  get_copy() and persist it with write(), which refreshes the cache
+- Writes are crash-safe (temp file + fsync + rename) and read-modify-write
+  cycles run under an fcntl lock on a sidecar .lock file, so several
+  uvicorn workers can share the same YAML files (transaction() /
+  atransaction())
+- Cold loads come from binary snapshots next to each file when fresh
+  (scripts/yaml_snapshot.py), so restarts and new workers skip the parse
+- Directories covered by the file watcher (set_watched()) skip the stat:
+  cached documents are trusted until files_changed() reports an event
+"""
+
+import asyncio
+import copy
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, AsyncIterator, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: in-process locking only
+    fcntl = None
+
+try:
+    from scripts import yaml_io, yaml_snapshot
+except ImportError:
+    # Imported outside the API process (e.g., tests) - add project root
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+    from scripts import yaml_io, yaml_snapshot
+
+
+def _immutable(self, *args, **kwargs):
+    raise TypeError(
+        "Document snapshots are read-only. Use DocumentStore.get_copy() to get a mutable copy."
+    )
+
+
+class FrozenDict(dict):
+    """Read-only dict used for shared document snapshots"""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _immutable
+    clear = pop = popitem = setdefault = update = _immutable
+    __ior__ = _immutable
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __copy__(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """Read-only list used for shared document snapshots"""
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = _immutable
+    append = extend = insert = pop = remove = clear = sort = reverse = _immutable
+    __iadd__ = __imul__ = _immutable
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(item, memo) for item in self]
+
+    def __copy__(self):
+        return list(self)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into read-only snapshots"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively convert a snapshot into plain mutable dicts/lists"""
+    return copy.deepcopy(value)
+
+
+def atomic_write_bytes(path: Path, raw: bytes) -> None:
+    """
+    Crash-safe file replacement.
+
+    Writes to a temp file in the same directory, fsyncs it, renames it over
+    the target and fsyncs the directory. Readers see either the old or the
+    new file, never a truncated one.
+    """
+    path = Path(path)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_name, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def lock_path_for(path: Path) -> Path:
+    """Sidecar lock file for a document (e.g., .structure.yaml.lock)"""
+    path = Path(path)
+    return path.with_name(f".{path.name}.lock")
+
+
+def acquire_file_lock(path: Path):
+    """Open the sidecar lock file and take an exclusive flock (blocking)"""
+    handle = open(lock_path_for(path), 'a+b')
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            handle.close()
+            raise
+    return handle
+
+
+def release_file_lock(handle) -> None:
+    """Release a lock taken with acquire_file_lock()"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    finally:
+        handle.close()
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Exclusive cross-process lock for a document.
+
+    Notes:
+        - flock locks belong to the open file description, so two threads
+          of the same process also exclude each other
+        - No-op across processes on platforms without fcntl
+    """
+    handle = acquire_file_lock(path)
+    try:
+        yield
+    finally:
+        release_file_lock(handle)
+
+
+@dataclass
+class DocumentEntry:
+    """Cached state for one document"""
+    data: Any
+    signature: Tuple[int, int, int]  # (mtime_ns, size, inode)
+    digest: str  # sha256 of file content
+    version: int  # Incremented whenever the content changes
+    loaded_at: str
+
+
+class DocumentStore:
+    """
+    Shared cache of parsed YAML documents
+
+    Usage:
+        store = get_document_store()
+        data = store.get(CURRICULUM_PATH)          # read-only snapshot
+        data = store.get_copy(CURRICULUM_PATH)     # mutable copy
+        store.write(CURRICULUM_PATH, data)         # persist + refresh cache
+
+        with store.transaction(OPPORTUNITIES_PATH) as data:   # locked RMW
+            data["pipeline"].append(...)                       # saved on exit
+
+        async with store.atransaction(CURRICULUM_PATH) as data:
+            ...
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, DocumentEntry] = {}
+        self._lock = threading.Lock()
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._async_locks: Dict[str, asyncio.Lock] = {}
+        self._keys: Dict[str, str] = {}
+        # Watched directories, and documents with unprocessed change events
+        # (key -> event generation, so a load racing an event keeps it stale)
+        self._watched: Set[str] = set()
+        self._stale: Dict[str, int] = {}
+        # Documents the current thread holds lock() on: always revalidated
+        self._held = threading.local()
+        self._stats = {"hits": 0, "unchecked_hits": 0, "revalidated": 0, "snapshot_loads": 0, "parses": 0, "writes": 0, "events": 0}
+
+    def _key(self, path: Path) -> str:
+        # resolve() costs a few syscalls; paths are resolved once
+        raw = str(path)
+        key = self._keys.get(raw)
+        if key is None:
+            key = self._keys[raw] = str(Path(path).resolve())
+        return key
+
+    def _trusted(self, key: str) -> bool:
+        return key not in self._stale and os.path.dirname(key) in self._watched
+
+    def _held_keys(self) -> Set[str]:
+        held = getattr(self._held, "keys", None)
+        if held is None:
+            held = self._held.keys = set()
+        return held
+
+    @staticmethod
+    def _signature(stat: os.stat_result) -> Tuple[int, int, int]:
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def _load(self, path: Path, verify: bool = False) -> DocumentEntry:
+        """
+        Stat, and re-read/re-parse only if the file changed.
+
+        Watched documents skip the stat, unless `verify` is set or the
+        thread holds the document's lock: a read-modify-write must start from
+        the file on disk, not wait for the watcher's (debounced) event.
+        """
+        key = self._key(path)
+        entry = self._entries.get(key)
+        if entry is not None and not verify and key not in self._held_keys() and self._trusted(key):
+            # The watcher reports every change in this directory
+            self._stats["unchecked_hits"] += 1
+            return entry
+
+        generation = self._stale.get(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._entries.pop(key, None)
+            raise
+        signature = self._signature(stat)
+
+        if entry is not None and entry.signature == signature:
+            self._stats["hits"] += 1
+            with self._lock:
+                self._clear_stale(key, generation)
+            return entry
+
+        if entry is None:
+            # Cold start: unpickle the binary snapshot instead of parsing YAML
+            cached = yaml_snapshot.read(path, signature)
+            if cached is not None:
+                data, digest = cached
+                with self._lock:
+                    self._stats["snapshot_loads"] += 1
+                    entry = DocumentEntry(
+                        data=freeze(data),
+                        signature=signature,
+                        digest=digest,
+                        version=1,
+                        loaded_at=datetime.now().isoformat()
+                    )
+                    self._entries.setdefault(key, entry)
+                    self._clear_stale(key, generation)
+                    return self._entries[key]
+
+        with open(path, 'rb') as f:
+            raw = f.read()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.digest == digest:
+                # Metadata changed but content didn't - skip the YAML parse
+                entry.signature = signature
+                self._stats["revalidated"] += 1
+                self._clear_stale(key, generation)
+                return entry
+
+            # Parsed (or taken from a snapshot of identical content), snapshot refreshed
+            data = freeze(yaml_snapshot.parse(path, raw, digest, signature))
+            self._stats["parses"] += 1
+            entry = DocumentEntry(
+                data=data,
+                signature=signature,
+                digest=digest,
+                version=(entry.version + 1) if entry else 1,
+                loaded_at=datetime.now().isoformat()
+            )
+            self._entries[key] = entry
+            self._clear_stale(key, generation)
+            return entry
+
+    def _clear_stale(self, key: str, generation: Optional[int]) -> None:
+        # Caller holds self._lock. Only if no new event arrived while the
+        # file was being checked
+        if generation is not None and self._stale.get(key) == generation:
+            del self._stale[key]
+
+    def get(self, path: Path, verify: bool = False) -> Any:
+        """
+        Get a read-only snapshot of a parsed document.
+
+        Args:
+            path: Path to the YAML file
+            verify: Stat the file even if the watcher would vouch for the
+                cached version (implied while holding lock(path))
+
+        Returns:
+            Parsed document (FrozenDict/FrozenList, or scalar/None)
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            yaml_io.YAMLError: If the file can't be parsed
+        """
+        return self._load(path, verify).data
+
+    def get_copy(self, path: Path, verify: bool = False) -> Any:
+        """
+        Get a mutable deep copy of a parsed document (for read-modify-write).
+
+        Pass verify=True when holding the document's file lock without lock().
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+            yaml_io.YAMLError: If the file can't be parsed
+        """
+        return thaw(self._load(path, verify).data)
+
+    def get_entry(self, path: Path, verify: bool = False) -> DocumentEntry:
+        """Get the cache entry (data, signature, digest, version) for a document"""
+        return self._load(path, verify)
+
+    def _write_unlocked(self, path: Path, data: Any) -> DocumentEntry:
+        """Atomically write a document and refresh its cache entry (caller holds lock(path))"""
+        raw = yaml_io.safe_dump(data).encode('utf-8')
+        atomic_write_bytes(path, raw)
+        signature = self._signature(os.stat(path))
+        digest = hashlib.sha256(raw).hexdigest()
+        # Other workers and the next restart load the new version without parsing
+        yaml_snapshot.write(path, data, digest, signature)
+
+        with self._lock:
+            key = self._key(path)
+            previous = self._entries.get(key)
+            entry = DocumentEntry(
+                data=freeze(data),
+                signature=signature,
+                digest=digest,
+                version=(previous.version + 1) if previous else 1,
+                loaded_at=datetime.now().isoformat()
+            )
+            self._entries[key] = entry
+            self._stats["writes"] += 1
+            return entry
+
+    def write(self, path: Path, data: Any, lock: bool = True) -> DocumentEntry:
+        """
+        Serialize a document to YAML and refresh the cache with it.
+
+        The file is replaced atomically under the document's file lock.
+        Use transaction() instead when the new content depends on the old.
+
+        Args:
+            path: Path to the YAML file
+            data: Document to write
+            lock: Take lock(path) around the write (pass False if the caller
+                already holds it)
+
+        Returns:
+            New cache entry
+        """
+        if not lock:
+            return self._write_unlocked(path, data)
+        with self.lock(path):
+            return self._write_unlocked(path, data)
+
+    @contextmanager
+    def lock(self, path: Path) -> Iterator[None]:
+        """
+        Exclusive in-process and cross-process lock for a document.
+
+        For callers that persist a document derived from another source
+        (e.g., the SQLite opportunity store) and need to write it with
+        write(..., lock=False) while holding the lock.
+        """
+        key = self._key(path)
+        with self._thread_lock(path), file_lock(path):
+            held = self._held_keys()
+            held.add(key)
+            try:
+                yield
+            finally:
+                held.discard(key)
+
+    def _thread_lock(self, path: Path) -> threading.Lock:
+        key = self._key(path)
+        with self._lock:
+            return self._path_locks.setdefault(key, threading.Lock())
+
+    def _async_lock(self, path: Path) -> asyncio.Lock:
+        key = self._key(path)
+        with self._lock:
+            return self._async_locks.setdefault(key, asyncio.Lock())
+
+    def _copy_or_default(self, path: Path, default: Any) -> Any:
+        """Mutable copy of a document (caller holds its lock), or of `default` if it's missing or empty"""
+        try:
+            data = self.get_copy(path, verify=True)
+        except FileNotFoundError:
+            if default is None:
+                raise
+            data = None
+        return thaw(default) if data is None and default is not None else data
+
+    @contextmanager
+    def transaction(self, path: Path, default: Any = None) -> Iterator[Any]:
+        """
+        Locked read-modify-write of a document (sync endpoints).
+
+        Yields a mutable copy of the latest on-disk version; if the block
+        exits normally the copy is written back atomically. Raising inside
+        the block (e.g., HTTPException 404) leaves the file untouched.
+
+        Args:
+            path: Path to the YAML file
+            default: Document to start from when the file is missing or
+                empty (mutate what is yielded - rebinding the name saves
+                nothing)
+
+        Notes:
+            - Holds a per-path thread lock plus an fcntl lock, so concurrent
+              writers in other threads or workers can't lose updates
+            - Not reentrant for the same path
+        """
+        with self.lock(path):
+            data = self._copy_or_default(path, default)
+            yield data
+            self._write_unlocked(path, data)
+
+    @asynccontextmanager
+    async def atransaction(self, path: Path, default: Any = None) -> AsyncIterator[Any]:
+        """
+        Locked read-modify-write of a document (async endpoints).
+
+        Same semantics as transaction(), but waits on an asyncio lock and
+        takes the fcntl lock in a worker thread so the event loop never blocks.
+        """
+        async with self._async_lock(path):
+            handle = await asyncio.to_thread(acquire_file_lock, path)
+            try:
+                data = self._copy_or_default(path, default)
+                yield data
+                await asyncio.to_thread(self._write_unlocked, path, data)
+            finally:
+                release_file_lock(handle)
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        """
+        Drop cached documents.
+
+        Args:
+            path: Document to drop (default: all documents)
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(path), None)
+
+    # ---------- file watcher integration ----------
+
+    def set_watched(self, directory: Path, watched: bool) -> None:
+        """
+        Trust cached documents in `directory` without stat() (the watcher is
+        running) or go back to revalidating on every access.
+        """
+        directory_key = self._key(directory)
+        with self._lock:
+            if watched:
+                # Changes made before the watcher started aren't reported
+                for key in self._entries:
+                    if os.path.dirname(key) == directory_key:
+                        self._stale[key] = self._stale.get(key, 0) + 1
+                self._watched.add(directory_key)
+            else:
+                self._watched.discard(directory_key)
+
+    def files_changed(self, paths: Iterable[Path]) -> None:
+        """
+        Watcher callback: revalidate these documents on next access.
+
+        Our own writes produce events too; those cost one stat() and no parse.
+        """
+        with self._lock:
+            for path in paths:
+                key = self._key(path)
+                self._stale[key] = self._stale.get(key, 0) + 1
+                self._stats["events"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache statistics (hits, parses, cached documents)"""
+        return {
+            **self._stats,
+            "watched_directories": sorted(self._watched),
+            "documents": {
+                key: {"version": entry.version, "digest": entry.digest[:12], "loaded_at": entry.loaded_at}
+                for key, entry in self._entries.items()
+            }
+        }
+
+
+# Global document store instance
+_document_store: Optional[DocumentStore] = None
+
+
+def get_document_store() -> DocumentStore:
+    """Get or create the global document store instance"""
+    global _document_store
+    if _document_store is None:
+        _document_store = DocumentStore()
+    return _document_store
@@ -0,0 +1,265 @@
+"""
+File Watcher Service
+
+Pushes filesystem changes (hand edits, scripts, other workers) into the
+in-memory caches so hot paths don't have to stat files to check freshness.
+
+- inotify (via watchfiles' Rust notify backend) when available
+- polling fallback: watchfiles' poller if inotify can't start (e.g., watch
+  limit reached, network filesystems), or a plain stat() poller when
+  watchfiles isn't installed
+- Subscribers register per directory (non-recursive). They're told when
+  watching starts and stops, so they can fall back to checking the
+  filesystem themselves whenever events aren't flowing
+
+Started and stopped in the API lifespan.
+"""
+
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import watchfiles
+except ImportError:
+    watchfiles = None
+
+logger = logging.getLogger(__name__)
+
+MODES = ("auto", "inotify", "polling", "off")
+
+
+@dataclass
+class Subscription:
+    directory: Path
+    on_change: Callable[[List[Path]], None]
+    on_watch: Optional[Callable[[bool], None]] = None
+    events: int = 0
+
+
+@dataclass
+class FileWatcher:
+    """
+    Directory watcher dispatching changed paths to subscribers
+
+    Usage:
+        watcher = FileWatcher()
+        watcher.subscribe(CURRICULUM_PATH.parent, document_store.files_changed,
+                          lambda watched: document_store.set_watched(CURRICULUM_PATH.parent, watched))
+        await watcher.start()       # lifespan startup
+        await watcher.stop()        # lifespan shutdown
+    """
+
+    mode: str = "auto"              # auto | inotify | polling | off
+    debounce_ms: int = 50
+    poll_interval: float = 1.0
+    _subscriptions: List[Subscription] = field(default_factory=list)
+    _task: Optional[asyncio.Task] = None
+    _stop: Optional[asyncio.Event] = None
+    _stats: Dict[str, Any] = field(default_factory=lambda: {
+        "backend": None, "batches": 0, "events": 0, "errors": 0, "started_at": None
+    })
+
+    def subscribe(
+        self,
+        directory: Path,
+        on_change: Callable[[List[Path]], None],
+        on_watch: Optional[Callable[[bool], None]] = None
+    ) -> None:
+        """
+        Register a directory.
+
+        Args:
+            directory: Directory to watch (files directly inside it)
+            on_change: Called with the changed paths (created, modified,
+                deleted) after each debounced batch
+            on_watch: Called with True once events are flowing and False
+                when they stop (subscribers must then check freshness
+                themselves)
+        """
+        self._subscriptions.append(Subscription(Path(directory).resolve(), on_change, on_watch))
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def _directories(self) -> List[Path]:
+        directories = []
+        for subscription in self._subscriptions:
+            if subscription.directory.is_dir() and subscription.directory not in directories:
+                directories.append(subscription.directory)
+            elif not subscription.directory.is_dir():
+                logger.warning(f"[Watcher] {subscription.directory} doesn't exist - not watched")
+        return directories
+
+    async def start(self) -> None:
+        """Start watching in the background (no-op when mode is "off")"""
+        if self.mode == "off" or self.running:
+            return
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        self._task = None
+
+    # ---------- backends ----------
+
+    async def _run(self) -> None:
+        directories = self._directories()
+        if not directories:
+            return
+        backends = self._backends()
+        for backend in backends:
+            try:
+                await backend(directories)
+                break  # stopped normally
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"[Watcher] {self._stats['backend']} backend failed ({e}), falling back")
+            finally:
+                self._notify_watching(directories, False)
+        self._stats["backend"] = None
+
+    def _backends(self) -> List[Callable]:
+        if watchfiles is None:
+            if self.mode == "inotify":
+                logger.warning("[Watcher] watchfiles not installed - using the stat() poller")
+            return [self._run_stat_polling]
+        if self.mode == "polling":
+            return [self._run_watchfiles_polling, self._run_stat_polling]
+        return [self._run_watchfiles, self._run_watchfiles_polling, self._run_stat_polling]
+
+    async def _run_watchfiles(self, directories: List[Path], force_polling: bool = False) -> None:
+        self._stats["backend"] = "polling" if force_polling else "inotify"
+        watcher = watchfiles.awatch(
+            *directories,
+            watch_filter=None,
+            debounce=self.debounce_ms,
+            step=min(50, self.debounce_ms),
+            stop_event=self._stop,
+            force_polling=force_polling,
+            poll_delay_ms=int(self.poll_interval * 1000),
+            recursive=False,
+            yield_on_timeout=True,
+            rust_timeout=1000,
+        )
+        started = False
+        async for changes in watcher:
+            if not started:
+                # First (timeout) yield: the backend is up and watching
+                started = True
+                self._notify_watching(directories, True)
+            if changes:
+                self._dispatch([Path(path) for _, path in changes])
+
+    async def _run_watchfiles_polling(self, directories: List[Path]) -> None:
+        await self._run_watchfiles(directories, force_polling=True)
+
+    async def _run_stat_polling(self, directories: List[Path]) -> None:
+        self._stats["backend"] = "stat-polling"
+        snapshots = {directory: await asyncio.to_thread(_scan, directory) for directory in directories}
+        self._notify_watching(directories, True)
+        while not self._stop.is_set():
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.poll_interval)
+                break
+            except asyncio.TimeoutError:
+                pass
+            changed: List[Path] = []
+            for directory in directories:
+                current = await asyncio.to_thread(_scan, directory)
+                previous = snapshots[directory]
+                changed += [
+                    directory / name for name in set(previous) | set(current)
+                    if previous.get(name) != current.get(name)
+                ]
+                snapshots[directory] = current
+            if changed:
+                self._dispatch(changed)
+
+    # ---------- dispatch ----------
+
+    def _notify_watching(self, directories: List[Path], watching: bool) -> None:
+        if watching:
+            self._stats["started_at"] = datetime.now().isoformat()
+        for subscription in self._subscriptions:
+            if subscription.on_watch is not None and subscription.directory in directories:
+                try:
+                    subscription.on_watch(watching)
+                except Exception as e:
+                    logger.warning(f"[Watcher] on_watch callback for {subscription.directory} failed: {e}")
+
+    def _dispatch(self, paths: List[Path]) -> None:
+        # Lock sidecars and temp files of atomic writes aren't interesting
+        paths = [path for path in paths if not path.name.startswith('.')]
+        if not paths:
+            return
+        self._stats["batches"] += 1
+        self._stats["events"] += len(paths)
+
+        by_directory: Dict[Path, List[Path]] = {}
+        for path in paths:
+            by_directory.setdefault(path.parent, []).append(path)
+
+        for subscription in self._subscriptions:
+            changed = by_directory.get(subscription.directory)
+            if not changed:
+                continue
+            subscription.events += len(changed)
+            try:
+                subscription.on_change(changed)
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"[Watcher] Change callback for {subscription.directory} failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "mode": self.mode,
+            "running": self.running,
+            "directories": {
+                str(subscription.directory): subscription.events for subscription in self._subscriptions
+            },
+        }
+
+
+def _scan(directory: Path) -> Dict[str, Tuple[int, int, int]]:
+    """name -> (mtime_ns, size, inode) for the stat() poller"""
+    snapshot = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except FileNotFoundError:
+        pass
+    return snapshot
+
+
+def get_file_watcher() -> FileWatcher:
+    """Watcher configured from FILE_WATCHER / FILE_WATCHER_DEBOUNCE_MS / FILE_WATCHER_POLL_INTERVAL"""
+    mode = os.getenv("FILE_WATCHER", "auto").lower()
+    if mode not in MODES:
+        logger.warning(f"[Watcher] Unknown FILE_WATCHER={mode!r}, using auto")
+        mode = "auto"
+    return FileWatcher(
+        mode=mode,
+        debounce_ms=int(os.getenv("FILE_WATCHER_DEBOUNCE_MS", "50")),
+        poll_interval=float(os.getenv("FILE_WATCHER_POLL_INTERVAL", "1.0")),
+    )
@@ -0,0 +1,94 @@
+"""
+Opportunity Aggregates
+
+Running counts over the opportunity pipeline (per stage, priority and
+outcome, plus open/active totals), maintained with O(1) deltas instead of
+recounting the pipeline on every create, update and delete.
+
+The counting rules are the ones the endpoints used before:
+- active_count: stage defaults to "discovered"; "total" counts every
+  opportunity whose stage isn't "closed"
+- active (notification badge): stage (or legacy "status") not in
+  closed / rejected / declined
+"""
+
+from collections import Counter
+from typing import Any, Dict, Optional
+
+PIPELINE_STAGES = ("discovered", "applied", "interviewing", "offer", "closed")
+INACTIVE_STATUSES = ("closed", "rejected", "declined")
+
+
+class StageAggregates:
+    """
+    Per-stage / per-priority / per-outcome counters
+
+    Usage:
+        counts = store.aggregates().copy()      # never mutate the shared instance
+        counts.replace(previous, updated)       # stage change
+        document["active_count"] = counts.active_count()
+    """
+
+    def __init__(self):
+        self.stages: Counter = Counter()
+        self.priorities: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.total = 0
+        self.open = 0      # stage != "closed" (active_count["total"])
+        self.active = 0    # notification badge rule
+
+    def _apply(self, record: Any, sign: int) -> None:
+        if not isinstance(record, dict):
+            return
+        self.stages[record.get('stage', 'discovered')] += sign
+        self.priorities[record.get('priority')] += sign
+        self.outcomes[record.get('outcome')] += sign
+        self.total += sign
+        if record.get('stage') != 'closed':
+            self.open += sign
+        status = record.get('stage') or record.get('status', '')
+        if str(status).lower() not in INACTIVE_STATUSES:
+            self.active += sign
+
+    def add(self, record: Any) -> None:
+        """Count a new opportunity"""
+        self._apply(record, 1)
+
+    def remove(self, record: Any) -> None:
+        """Uncount a deleted opportunity"""
+        self._apply(record, -1)
+
+    def replace(self, previous: Optional[Any], current: Optional[Any]) -> None:
+        """Move an opportunity's contribution (e.g., stage or priority change)"""
+        if previous is not None:
+            self.remove(previous)
+        if current is not None:
+            self.add(current)
+
+    def copy(self) -> "StageAggregates":
+        clone = StageAggregates()
+        clone.stages = Counter(self.stages)
+        clone.priorities = Counter(self.priorities)
+        clone.outcomes = Counter(self.outcomes)
+        clone.total, clone.open, clone.active = self.total, self.open, self.active
+        return clone
+
+    def active_count(self) -> Dict[str, int]:
+        """The document's active_count block"""
+        counts = {stage: self.stages.get(stage, 0) for stage in PIPELINE_STAGES}
+        counts['total'] = self.open
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        """All counters, for dashboards"""
+        def nonzero(counter: Counter) -> Dict[str, int]:
+            return {("none" if key is None else str(key)): count for key, count in counter.items() if count}
+
+        return {
+            "total": self.total,
+            "open": self.open,
+            "active": self.active,
+            "by_stage": nonzero(self.stages),
+            "by_priority": nonzero(self.priorities),
+            "by_outcome": nonzero(self.outcomes),
+        }
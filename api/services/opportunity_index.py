@@ -0,0 +1,266 @@
+"""
+Opportunity Index
+
+In-memory lookup structures over the opportunity pipeline:
+- id -> record (first occurrence wins, like the linear scans it replaces)
+- company prefix -> highest numeric id suffix (ID allocation)
+- stage -> set of ids, priority -> set of ids
+- StageAggregates (per-stage / priority / outcome counts)
+
+The index is built once from a document snapshot. After that, refresh()
+re-indexes only the records that differ from the indexed ones (added,
+changed, removed), so a mutation touches a handful of entries instead of
+rebuilding every table. After the store's own writes, refresh_write()
+compares only the records the write touched; external edits still get the
+full comparison.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .opportunity_aggregates import StageAggregates
+
+# create_opportunity truncates the slugified company name to this length
+PREFIX_LENGTH = 10
+
+
+def company_prefix(company: str) -> str:
+    """ID prefix for a company name (e.g., "Paylocity Corporation" -> "paylocity-")"""
+    return company.lower().replace(' ', '-')[:PREFIX_LENGTH]
+
+
+def id_sequence(opportunity_id: str) -> Optional[int]:
+    """Numeric suffix of an id ("acme-007" -> 7), or None"""
+    try:
+        return int(str(opportunity_id).split('-')[-1])
+    except ValueError:
+        return None
+
+
+class OpportunityIndex:
+    """
+    Maintained id / prefix / stage index for one opportunities document
+
+    Usage:
+        index = OpportunityIndex()
+        index.refresh(document["pipeline"], version=entry.version)
+        index.get("paylocity-001")
+        index.next_id("Paylocity Corporation")    # "paylocity--002"
+        index.stage_ids("interviewing")
+    """
+
+    def __init__(self):
+        self.version: Any = None
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, Any] = {}
+        self._positions: Dict[str, int] = {}
+        self._by_stage: Dict[Any, Set[str]] = {}
+        self._by_priority: Dict[Any, Set[str]] = {}
+        # Highest sequence for every possible prefix of every id (ids are
+        # matched with startswith(), and prefixes are at most 10 characters)
+        self._max_sequence: Dict[str, int] = {}
+        self._stale_prefixes: Set[str] = set()
+        self.aggregates = StageAggregates()
+        # Records the id tables can't hold (no id, duplicate id) - still counted
+        self._unindexed: List[Any] = []
+
+    # ---------- maintenance ----------
+
+    def refresh(
+        self,
+        pipeline: Iterable[Any],
+        version: Any = None,
+        touched: Optional[Set[str]] = None
+    ) -> Dict[str, int]:
+        """
+        Bring the index up to date with `pipeline`.
+
+        Records equal to the indexed ones only have their reference updated;
+        added, changed and removed records are re-indexed.
+
+        Args:
+            pipeline: Opportunity records
+            version: Version of the document they come from
+            touched: Ids of the only records that may have changed in
+                place (adds and removes are found regardless); None
+                compares every record
+
+        Returns:
+            Change counts: {"added", "changed", "removed"}
+        """
+        pipeline = list(pipeline or [])
+        changes = {"added": 0, "changed": 0, "removed": 0}
+
+        with self._lock:
+            ids = [
+                record.get('id') if isinstance(record, dict) and isinstance(record.get('id'), str) else None
+                for record in pipeline
+            ]
+            positions: Dict[str, int] = {}
+            for position, opportunity_id in enumerate(ids):
+                if opportunity_id is not None:
+                    positions.setdefault(opportunity_id, position)
+
+            for opportunity_id, position in positions.items():
+                record = pipeline[position]
+                old = self._by_id.get(opportunity_id)
+                if old is None:
+                    self._add(record)
+                    changes["added"] += 1
+                elif old is not record:
+                    if (touched is None or opportunity_id in touched) and old != record:
+                        self._remove(old)
+                        self._add(record)
+                        changes["changed"] += 1
+                    else:
+                        self._by_id[opportunity_id] = record
+
+            for opportunity_id in [i for i in self._by_id if i not in positions]:
+                self._remove(self._by_id[opportunity_id])
+                changes["removed"] += 1
+
+            unindexed = [
+                record for position, record in enumerate(pipeline)
+                if ids[position] is None or positions[ids[position]] != position
+            ] if len(positions) != len(pipeline) else []
+            for record in self._unindexed:
+                self.aggregates.remove(record)
+            for record in unindexed:
+                self.aggregates.add(record)
+            self._unindexed = unindexed
+
+            self._positions = positions
+            self.version = version
+        return changes
+
+    def refresh_write(
+        self,
+        pipeline: Iterable[Any],
+        version: Any,
+        base: Any,
+        touched: Optional[Iterable[str]] = None
+    ) -> Optional[Dict[str, int]]:
+        """
+        Catch up with a write of the document at version `base` that
+        changed only the `touched` records.
+
+        Falls back to the full comparison unless the index is at `base`
+        (an edit it hasn't seen happened in between).
+
+        Returns:
+            Change counts, or None if the index is already at `version`
+        """
+        with self._lock:
+            if self.version == version:
+                return None
+            if touched is not None and self.version == base:
+                return self.refresh(pipeline, version, set(touched))
+            return self.refresh(pipeline, version)
+
+    def _add(self, record: Dict[str, Any]) -> None:
+        opportunity_id = record['id']
+        self._by_id[opportunity_id] = record
+        self._by_stage.setdefault(record.get('stage'), set()).add(opportunity_id)
+        self._by_priority.setdefault(record.get('priority'), set()).add(opportunity_id)
+        self.aggregates.add(record)
+        sequence = id_sequence(opportunity_id)
+        if sequence is not None:
+            self._raise_prefixes(opportunity_id, sequence)
+
+    def _remove(self, record: Dict[str, Any]) -> None:
+        opportunity_id = record['id']
+        self._by_id.pop(opportunity_id, None)
+        self.aggregates.remove(record)
+        for table, key in ((self._by_stage, record.get('stage')), (self._by_priority, record.get('priority'))):
+            ids = table.get(key)
+            if ids is not None:
+                ids.discard(opportunity_id)
+                if not ids:
+                    del table[key]
+        sequence = id_sequence(opportunity_id)
+        if sequence is not None:
+            for prefix in self._prefixes(opportunity_id):
+                if self._max_sequence.get(prefix) == sequence:
+                    # Removed the current maximum - recompute on next use
+                    self._stale_prefixes.add(prefix)
+
+    @staticmethod
+    def _prefixes(opportunity_id: str) -> List[str]:
+        return [opportunity_id[:length] for length in range(min(len(opportunity_id), PREFIX_LENGTH) + 1)]
+
+    def _raise_prefixes(self, opportunity_id: str, sequence: int) -> None:
+        for prefix in self._prefixes(opportunity_id):
+            if prefix not in self._stale_prefixes and self._max_sequence.get(prefix, 0) < sequence:
+                self._max_sequence[prefix] = sequence
+
+    # ---------- lookups ----------
+
+    def get(self, opportunity_id: str) -> Optional[Dict[str, Any]]:
+        """Record for an id, or None"""
+        return self._by_id.get(opportunity_id)
+
+    def position(self, opportunity_id: str) -> Optional[int]:
+        """Pipeline position of an id, or None"""
+        return self._positions.get(opportunity_id)
+
+    def stage_ids(self, stage: Optional[str]) -> Set[str]:
+        """Ids currently in a stage (copy)"""
+        with self._lock:
+            return set(self._by_stage.get(stage, ()))
+
+    def priority_ids(self, priority: Optional[str]) -> Set[str]:
+        """Ids currently at a priority (copy)"""
+        with self._lock:
+            return set(self._by_priority.get(priority, ()))
+
+    def max_sequence(self, prefix: str) -> int:
+        """Highest numeric suffix among ids starting with `prefix` (0 if none)"""
+        with self._lock:
+            if prefix in self._stale_prefixes or len(prefix) > PREFIX_LENGTH:
+                best = max(
+                    (id_sequence(i) or 0 for i in self._by_id if i.startswith(prefix)),
+                    default=0
+                )
+                if len(prefix) <= PREFIX_LENGTH:
+                    self._stale_prefixes.discard(prefix)
+                    self._max_sequence[prefix] = best
+                return best
+            return self._max_sequence.get(prefix, 0)
+
+    def next_id(self, company: str) -> str:
+        """Next free id for a company ("<prefix>-<max + 1:03d>")"""
+        prefix = company_prefix(company)
+        return f"{prefix}-{self.max_sequence(prefix) + 1:03d}"
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, opportunity_id: str) -> bool:
+        return opportunity_id in self._by_id
+
+
+class BatchIdAllocator:
+    """
+    Allocates ids for several creates inside one transaction
+
+    The store's next_id() only sees committed records, so ids handed out
+    earlier in the same batch are tracked here (per prefix, like the index).
+
+    Usage:
+        allocator = BatchIdAllocator(store.next_id)
+        allocator.next_id("Acme")    # "acme-004"
+        allocator.next_id("Acme")    # "acme-005"
+    """
+
+    def __init__(self, next_id: Callable[[str], str]):
+        self._next_id = next_id
+        self._allocated: Dict[str, int] = {}
+
+    def next_id(self, company: str) -> str:
+        prefix = company_prefix(company)
+        sequence = max(id_sequence(self._next_id(company)) or 1, self._allocated.get(prefix, 0) + 1)
+        new_id = f"{prefix}-{sequence:03d}"
+        for length in range(min(len(new_id), PREFIX_LENGTH) + 1):
+            key = new_id[:length]
+            self._allocated[key] = max(self._allocated.get(key, 0), sequence)
+        return new_id
@@ -0,0 +1,189 @@
+"""
+Opportunity List Queries
+
+Sorting, keyset (cursor) pagination and sparse field projection for
+opportunity list views, applied to the records the store's query() returns.
+
+- sort: "company", "-priority", ... (leading "-" = descending). Stage and
+  priority sort in pipeline / importance order, not alphabetically
+- cursor: opaque token holding the sort key of the last item served
+  (keyset pagination: the next page starts after that key, not at an offset)
+- fields: "id,company,stage,details.location" (id is always included)
+"""
+
+import base64
+import binascii
+import bisect
+import json
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .opportunity_aggregates import PIPELINE_STAGES
+
+PRIORITY_ORDER = ("high", "medium", "low")
+
+# Fields list views can sort on -> timeline dates sort as ISO strings
+SORT_FIELDS = {
+    "position": None,
+    "id": "id",
+    "company": "company",
+    "role": "role",
+    "stage": "stage",
+    "priority": "priority",
+    "discovered": "timeline.discovered",
+    "applied": "timeline.applied",
+}
+RANKED_FIELDS = {"stage": PIPELINE_STAGES, "priority": PRIORITY_ORDER}
+
+DEFAULT_LIST_FIELDS = ("id", "company", "role", "stage", "priority")
+
+
+class QueryError(ValueError):
+    """Invalid sort, fields or cursor parameter"""
+
+
+def _lookup(record: Any, path: str) -> Any:
+    current = record
+    for part in path.split('.'):
+        if not isinstance(current, dict):
+            return None
+        current = current.get(part)
+    return current
+
+
+def parse_sort(sort: Optional[str]) -> Tuple[str, bool]:
+    """"-company" -> ("company", True)"""
+    sort = (sort or "position").strip()
+    descending = sort.startswith('-')
+    field = sort.lstrip('-')
+    if field not in SORT_FIELDS:
+        raise QueryError(f"Cannot sort by '{field}' (expected one of: {', '.join(SORT_FIELDS)})")
+    return field, descending
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """"company, stage" -> ["id", "company", "stage"]; None/"*" -> None (whole record)"""
+    if fields is None or fields.strip() == "*":
+        return None
+    parsed = ["id"]
+    for field in fields.split(','):
+        field = field.strip()
+        if field and field not in parsed:
+            parsed.append(field)
+    return parsed
+
+
+def sort_key(record: Any, field: str, position: int) -> Tuple:
+    """
+    Total order for one record: (missing?, value), then id and pipeline
+    position as tie-breakers. Missing values sort last.
+    """
+    path = SORT_FIELDS[field]
+    if path is None:
+        value_key = (0, position)
+    else:
+        value = _lookup(record, path)
+        if value is None or value == "":
+            value_key = (1, 0 if field in RANKED_FIELDS else "")
+        elif field in RANKED_FIELDS:
+            order = RANKED_FIELDS[field]
+            value_key = (0, order.index(value) if value in order else len(order))
+        else:
+            value_key = (0, str(value).lower())
+    opportunity_id = record.get('id') if isinstance(record, dict) else None
+    return (value_key, str(opportunity_id or ""), position)
+
+
+def _tuples(value: Any) -> Any:
+    return tuple(_tuples(item) for item in value) if isinstance(value, list) else value
+
+
+def encode_cursor(sort: str, key: Tuple) -> str:
+    raw = json.dumps({"s": sort, "k": key}, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort: str) -> Tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        key = _tuples(payload["k"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise QueryError("Invalid cursor")
+    if payload.get("s") != sort:
+        raise QueryError("Cursor was issued for a different sort order")
+    return key
+
+
+def project(record: Any, fields: Optional[Sequence[str]]) -> Any:
+    """Copy only the requested (possibly dotted) fields of a record"""
+    if fields is None or not isinstance(record, dict):
+        return record
+    projected: Dict[str, Any] = {}
+    for field in fields:
+        parts = field.split('.')
+        value = record
+        for part in parts:
+            if not isinstance(value, dict) or part not in value:
+                break
+            value = value[part]
+        else:
+            target = projected
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            target[parts[-1]] = value
+    return projected
+
+
+def paginate(
+    records: Sequence[Any],
+    positions: Sequence[int],
+    sort: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """
+    One page of `records` (already filtered), sorted and projected.
+
+    Args:
+        records: Matching opportunities
+        positions: Pipeline position of each record (stable tie-breaker)
+        sort: Sort spec ("company", "-discovered", ...); default pipeline order
+        limit: Page size
+        cursor: next_cursor from the previous page
+        fields: Projection from parse_fields()
+
+    Returns:
+        {"items", "count", "total", "next_cursor"}
+
+    Raises:
+        QueryError: Invalid sort or cursor
+    """
+    field, descending = parse_sort(sort)
+    spec = f"-{field}" if descending else field
+    keyed = sorted(
+        ((sort_key(record, field, position), record) for record, position in zip(records, positions)),
+        key=lambda item: item[0]
+    )
+    keys = [key for key, _ in keyed]
+    after = decode_cursor(cursor, spec) if cursor else None
+
+    try:
+        if not descending:
+            start = bisect.bisect_right(keys, after) if after is not None else 0
+            page = keyed[start:start + limit]
+            more = start + limit < len(keyed)
+        else:
+            end = bisect.bisect_left(keys, after) if after is not None else len(keyed)
+            page = keyed[max(0, end - limit):end][::-1]
+            more = end - limit > 0
+    except TypeError:
+        # Key shape doesn't match this sort (tampered cursor)
+        raise QueryError("Invalid cursor")
+
+    return {
+        "items": [project(record, fields) for _, record in page],
+        "count": len(page),
+        "total": len(keyed),
+        "next_cursor": encode_cursor(spec, page[-1][0]) if more and page else None,
+    }
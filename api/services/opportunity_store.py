@@ -0,0 +1,828 @@
+"""
+Opportunity Store Service
+
+Access layer for the opportunity CRM (opportunities/structure.yaml).
+
+Two backends share the same interface:
+- yaml (default): reads come from the shared DocumentStore cache and writes
+  are locked, atomic read-modify-write cycles on the YAML file
+- sqlite: opportunities, contacts, notes and timeline events live in a
+  SQLite database (WAL mode) indexed on id, stage, priority and company,
+  so lookups and filters don't scan the whole pipeline
+
+The YAML backend keeps an OpportunityIndex (id, company prefix, stage)
+over the cached document, so lookups and ID allocation don't scan the
+pipeline either. Both backends expose StageAggregates (stage / priority /
+outcome counts) maintained by that index.
+
+The YAML file stays the human-editable source in both modes. The SQLite
+store re-imports it whenever its content hash changes (manual edits) and
+exports it after every committed transaction.
+
+With OPPORTUNITIES_WRITE_BEHIND=1 the YAML backend applies edits in
+memory and coalesces bursts (e.g., Kanban drags) into one atomic write
+(see CoalescingWriter). Pending edits are flushed on shutdown.
+
+Configuration:
+    OPPORTUNITIES_BACKEND=yaml|sqlite
+    OPPORTUNITIES_DB_PATH (default: next to the YAML file, structure.db)
+    OPPORTUNITIES_WRITE_BEHIND=0|1 (yaml backend only)
+    OPPORTUNITIES_FLUSH_DELAY (seconds, default 0.5)
+    OPPORTUNITIES_FLUSH_MAX_PENDING (mutations, default 20)
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .document_store import DocumentStore, get_document_store, freeze, thaw
+from .opportunity_aggregates import StageAggregates
+from .opportunity_index import OpportunityIndex, company_prefix, id_sequence
+from .write_behind import CoalescingWriter
+
+BACKENDS = ("yaml", "sqlite")
+
+# Distinguishes in-memory (write-behind) versions across API restarts
+PROCESS_TAG = uuid.uuid4().hex
+
+# Sections stored in their own tables (SQLite backend)
+TIMELINE_KEY = "timeline"
+LIST_SECTIONS = ("contacts", "notes")
+
+
+class YamlOpportunityStore:
+    """Opportunity access backed directly by the YAML document cache"""
+
+    backend = "yaml"
+
+    def __init__(
+        self,
+        yaml_path: Path,
+        documents: Optional[DocumentStore] = None,
+        write_behind: bool = False,
+        flush_delay: float = 0.5,
+        flush_max_pending: int = 20
+    ):
+        self.yaml_path = Path(yaml_path)
+        self._documents = documents or get_document_store()
+        self._index = OpportunityIndex()
+        self._writer = (
+            CoalescingWriter(self.yaml_path, self._documents, flush_delay, flush_max_pending)
+            if write_behind else None
+        )
+
+    def _current(self, verify: bool = False) -> Tuple[Any, Any]:
+        """(version, snapshot): pending in-memory edits first, then the file"""
+        pending = self._writer.pending_snapshot() if self._writer else None
+        if pending is not None:
+            return pending
+        entry = self._documents.get_entry(self.yaml_path, verify=verify)
+        return (entry.version, entry.digest), entry.data
+
+    def document(self) -> Any:
+        """
+        Full opportunities document (read-only snapshot).
+
+        Raises:
+            FileNotFoundError: If the YAML file doesn't exist
+        """
+        return self._current()[1]
+
+    def validators(self) -> Tuple[str, Optional[float]]:
+        """
+        (content digest, mtime) for HTTP caching, without parsing or copying.
+
+        Unflushed write-behind edits get a digest of their in-memory version
+        and no mtime.
+        """
+        pending = self._writer.pending_snapshot() if self._writer else None
+        if pending is not None:
+            return hashlib.sha256(f"{PROCESS_TAG}:{pending[0][1]}".encode()).hexdigest(), None
+        entry = self._documents.get_entry(self.yaml_path)
+        return entry.digest, entry.signature[0] / 1e9
+
+    def _pipeline(self) -> List[Dict[str, Any]]:
+        return (self.document() or {}).get('pipeline', [])
+
+    def index(self) -> OpportunityIndex:
+        """
+        Index over the current document.
+
+        Costs one stat() when the file is unchanged; otherwise only the
+        records that changed are re-indexed.
+
+        Raises:
+            FileNotFoundError: If the YAML file doesn't exist
+        """
+        version, document = self._current()
+        if self._index.version != version:
+            document = document if isinstance(document, dict) else {}
+            self._index.refresh(document.get('pipeline') or [], version)
+        return self._index
+
+    def get(self, opportunity_id: str) -> Optional[Dict[str, Any]]:
+        """Opportunity by id (read-only), or None"""
+        return self.index().get(opportunity_id)
+
+    def next_id(self, company: str) -> str:
+        """
+        Next free id for a company (e.g., "acme-003").
+
+        Call inside transaction() so no other writer can take the same id.
+        """
+        return self.index().next_id(company)
+
+    def aggregates(self) -> StageAggregates:
+        """Live counters for the current document (copy() before applying deltas)"""
+        return self.index().aggregates
+
+    def get_many(self, opportunity_ids: List[str]) -> List[Dict[str, Any]]:
+        """Opportunities for the given ids, in request order (unknown ids skipped)"""
+        index = self.index()
+        return [index.get(opportunity_id) for opportunity_id in opportunity_ids if opportunity_id in index]
+
+    def query(
+        self,
+        stage: Optional[str] = None,
+        priority: Optional[str] = None,
+        company: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Filter opportunities in pipeline order.
+
+        Args:
+            stage: Exact stage
+            priority: Exact priority
+            company: Case-insensitive substring of the company name
+        """
+        company = company.lower() if company else None
+        if stage is not None or priority is not None:
+            # Intersect the stage / priority id sets instead of scanning
+            index = self.index()
+            ids = None
+            if stage is not None:
+                ids = index.stage_ids(stage)
+            if priority is not None:
+                ids = index.priority_ids(priority) if ids is None else ids & index.priority_ids(priority)
+            candidates = [index.get(i) for i in sorted(ids, key=index.position)]
+        else:
+            candidates = self._pipeline()
+        return [
+            opportunity for opportunity in candidates
+            if (stage is None or opportunity.get('stage') == stage)
+            and (priority is None or opportunity.get('priority') == priority)
+            and (company is None or company in str(opportunity.get('company') or '').lower())
+        ]
+
+    @contextmanager
+    def transaction(self, touched: Optional[Iterable[str]] = None) -> Iterator[Any]:
+        """
+        Locked read-modify-write of the whole document.
+
+        Yields a mutable copy; it is saved atomically if the block exits
+        normally (see DocumentStore.transaction), and the index picks up
+        the changed records. In write-behind mode the save is deferred and
+        coalesced with the following edits.
+
+        Args:
+            touched: Ids of the existing opportunities the block may change
+                (created and deleted ones needn't be listed); the index
+                then compares only those. None compares every record.
+        """
+        if self._writer is not None:
+            with self._writer.transaction() as document:
+                base = self._current(verify=True)[0]
+                yield document
+        else:
+            with self._documents.transaction(self.yaml_path) as document:
+                base = self._current(verify=True)[0]
+                yield document
+        version, snapshot = self._current()
+        snapshot = snapshot if isinstance(snapshot, dict) else {}
+        self._index.refresh_write(snapshot.get('pipeline') or [], version, base, touched)
+
+    def flush(self) -> bool:
+        """Write deferred edits now (write-behind mode); True if anything was written"""
+        return self._writer.flush() if self._writer else False
+
+    def close(self) -> None:
+        """Persist deferred edits (API shutdown)"""
+        if self._writer is not None:
+            self._writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = {"backend": self.backend, "yaml_path": str(self.yaml_path), "indexed": len(self._index)}
+        if self._writer is not None:
+            stats["write_behind"] = self._writer.stats()
+        return stats
+
+
+# ========================
+# SQLite backend
+# ========================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS opportunities (
+    seq INTEGER PRIMARY KEY,          -- pipeline order
+    id TEXT,
+    company TEXT,
+    role TEXT,
+    stage TEXT,
+    priority TEXT,
+    outcome TEXT,
+    data TEXT NOT NULL,               -- JSON record; normalized sections are placeholders
+    normalized TEXT NOT NULL,         -- comma-separated sections stored in child tables
+    fingerprint TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_opportunities_id ON opportunities(id);
+CREATE INDEX IF NOT EXISTS idx_opportunities_stage ON opportunities(stage);
+CREATE INDEX IF NOT EXISTS idx_opportunities_priority ON opportunities(priority);
+CREATE INDEX IF NOT EXISTS idx_opportunities_company ON opportunities(company COLLATE NOCASE);
+
+CREATE TABLE IF NOT EXISTS contacts (
+    opportunity_seq INTEGER NOT NULL REFERENCES opportunities(seq) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT,
+    role TEXT,
+    email TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (opportunity_seq, position)
+);
+
+CREATE TABLE IF NOT EXISTS notes (
+    opportunity_seq INTEGER NOT NULL REFERENCES opportunities(seq) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    date TEXT,
+    content TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (opportunity_seq, position)
+);
+
+CREATE TABLE IF NOT EXISTS timeline (
+    opportunity_seq INTEGER NOT NULL REFERENCES opportunities(seq) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (opportunity_seq, position)
+);
+CREATE INDEX IF NOT EXISTS idx_timeline_event ON timeline(event, value);
+"""
+
+
+def _json_default(value: Any) -> Any:
+    # YAML can yield unquoted dates/timestamps; tag them so they round-trip
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, date):
+        return {"__date__": value.isoformat()}
+    raise TypeError(f"Value of type {type(value).__name__} can't be stored")
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return date.fromisoformat(obj["__date__"])
+    return obj
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=_json_default)
+
+
+def _loads(text: Optional[str]) -> Any:
+    return json.loads(text, object_hook=_json_object_hook) if text is not None else None
+
+
+def _text(value: Any) -> Optional[str]:
+    """Scalar for an indexed column (None stays NULL)"""
+    return None if value is None else str(value)
+
+
+class SqliteOpportunityStore:
+    """
+    Opportunity access backed by SQLite, kept in sync with the YAML file
+
+    Usage:
+        store = SqliteOpportunityStore(OPPORTUNITIES_PATH)
+        store.get("paylocity-001")                   # indexed lookup
+        store.query(stage="interviewing")             # indexed filter
+        with store.transaction() as data:             # same contract as the YAML backend
+            data["pipeline"].append(...)
+    """
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        yaml_path: Path,
+        db_path: Optional[Path] = None,
+        documents: Optional[DocumentStore] = None
+    ):
+        self.yaml_path = Path(yaml_path)
+        self.db_path = Path(db_path) if db_path else self.yaml_path.with_suffix(".db")
+        self._documents = documents or get_document_store()
+        self._local = threading.local()
+        self._cache_lock = threading.Lock()
+        self._cached: Optional[Tuple[int, Any]] = None  # (revision, frozen document)
+        self._index = OpportunityIndex()
+
+        conn = self._connect()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    # ---------- connections ----------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread (sync endpoints run in a threadpool)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, key: str, value: str) -> None:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def _revision(self) -> int:
+        return int(self._meta("revision") or 0)
+
+    # ---------- YAML sync ----------
+
+    def _sync(self) -> None:
+        """
+        Re-import the YAML file if its content changed since the last
+        import/export (one stat() when it hasn't).
+
+        Raises:
+            FileNotFoundError: If the YAML file doesn't exist
+        """
+        if getattr(self._local, "in_transaction", False):
+            return  # transaction() already synced and holds the lock
+        entry = self._documents.get_entry(self.yaml_path)
+        if entry.digest == self._meta("yaml_digest"):
+            return
+        with self._documents.lock(self.yaml_path):
+            entry = self._documents.get_entry(self.yaml_path)
+            if entry.digest != self._meta("yaml_digest"):
+                self._import(thaw(entry.data), entry.digest)
+
+    def import_yaml(self) -> int:
+        """
+        Replace the database content with the YAML file.
+
+        Returns:
+            Number of opportunities imported
+        """
+        with self._documents.lock(self.yaml_path):
+            entry = self._documents.get_entry(self.yaml_path)
+            document = thaw(entry.data)
+            self._import(document, entry.digest)
+        return len((document or {}).get('pipeline', []) or [])
+
+    def export_yaml(self) -> int:
+        """
+        Write the database content to the YAML file (e.g., after editing the
+        database directly).
+
+        Returns:
+            Number of opportunities exported
+        """
+        with self._documents.lock(self.yaml_path):
+            document = self._load_document()
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                entry = self._documents.write(self.yaml_path, document, lock=False)
+                self._set_meta(conn, "yaml_digest", entry.digest)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len((document or {}).get('pipeline', []) or [])
+
+    def _import(self, document: Any, digest: str) -> None:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM opportunities")
+            pipeline = self._store_document(conn, document)
+            for seq, record in enumerate(pipeline, start=1):
+                self._insert(conn, seq, record)
+            revision = self._bump_revision(conn)
+            self._set_meta(conn, "yaml_digest", digest)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._remember(revision, document)
+
+    # ---------- rows <-> records ----------
+
+    @staticmethod
+    def _fingerprint(record: Any) -> str:
+        return hashlib.sha1(_dumps(record).encode('utf-8')).hexdigest()
+
+    def _store_document(self, conn: sqlite3.Connection, document: Any) -> List[Any]:
+        """Save the top-level document (pipeline as placeholder); return the pipeline"""
+        pipeline = None
+        shell = document
+        if isinstance(document, dict) and isinstance(document.get('pipeline'), list):
+            pipeline = document['pipeline']
+            shell = {key: (None if key == 'pipeline' else value) for key, value in document.items()}
+        self._set_meta(conn, "document", _dumps(shell))
+        self._set_meta(conn, "has_pipeline", "1" if pipeline is not None else "0")
+        return pipeline or []
+
+    def _insert(self, conn: sqlite3.Connection, seq: int, record: Any) -> None:
+        if not isinstance(record, dict):
+            # Malformed entry - keep it verbatim so export round-trips
+            conn.execute(
+                "INSERT INTO opportunities (seq, data, normalized, fingerprint) VALUES (?, ?, '', ?)",
+                (seq, _dumps(record), self._fingerprint(record))
+            )
+            return
+
+        shell = dict(record)
+        normalized = []
+        if isinstance(record.get(TIMELINE_KEY), dict):
+            shell[TIMELINE_KEY] = None
+            normalized.append(TIMELINE_KEY)
+        for section in LIST_SECTIONS:
+            items = record.get(section)
+            if isinstance(items, list) and all(isinstance(item, dict) for item in items):
+                shell[section] = None
+                normalized.append(section)
+
+        conn.execute(
+            "INSERT INTO opportunities (seq, id, company, role, stage, priority, outcome, data, normalized, fingerprint) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                seq, _text(record.get('id')), _text(record.get('company')), _text(record.get('role')),
+                _text(record.get('stage')), _text(record.get('priority')), _text(record.get('outcome')),
+                _dumps(shell), ','.join(normalized), self._fingerprint(record)
+            )
+        )
+
+        if TIMELINE_KEY in normalized:
+            conn.executemany(
+                "INSERT INTO timeline (opportunity_seq, position, event, value) VALUES (?, ?, ?, ?)",
+                [(seq, position, str(event), _dumps(value))
+                 for position, (event, value) in enumerate(record[TIMELINE_KEY].items())]
+            )
+        if 'contacts' in normalized:
+            conn.executemany(
+                "INSERT INTO contacts (opportunity_seq, position, name, role, email, data) VALUES (?, ?, ?, ?, ?, ?)",
+                [(seq, position, _text(contact.get('name')), _text(contact.get('role')),
+                  _text(contact.get('email')), _dumps(contact))
+                 for position, contact in enumerate(record['contacts'])]
+            )
+        if 'notes' in normalized:
+            conn.executemany(
+                "INSERT INTO notes (opportunity_seq, position, date, content, data) VALUES (?, ?, ?, ?, ?)",
+                [(seq, position, _text(note.get('date')), _text(note.get('content')), _dumps(note))
+                 for position, note in enumerate(record['notes'])]
+            )
+
+    def _records(self, where: str = "", params: Tuple = ()) -> List[Any]:
+        """Rebuild records (pipeline order) for the rows matching a WHERE clause"""
+        conn = self._conn
+        rows = conn.execute(
+            f"SELECT seq, data, normalized FROM opportunities {where} ORDER BY seq", params
+        ).fetchall()
+        if not rows:
+            return []
+
+        seqs = [row[0] for row in rows]
+        children: Dict[str, Dict[int, Any]] = {}
+        placeholders = ','.join('?' * len(seqs))
+        for table, select in (
+            (TIMELINE_KEY, "SELECT opportunity_seq, event, value FROM timeline"),
+            ('contacts', "SELECT opportunity_seq, data FROM contacts"),
+            ('notes', "SELECT opportunity_seq, data FROM notes"),
+        ):
+            grouped: Dict[int, Any] = {}
+            for row in conn.execute(
+                f"{select} WHERE opportunity_seq IN ({placeholders}) ORDER BY opportunity_seq, position", seqs
+            ):
+                if table == TIMELINE_KEY:
+                    grouped.setdefault(row[0], {})[row[1]] = _loads(row[2])
+                else:
+                    grouped.setdefault(row[0], []).append(_loads(row[1]))
+            children[table] = grouped
+
+        records = []
+        for seq, data, normalized in rows:
+            record = _loads(data)
+            for section in filter(None, normalized.split(',')):
+                empty = {} if section == TIMELINE_KEY else []
+                record[section] = children[section].get(seq, empty)
+            records.append(record)
+        return records
+
+    def _load_document(self) -> Any:
+        """Rebuild the full document from the database (mutable)"""
+        stored = self._meta("document")
+        if stored is None:
+            raise FileNotFoundError(f"Opportunity database is empty: {self.db_path} (import the YAML file first)")
+        document = _loads(stored)
+        if self._meta("has_pipeline") == "1":
+            document['pipeline'] = self._records()
+        return document
+
+    # ---------- cache ----------
+
+    def _bump_revision(self, conn: sqlite3.Connection) -> int:
+        revision = int((conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone() or [0])[0]) + 1
+        self._set_meta(conn, "revision", str(revision))
+        return revision
+
+    def _remember(self, revision: int, document: Any) -> Any:
+        snapshot = freeze(document)
+        with self._cache_lock:
+            self._cached = (revision, snapshot)
+        return snapshot
+
+    # ---------- public interface (same as YamlOpportunityStore) ----------
+
+    def document(self) -> Any:
+        """
+        Full opportunities document (read-only snapshot).
+
+        Raises:
+            FileNotFoundError: If the YAML file doesn't exist
+        """
+        self._sync()
+        return self._snapshot()
+
+    def _snapshot(self) -> Any:
+        return self._snapshot_entry()[1]
+
+    def _snapshot_entry(self) -> Tuple[int, Any]:
+        revision = self._revision()
+        cached = self._cached
+        if cached is not None and cached[0] == revision:
+            return cached
+        return revision, self._remember(revision, self._load_document())
+
+    def validators(self) -> Tuple[str, Optional[float]]:
+        """(content digest, mtime) of the YAML file the database mirrors, for HTTP caching"""
+        self._sync()
+        entry = self._documents.get_entry(self.yaml_path)
+        return entry.digest, entry.signature[0] / 1e9
+
+    def index(self) -> OpportunityIndex:
+        """In-memory index over the current snapshot (for aggregates)"""
+        self._sync()
+        revision, snapshot = self._snapshot_entry()
+        if self._index.version != revision:
+            document = snapshot if isinstance(snapshot, dict) else {}
+            self._index.refresh(document.get('pipeline') or [], revision)
+        return self._index
+
+    def aggregates(self) -> StageAggregates:
+        """Live counters for the current document (copy() before applying deltas)"""
+        return self.index().aggregates
+
+    def get(self, opportunity_id: str) -> Optional[Dict[str, Any]]:
+        """Opportunity by id (read-only), or None"""
+        self._sync()
+        records = self._records("WHERE seq = (SELECT MIN(seq) FROM opportunities WHERE id = ?)", (opportunity_id,))
+        return freeze(records[0]) if records else None
+
+    def next_id(self, company: str) -> str:
+        """
+        Next free id for a company (e.g., "acme-003"), from an id range scan.
+
+        Call inside transaction() so no other writer can take the same id.
+        """
+        prefix = company_prefix(company)
+        rows = self._conn.execute(
+            "SELECT id FROM opportunities WHERE id >= ? AND id < ?", (prefix, prefix + '\U0010ffff')
+        )
+        max_num = max((id_sequence(row[0]) or 0 for row in rows if row[0].startswith(prefix)), default=0)
+        return f"{prefix}-{max_num + 1:03d}"
+
+    def get_many(self, opportunity_ids: List[str]) -> List[Dict[str, Any]]:
+        """Opportunities for the given ids, in request order (unknown ids skipped)"""
+        self._sync()
+        if not opportunity_ids:
+            return []
+        placeholders = ','.join('?' * len(opportunity_ids))
+        by_id: Dict[str, Any] = {}
+        for record in self._records(f"WHERE id IN ({placeholders})", tuple(opportunity_ids)):
+            by_id.setdefault(record.get('id'), record)
+        return [freeze(by_id[opportunity_id]) for opportunity_id in opportunity_ids if opportunity_id in by_id]
+
+    def query(
+        self,
+        stage: Optional[str] = None,
+        priority: Optional[str] = None,
+        company: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Filter opportunities in pipeline order.
+
+        Args:
+            stage: Exact stage
+            priority: Exact priority
+            company: Case-insensitive substring of the company name
+        """
+        self._sync()
+        clauses, params = [], []
+        if stage is not None:
+            clauses.append("stage = ?")
+            params.append(stage)
+        if priority is not None:
+            clauses.append("priority = ?")
+            params.append(priority)
+        if company:
+            clauses.append("instr(lower(company), ?) > 0")
+            params.append(company.lower())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return [freeze(record) for record in self._records(where, tuple(params))]
+
+    @contextmanager
+    def transaction(self, touched: Optional[Iterable[str]] = None) -> Iterator[Any]:
+        """
+        Locked read-modify-write of the whole document.
+
+        Yields a mutable copy; if the block exits normally only the changed
+        opportunities are written to the database, and the YAML file is
+        re-exported atomically in the same database transaction. Raising
+        inside the block leaves both untouched.
+
+        Args:
+            touched: Ids of the existing opportunities the block may change
+                (see YamlOpportunityStore.transaction)
+        """
+        with self._documents.lock(self.yaml_path):
+            entry = self._documents.get_entry(self.yaml_path)
+            if entry.digest != self._meta("yaml_digest"):
+                self._import(thaw(entry.data), entry.digest)
+
+            base, snapshot = self._snapshot_entry()
+            document = thaw(snapshot)
+            self._local.in_transaction = True
+            try:
+                yield document
+            finally:
+                self._local.in_transaction = False
+
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._apply(conn, document)
+                revision = self._bump_revision(conn)
+                entry = self._documents.write(self.yaml_path, document, lock=False)
+                self._set_meta(conn, "yaml_digest", entry.digest)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            snapshot = self._remember(revision, document)
+            pipeline = snapshot.get('pipeline') if isinstance(snapshot, dict) else None
+            self._index.refresh_write(pipeline or [], revision, base, touched)
+
+    def _apply(self, conn: sqlite3.Connection, document: Any) -> None:
+        """
+        Write the difference between the stored rows and `document`.
+
+        Rows are matched by id. Unchanged rows are skipped, changed rows are
+        rewritten in place, removed rows are deleted and new rows appended.
+        Anything else (reordering, duplicate or missing ids) rewrites the
+        pipeline.
+        """
+        pipeline = self._store_document(conn, document)
+        stored = conn.execute("SELECT seq, id, fingerprint FROM opportunities ORDER BY seq").fetchall()
+
+        stored_ids = [row[1] for row in stored]
+        new_ids = [record.get('id') if isinstance(record, dict) else None for record in pipeline]
+        unique = (
+            None not in stored_ids and None not in new_ids
+            and len(set(stored_ids)) == len(stored_ids) and len(set(new_ids)) == len(new_ids)
+        )
+
+        if unique:
+            by_id = {row[1]: (row[0], row[2]) for row in stored}
+            matched = [by_id[opportunity_id][0] for opportunity_id in new_ids if opportunity_id in by_id]
+            first_new = next((i for i, opportunity_id in enumerate(new_ids) if opportunity_id not in by_id), len(new_ids))
+            in_order = matched == sorted(matched) and all(
+                opportunity_id not in by_id for opportunity_id in new_ids[first_new:]
+            )
+        else:
+            in_order = False
+
+        if not in_order:
+            conn.execute("DELETE FROM opportunities")
+            for seq, record in enumerate(pipeline, start=1):
+                self._insert(conn, seq, record)
+            return
+
+        keep = set(new_ids)
+        conn.executemany(
+            "DELETE FROM opportunities WHERE seq = ?",
+            [(seq,) for seq, opportunity_id, _ in stored if opportunity_id not in keep]
+        )
+        next_seq = (stored[-1][0] if stored else 0) + 1
+        for record in pipeline:
+            existing = by_id.get(record['id'])
+            if existing is None:
+                self._insert(conn, next_seq, record)
+                next_seq += 1
+            elif existing[1] != self._fingerprint(record):
+                conn.execute("DELETE FROM opportunities WHERE seq = ?", (existing[0],))
+                self._insert(conn, existing[0], record)
+
+    def flush(self) -> bool:
+        """Nothing is deferred in the SQLite backend (kept for interface parity)"""
+        return False
+
+    def close(self) -> None:
+        """Close this thread's database connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._conn
+        counts = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("opportunities", "contacts", "notes", "timeline")
+        }
+        return {
+            "backend": self.backend,
+            "yaml_path": str(self.yaml_path),
+            "db_path": str(self.db_path),
+            "revision": self._revision(),
+            "rows": counts,
+        }
+
+
+# Global opportunity store instance
+_opportunity_store = None
+
+
+def get_opportunity_store(yaml_path: Optional[Path] = None):
+    """
+    Get or create the global opportunity store.
+
+    Args:
+        yaml_path: Path to opportunities/structure.yaml (required on first call)
+
+    Raises:
+        ValueError: If OPPORTUNITIES_BACKEND is not yaml or sqlite
+    """
+    global _opportunity_store
+    if _opportunity_store is None:
+        if yaml_path is None:
+            raise ValueError("yaml_path is required to create the opportunity store")
+        backend = os.getenv("OPPORTUNITIES_BACKEND", "yaml").lower()
+        write_behind = os.getenv("OPPORTUNITIES_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+        if backend == "sqlite":
+            if write_behind:
+                print("Warning: OPPORTUNITIES_WRITE_BEHIND is ignored by the sqlite backend")
+            db_path = os.getenv("OPPORTUNITIES_DB_PATH")
+            _opportunity_store = SqliteOpportunityStore(yaml_path, Path(db_path) if db_path else None)
+        elif backend == "yaml":
+            _opportunity_store = YamlOpportunityStore(
+                yaml_path,
+                write_behind=write_behind,
+                flush_delay=float(os.getenv("OPPORTUNITIES_FLUSH_DELAY", "0.5")),
+                flush_max_pending=int(os.getenv("OPPORTUNITIES_FLUSH_MAX_PENDING", "20"))
+            )
+        else:
+            raise ValueError(f"Unknown OPPORTUNITIES_BACKEND '{backend}' (expected one of: {', '.join(BACKENDS)})")
+    return _opportunity_store
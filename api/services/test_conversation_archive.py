@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the compressed conversation archive
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import conversation_archive as conversation_archive_module
+from services.conversation_archive import ConversationArchive
+
+
+def log(count):
+    return b"".join(b'{"role":"user","content":"message %d"}\n' % i for i in range(count))
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ConversationArchive(tmp_path / "archive")
+
+
+def test_members_are_compressed_and_read_back(archive):
+    archive.put("conv_1", {"id": "conv_1", "name": "First"}, 200, log(200))
+    archive.put("conv_2", {"id": "conv_2"}, 3, log(3))
+
+    assert archive.read("conv_1") == log(200)
+    assert archive.read("conv_2") == log(3)
+    entry = archive.get("conv_1")
+    assert entry["length"] < entry["log_bytes"]
+    assert [conversation_id for conversation_id, _ in archive.list()] == ["conv_2", "conv_1"]
+    assert "conv_1" in archive and "conv_3" not in archive
+
+
+def test_update_session_touches_only_the_index(archive):
+    archive.put("conv_1", {"id": "conv_1", "name": "Old"}, 1, log(1))
+    bundle = archive.directory / archive.get("conv_1")["bundle"]
+    size = bundle.stat().st_size
+
+    archive.update_session("conv_1", name="New")
+
+    assert archive.get("conv_1")["session"]["name"] == "New"
+    assert bundle.stat().st_size == size
+
+
+def test_bundles_roll_over_and_empty_ones_are_deleted(archive, monkeypatch):
+    monkeypatch.setattr(conversation_archive_module, "BUNDLE_MAX_BYTES", 1)
+    archive.put("conv_1", {}, 1, log(1))
+    archive.put("conv_2", {}, 1, log(1))
+    assert archive.get("conv_1")["bundle"] != archive.get("conv_2")["bundle"]
+
+    archive.remove("conv_1")
+
+    assert sorted(path.name for path in archive.directory.glob("bundle_*")) == ["bundle_0002.gz"]
+    with pytest.raises(FileNotFoundError):
+        archive.read("conv_1")
+
+
+def test_repack_reclaims_dead_members(archive):
+    for i in range(3):
+        archive.put(f"conv_{i}", {}, 50, log(50))
+    archive.remove("conv_1")
+    assert archive.stats()["dead_bytes"] > 0
+
+    assert archive.repack() > 0
+
+    stats = archive.stats()
+    assert stats["dead_bytes"] == 0 and stats["bundles"] == 1
+    assert archive.read("conv_0") == log(50) and archive.read("conv_2") == log(50)
+
+
+def test_search_matches_archived_names(archive):
+    archive.put("conv_1", {"id": "conv_1", "name": "System design review"}, 1, log(1))
+    archive.put("conv_2", {"id": "conv_2", "name": "Salary talk"}, 1, log(1))
+    archive.put("conv_3", {"id": "conv_3"}, 1, log(1))
+
+    hits = archive.search("design rev")
+    assert [hit["conversation_id"] for hit in hits] == ["conv_1"]
+    assert hits[0]["snippet"] == "System **design** **review**"
+    assert hits[0]["archived"] is True and hits[0]["message_id"] is None
+    assert [hit["conversation_id"] for hit in archive.search("s")] == ["conv_2", "conv_1"]
+    assert archive.search("s", limit=1)[0]["conversation_id"] == "conv_2"
+    assert archive.search("design talk") == []
+    assert archive.latest()[0] == "conv_3"
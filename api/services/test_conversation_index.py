@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the conversation metadata index
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.conversation_index import ConversationIndex
+from services.directory_index import DirectoryIndex
+from services.document_store import yaml_io
+
+
+def conversation(conversation_id, name="Chat", messages=0, archived=False):
+    return {
+        "session": {"id": conversation_id, "name": name, "date": "2025-10-25T18:33:00", "archived": archived},
+        "messages": [{"role": "user", "content": f"message {i}"} for i in range(messages)],
+    }
+
+
+@pytest.fixture
+def loads():
+    return []
+
+
+@pytest.fixture
+def make_index(tmp_path, loads):
+    def load(path):
+        loads.append(Path(path).name)
+        return yaml_io.load_file(path)
+
+    def make():
+        return ConversationIndex(DirectoryIndex(tmp_path, ("*.yaml",)), load)
+
+    return make
+
+
+def save(index, path, document):
+    yaml_io.dump_file(path, document)
+    return index.record(path, document)
+
+
+def test_recorded_conversations_are_listed_without_reading_files(tmp_path, make_index, loads):
+    index = make_index()
+    save(index, tmp_path / "conv_1.yaml", conversation("conv_1", "First", messages=2))
+    save(index, tmp_path / "conv_2.yaml", conversation("conv_2", "Second", archived=True))
+
+    listing = {meta.stem: meta for meta in index.list()}
+    assert listing["conv_1"].name == "First" and listing["conv_1"].message_count == 2
+    assert listing["conv_2"].archived is True
+    assert loads == []
+    assert len(index) == 2
+
+
+def test_external_edits_and_deletes_are_picked_up(tmp_path, make_index, loads):
+    index = make_index()
+    save(index, tmp_path / "conv_1.yaml", conversation("conv_1"))
+    save(index, tmp_path / "conv_2.yaml", conversation("conv_2"))
+
+    yaml_io.dump_file(tmp_path / "conv_1.yaml", conversation("conv_1", "Edited by hand", messages=5))
+    (tmp_path / "conv_2.yaml").unlink()
+
+    listing = index.list()
+    assert [(meta.stem, meta.name, meta.message_count) for meta in listing] == [("conv_1", "Edited by hand", 5)]
+    assert loads == ["conv_1.yaml"]
+
+
+def test_manifest_survives_restart(tmp_path, make_index, loads):
+    index = make_index()
+    save(index, tmp_path / "conv_1.yaml", conversation("conv_1", "Persisted"))
+    assert index.flush() is True
+    assert (tmp_path / ".index.json").exists()
+
+    restarted = make_index()
+    assert [meta.name for meta in restarted.list()] == ["Persisted"]
+    assert loads == []
+
+
+def test_unreadable_manifest_is_rebuilt(tmp_path, make_index, loads):
+    yaml_io.dump_file(tmp_path / "conv_1.yaml", conversation("conv_1", "From file"))
+    (tmp_path / ".index.json").write_text("{not json", encoding="utf-8")
+
+    index = make_index()
+    assert [meta.name for meta in index.list()] == ["From file"]
+    assert loads == ["conv_1.yaml"]
+    assert [meta.name for meta in make_index().list()] == ["From file"]
+
+
+def test_remove_drops_entry(tmp_path, make_index):
+    index = make_index()
+    path = tmp_path / "conv_1.yaml"
+    save(index, path, conversation("conv_1"))
+
+    path.unlink()
+    index.remove(path)
+    assert index.list() == []
+    assert index.get("conv_1") is None
+
+
+def test_latest_validates_only_the_newest_file(tmp_path, make_index, loads):
+    index = make_index()
+    save(index, tmp_path / "conv_1.yaml", conversation("conv_1", "Older"))
+    save(index, tmp_path / "conv_2.yaml", conversation("conv_2", "Newer"))
+    yaml_io.dump_file(tmp_path / "conv_1.yaml", conversation("conv_1", "Edited", messages=1))
+    os.utime(tmp_path / "conv_1.yaml", ns=(0, 0))  # edited, but not the newest
+
+    assert index.latest().name == "Newer"
+    assert loads == []
+
+
+def test_record_stats_one_file_and_defers_the_manifest(tmp_path, make_index, loads):
+    index = make_index()
+    for i in range(3):
+        save(index, tmp_path / f"conv_{i}.yaml", conversation(f"conv_{i}"))
+    rescans = index.files.stats()["rescans"]
+
+    save(index, tmp_path / "conv_3.yaml", conversation("conv_3", "Appended", messages=1))
+    assert index.files.stats()["rescans"] == rescans
+    assert index.stats()["manifest_writes"] == 0
+    assert not (tmp_path / ".index.json").exists()
+
+    # Listing saves the pending changes; a restart then reads nothing
+    assert index.list()[0].name == "Appended"
+    assert index.stats()["manifest_writes"] == 1
+    assert index.flush() is False
+    assert len(make_index().list()) == 4
+    assert loads == []
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the conversation full-text search index
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.conversation_index import ConversationIndex
+from services.conversation_search import ConversationSearch, SearchError, build_match
+from services.conversation_store import ConversationStore, read_listing_document
+from services.directory_index import DirectoryIndex
+from services.document_store import yaml_io
+
+
+def message(content, role="user"):
+    return {"role": role, "timestamp": "2025-10-25T18:33:00", "content": content}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ConversationIndex(DirectoryIndex(tmp_path, ("*.json", "*.yaml")), read_listing_document)
+
+
+@pytest.fixture
+def search(tmp_path):
+    search = ConversationSearch(tmp_path / ".search.db")
+    yield search
+    search.close()
+
+
+@pytest.fixture
+def store(tmp_path, index, search):
+    return ConversationStore(tmp_path, index, search)
+
+
+def hits(search, query, **kwargs):
+    return [(hit["conversation_id"], hit["message_id"]) for hit in search.search(query, **kwargs)]
+
+
+def test_build_match_quotes_terms_and_prefixes_the_last():
+    assert build_match('System "design" OR') == '"system" "design" "or"*'
+    with pytest.raises(SearchError):
+        build_match("  -- ")
+
+
+def test_writes_keep_the_index_current(store, search):
+    store.create("conv_1", {"id": "conv_1", "name": "Interview prep"}, [message("Practice system design questions")])
+    store.append("conv_1", [message("Kubernetes rollout strategies", "assistant")])
+    store.create("conv_2", {"id": "conv_2", "name": "Salary"}, [message("Negotiating the design offer")])
+
+    assert hits(search, "kubernetes") == [("conv_1", 1)]
+    assert sorted(hits(search, "design")) == [("conv_1", 0), ("conv_2", 0)]
+    assert hits(search, "kuber") == [("conv_1", 1)]  # prefix of the last word
+    assert hits(search, "system kubernetes") == []  # every word in one message
+
+    [hit] = search.search("rollout")
+    assert hit["conversation_name"] == "Interview prep"
+    assert hit["role"] == "assistant"
+    assert "**rollout**" in hit["snippet"]
+
+    store.update_session("conv_1", name="Renamed", archived=True)
+    assert search.search("rollout")[0]["conversation_name"] == "Renamed"
+    assert hits(search, "rollout", include_archived=False) == []
+
+    store.delete("conv_1")
+    assert hits(search, "design") == [("conv_2", 0)]
+
+
+def test_accents_are_ignored(store, search):
+    store.create("conv_1", {"id": "conv_1"}, [message("Preparación para la entrevista técnica")])
+    assert hits(search, "preparacion tecnica") == [("conv_1", 0)]
+
+
+def test_sync_indexes_files_written_elsewhere(tmp_path, index, search):
+    store = ConversationStore(tmp_path, index)  # no search attached
+    store.create("conv_1", {"id": "conv_1"}, [message("graphql federation")])
+    yaml_io.dump_file(tmp_path / "conv_old.yaml", {"session": {"id": "conv_old"}, "messages": [message("legacy graphql notes")]})
+
+    assert search.sync(index.list, store.load_own, tag="v1") == 2
+    assert sorted(hits(search, "graphql")) == [("conv_1", 0), ("conv_old", 0)]
+    # Unchanged tag: the listing isn't even read
+    assert search.sync(lambda: pytest.fail("listing read"), store.load_own, tag="v1") == 0
+
+    store.delete("conv_1")
+    assert search.sync(index.list, store.load_own, tag="v2") == 0
+    assert hits(search, "graphql") == [("conv_old", 0)]
+
+
+def test_compaction_reindexes(store, search):
+    store.create("conv_1", {"id": "conv_1"}, [message("first"), message("second")])
+    with open(store.log_path("conv_1"), "ab") as f:
+        f.write(b'{"role":"user","cont')  # torn line
+
+    store.append("conv_1", [message("third")])
+    assert hits(search, "third") == [("conv_1", 2)]
+    assert search.stats()["messages"] == 3
+
+
+def test_forks_index_only_their_own_messages(store, search, index):
+    store.create("conv_1", {"id": "conv_1"}, [message("shared terraform notes")])
+    store.duplicate("conv_1", "conv_2", {"id": "conv_2"})
+    store.append("conv_2", [message("terraform follow-up")])
+
+    assert sorted(hits(search, "terraform")) == [("conv_1", 0), ("conv_2", 1)]
+    assert search.sync(index.list, store.load_own, tag="v1") == 0
+
+    store.delete("conv_1")  # the fork gets its own copy
+    assert sorted(hits(search, "terraform")) == [("conv_2", 0), ("conv_2", 1)]
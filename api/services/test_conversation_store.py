@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the append-only conversation store
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services import conversation_store as conversation_store_module
+from services.conversation_archive import ConversationArchive
+from services.conversation_index import ConversationIndex
+from services.conversation_search import ConversationSearch
+from services.conversation_store import ConversationStore, read_listing_document
+from services.directory_index import DirectoryIndex
+from services.document_store import lock_path_for, yaml_io
+
+
+def message(i, role="user"):
+    return {"role": role, "timestamp": f"2025-10-25T18:{i:02d}:00", "content": f"message {i}\nsecond line"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ConversationIndex(DirectoryIndex(tmp_path, ("*.json", "*.yaml")), read_listing_document)
+
+
+@pytest.fixture
+def store(tmp_path, index):
+    return ConversationStore(tmp_path, index)
+
+
+@pytest.fixture
+def cold_store(tmp_path, index):
+    return ConversationStore(tmp_path, index, cold=ConversationArchive(tmp_path / "cold"))
+
+
+def test_create_append_and_load(store, index):
+    store.create("conv_1", {"id": "conv_1", "name": "First"})
+    store.append("conv_1", [message(0), message(1, "assistant")])
+    store.append("conv_1", [message(2)])
+
+    assert store.load("conv_1") == {
+        "session": {"id": "conv_1", "name": "First"},
+        "messages": [message(0), message(1, "assistant"), message(2)],
+    }
+    # One line per message, multi-line content escaped
+    assert len(store.log_path("conv_1").read_bytes().splitlines()) == 3
+    [meta] = index.list()
+    assert (meta.name, meta.message_count) == ("First", 3)
+
+
+def test_append_creates_missing_conversation_only_with_session(store):
+    with pytest.raises(FileNotFoundError):
+        store.append("conv_1", [message(0)])
+
+    sidecar = store.append("conv_1", [message(0)], session={"id": "conv_1"})
+    assert sidecar["message_count"] == 1
+
+
+def test_tail_reads_from_the_end(store, monkeypatch):
+    monkeypatch.setattr(conversation_store_module, "TAIL_BLOCK_SIZE", 64)
+    store.create("conv_1", {"id": "conv_1"}, [message(i) for i in range(30)])
+
+    assert store.tail("conv_1", 3) == [message(27), message(28), message(29)]
+    assert store.tail("conv_1", 100) == [message(i) for i in range(30)]
+    assert store.tail("conv_1", 0) == []
+
+
+def test_torn_last_line_is_skipped_and_compacted_on_next_write(store):
+    store.create("conv_1", {"id": "conv_1"}, [message(0)])
+    with open(store.log_path("conv_1"), "ab") as f:
+        f.write(b'{"role":"user","cont')  # crash mid-append
+
+    assert store.tail("conv_1", 5) == [message(0)]
+    assert store.needs_compaction("conv_1")
+
+    sidecar = store.append("conv_1", [message(1)])
+    assert sidecar["message_count"] == 2
+    assert store.load("conv_1")["messages"] == [message(0), message(1)]
+    assert not store.needs_compaction("conv_1")
+
+
+def test_update_session_leaves_log_untouched(store):
+    store.create("conv_1", {"id": "conv_1", "name": "Old", "archived": False}, [message(0)])
+    log_before = store.log_path("conv_1").stat().st_mtime_ns
+
+    store.update_session("conv_1", name="New", archived=True)
+
+    assert store.session("conv_1") == {"id": "conv_1", "name": "New", "archived": True}
+    assert store.log_path("conv_1").stat().st_mtime_ns == log_before
+
+
+def test_legacy_yaml_is_read_and_migrated_on_first_write(tmp_path, store, index):
+    legacy = tmp_path / "conv_old.yaml"
+    yaml_io.dump_file(legacy, {"session": {"id": "conv_old", "name": "Legacy"}, "messages": [message(0)]})
+
+    assert store.exists("conv_old")
+    assert store.tail("conv_old", 10) == [message(0)]
+    assert [meta.name for meta in index.list()] == ["Legacy"]
+
+    store.append("conv_old", [message(1)])
+
+    assert not legacy.exists()
+    assert store.load("conv_old")["messages"] == [message(0), message(1)]
+    assert [(meta.name, meta.message_count) for meta in index.list()] == [("Legacy", 2)]
+
+
+def test_migrate_keeps_yaml_on_request(tmp_path, store, index):
+    legacy = tmp_path / "conv_old.yaml"
+    yaml_io.dump_file(legacy, {"session": {"id": "conv_old"}, "messages": [message(0), message(1)]})
+
+    assert store.legacy_ids() == ["conv_old"]
+    store.migrate("conv_old", keep_legacy=True)
+
+    assert legacy.exists()
+    assert store.legacy_ids() == []
+    assert store.ids() == ["conv_old"]
+    assert [meta.message_count for meta in index.list()] == [2]
+
+
+def test_delete_removes_all_files(tmp_path, store, index):
+    store.create("conv_1", {"id": "conv_1"}, [message(0)])
+    store.delete("conv_1")
+
+    assert sorted(path.name for path in tmp_path.iterdir() if not path.name.startswith(".")) == []
+    # Never unlinked: another worker may be waiting on it
+    assert lock_path_for(store.session_path("conv_1")).exists()
+    assert index.list() == []
+    with pytest.raises(FileNotFoundError):
+        store.delete("conv_1")
+
+
+def test_sidecar_is_plain_json(store):
+    store.create("conv_1", {"id": "conv_1"}, [message(0)])
+    sidecar = json.loads(store.session_path("conv_1").read_text(encoding="utf-8"))
+
+    assert sidecar["message_count"] == 1
+    assert sidecar["log_bytes"] == store.log_path("conv_1").stat().st_size
+
+
+def test_page_walks_backwards_with_cursors(store, monkeypatch):
+    monkeypatch.setattr(conversation_store_module, "TAIL_BLOCK_SIZE", 64)
+    store.create("conv_1", {"id": "conv_1"}, [message(i) for i in range(25)])
+
+    page = store.page("conv_1", 10)
+    assert page["messages"] == [message(i) for i in range(15, 25)]
+    assert page["message_count"] == 25
+
+    older = store.page("conv_1", 10, page["next_cursor"])
+    assert older["messages"] == [message(i) for i in range(5, 15)]
+
+    oldest = store.page("conv_1", 10, older["next_cursor"])
+    assert oldest["messages"] == [message(i) for i in range(5)]
+    assert oldest["next_cursor"] is None
+
+
+def test_page_cursor_survives_appends_and_compaction(store):
+    store.create("conv_1", {"id": "conv_1"}, [message(i) for i in range(10)])
+    cursor = store.page("conv_1", 4)["next_cursor"]
+
+    store.append("conv_1", [message(10)])
+    assert store.page("conv_1", 3, cursor)["messages"] == [message(3), message(4), message(5)]
+
+    store.compact("conv_1")  # new log file: the byte offset no longer applies
+    assert store.page("conv_1", 3, cursor)["messages"] == [message(3), message(4), message(5)]
+
+
+def test_page_of_legacy_yaml(tmp_path, store):
+    yaml_io.dump_file(tmp_path / "conv_old.yaml", {"session": {"id": "conv_old"}, "messages": [message(i) for i in range(5)]})
+
+    page = store.page("conv_old", 3)
+    assert page["messages"] == [message(2), message(3), message(4)]
+    assert store.page("conv_old", 3, page["next_cursor"])["messages"] == [message(0), message(1)]
+
+
+def test_page_rejects_invalid_cursor(store):
+    store.create("conv_1", {"id": "conv_1"}, [message(0)])
+    with pytest.raises(conversation_store_module.CursorError):
+        store.page("conv_1", 10, "not-a-cursor")
+
+
+def test_duplicate_forks_without_copying(store, index):
+    store.create("conv_1", {"id": "conv_1", "name": "Original"}, [message(i) for i in range(10)])
+
+    sidecar = store.duplicate("conv_1", "conv_2", {"id": "conv_2", "name": "Copy"})
+
+    assert sidecar["message_count"] == 10
+    assert store.log_path("conv_2").stat().st_size == 0
+    store.append("conv_2", [message(10)])
+    store.append("conv_1", [message(99)])  # after the fork point: not inherited
+
+    assert store.load("conv_2")["messages"] == [message(i) for i in range(11)]
+    assert store.load("conv_1")["messages"][-1] == message(99)
+    assert store.tail("conv_2", 3) == [message(8), message(9), message(10)]
+    assert {meta.stem: meta.message_count for meta in index.list()} == {"conv_1": 11, "conv_2": 11}
+    assert store.forks("conv_1") == ["conv_2"]
+
+
+def test_pages_of_a_fork_continue_into_the_parent(store, monkeypatch):
+    monkeypatch.setattr(conversation_store_module, "TAIL_BLOCK_SIZE", 64)
+    store.create("conv_1", {"id": "conv_1"}, [message(i) for i in range(6)])
+    store.duplicate("conv_1", "conv_2", {"id": "conv_2"})
+    store.append("conv_2", [message(i) for i in range(6, 9)])
+    store.duplicate("conv_2", "conv_3", {"id": "conv_3"})
+    store.append("conv_3", [message(9)])
+
+    seen, cursor = [], None
+    while True:
+        page = store.page("conv_3", 4, cursor)
+        seen = page["messages"] + seen
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [message(i) for i in range(10)]
+    assert store.page("conv_3", 4)["message_count"] == 10
+
+
+def test_deleting_the_original_flattens_its_forks(store):
+    store.create("conv_1", {"id": "conv_1"}, [message(0), message(1)])
+    store.duplicate("conv_1", "conv_2", {"id": "conv_2"})
+    store.append("conv_2", [message(2)])
+    store.duplicate("conv_2", "conv_3", {"id": "conv_3"})
+
+    store.delete("conv_1")
+
+    assert store.load("conv_2")["messages"] == [message(0), message(1), message(2)]
+    assert store.load("conv_3")["messages"] == [message(0), message(1), message(2)]
+    assert "parent" not in json.loads(store.session_path("conv_2").read_text(encoding="utf-8"))
+    assert not store.needs_compaction("conv_2")
+
+
+def test_forks_created_by_another_worker_are_released(tmp_path, store, index):
+    store.create("conv_1", {"id": "conv_1"}, [message(0)])
+    index.files.set_watched(True)
+    index.list()  # watched listing, now trusting (missing) events
+
+    other = ConversationStore(tmp_path, ConversationIndex(DirectoryIndex(tmp_path, ("*.json", "*.yaml")), read_listing_document))
+    other.duplicate("conv_1", "conv_2", {"id": "conv_2"})
+
+    store.delete("conv_1")
+    assert store.load("conv_2")["messages"] == [message(0)]
+
+
+def test_compacting_a_fork_keeps_its_inherited_messages(store):
+    store.create("conv_1", {"id": "conv_1"}, [message(0)])
+    store.duplicate("conv_1", "conv_2", {"id": "conv_2"})
+    store.append("conv_2", [message(1)])
+    with open(store.log_path("conv_2"), "ab") as f:
+        f.write(b'{"role":"user","cont')
+
+    assert store.needs_compaction("conv_2")
+    store.compact("conv_2")
+    assert store.load("conv_2")["messages"] == [message(0), message(1)]
+    assert store.load_own("conv_2")["start"] == 1
+
+
+def test_archive_moves_conversation_to_cold_storage(cold_store, index):
+    store = cold_store
+    store.create("conv_1", {"id": "conv_1", "name": "Done"}, [message(i) for i in range(5)])
+
+    store.archive("conv_1")
+
+    assert not store.session_path("conv_1").exists() and not store.log_path("conv_1").exists()
+    assert index.list() == []
+    assert store.is_archived("conv_1") and store.exists("conv_1")
+    assert store.session("conv_1")["archived"] is True
+    assert store.page("conv_1", 2)["messages"] == [message(3), message(4)]
+
+    store.update_session("conv_1", name="Renamed")  # stays archived
+    assert store.is_archived("conv_1")
+
+    store.append("conv_1", [message(5)])  # writing brings it back
+    assert not store.is_archived("conv_1")
+    assert store.load("conv_1") == {
+        "session": {"id": "conv_1", "name": "Renamed", "archived": False},
+        "messages": [message(i) for i in range(6)],
+    }
+    assert [meta.message_count for meta in index.list()] == [6]
+
+
+def test_archiving_the_original_flattens_forks(cold_store):
+    store = cold_store
+    store.create("conv_1", {"id": "conv_1"}, [message(0)])
+    store.duplicate("conv_1", "conv_2", {"id": "conv_2"})
+
+    store.archive("conv_1")
+    store.restore("conv_1")
+
+    assert store.load("conv_2")["messages"] == [message(0)]
+    assert store.load("conv_1")["session"]["archived"] is False
+    assert "conv_1" not in store.cold
+
+
+def test_archived_conversations_are_counted_and_found_by_name(tmp_path, index):
+    search = ConversationSearch(tmp_path / ".search.db")
+    store = ConversationStore(tmp_path, index, search, ConversationArchive(tmp_path / "cold"))
+    store.create("conv_1", {"id": "conv_1", "name": "Interview prep"}, [message(0)])
+    store.create("conv_2", {"id": "conv_2", "name": "Chat 2"}, [message(1)])
+
+    store.archive("conv_1")
+
+    # Listings read the hot index and the archive's; default names count both
+    assert [meta.stem for meta in index.list()] == ["conv_2"]
+    assert [conversation_id for conversation_id, _ in store.cold.list()] == ["conv_1"]
+    assert len(index) + len(store.cold) == 2
+    # Its messages leave the full-text index; its name stays searchable
+    assert [hit["conversation_id"] for hit in search.search("message")] == ["conv_2"]
+    assert [hit["conversation_id"] for hit in store.cold.search("interview")] == ["conv_1"]
+
+    store.restore("conv_1")
+    assert store.cold.search("interview") == []
+    assert {hit["conversation_id"] for hit in search.search("message")} == {"conv_1", "conv_2"}
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the cached YAML document store
+"""
+
+import asyncio
+import copy
+import os
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.document_store import DocumentStore, FrozenDict, lock_path_for, yaml_snapshot
+
+
+@pytest.fixture
+def doc_path(tmp_path):
+    path = tmp_path / "structure.yaml"
+    path.write_text("meta:\n  version: '1.0.0'\npipeline:\n- id: acme-001\n  stage: applied\n", encoding="utf-8")
+    return path
+
+
+def test_snapshot_is_cached_and_read_only(doc_path):
+    store = DocumentStore()
+    first = store.get(doc_path)
+    second = store.get(doc_path)
+
+    assert first is second
+    assert isinstance(first, FrozenDict)
+    assert store.stats()["parses"] == 1
+
+    with pytest.raises(TypeError):
+        first["meta"]["version"] = "2.0.0"
+    with pytest.raises(TypeError):
+        first["pipeline"].append({})
+
+
+def test_copy_is_plain_and_mutable(doc_path):
+    store = DocumentStore()
+    data = store.get_copy(doc_path)
+
+    assert type(data) is dict
+    assert type(data["pipeline"]) is list
+    data["pipeline"].append({"id": "beta-001"})
+
+    # Snapshot is unaffected by mutations of the copy
+    assert len(store.get(doc_path)["pipeline"]) == 1
+    assert copy.deepcopy(store.get(doc_path)) == {"meta": {"version": "1.0.0"}, "pipeline": [{"id": "acme-001", "stage": "applied"}]}
+
+
+def test_external_edit_is_picked_up(doc_path):
+    store = DocumentStore()
+    store.get(doc_path)
+
+    doc_path.write_text("meta:\n  version: '2.0.0'\npipeline: []\n", encoding="utf-8")
+
+    assert store.get(doc_path)["meta"]["version"] == "2.0.0"
+    assert store.get_entry(doc_path).version == 2
+
+
+def test_touch_without_content_change_skips_parse(doc_path):
+    store = DocumentStore()
+    store.get(doc_path)
+
+    stat = doc_path.stat()
+    os.utime(doc_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    store.get(doc_path)
+
+    stats = store.stats()
+    assert stats["parses"] == 1
+    assert stats["revalidated"] == 1
+
+
+def test_write_refreshes_cache(doc_path):
+    store = DocumentStore()
+    data = store.get_copy(doc_path)
+    data["pipeline"][0]["stage"] = "interviewing"
+
+    store.write(doc_path, data)
+
+    assert store.get(doc_path)["pipeline"][0]["stage"] == "interviewing"
+    assert store.stats()["parses"] == 1
+    assert "stage: interviewing" in doc_path.read_text(encoding="utf-8")
+
+
+def test_missing_file_raises(tmp_path):
+    store = DocumentStore()
+    with pytest.raises(FileNotFoundError):
+        store.get(tmp_path / "missing.yaml")
+
+
+def test_write_is_atomic_and_leaves_no_temp_files(doc_path):
+    store = DocumentStore()
+    os.chmod(doc_path, 0o640)
+    inode = doc_path.stat().st_ino
+
+    store.write(doc_path, {"meta": {"version": "2.0.0"}, "pipeline": []})
+
+    assert doc_path.stat().st_ino != inode  # replaced by rename, not rewritten in place
+    assert doc_path.stat().st_mode & 0o777 == 0o640
+    assert sorted(p.name for p in doc_path.parent.iterdir()) == sorted(
+        ["structure.yaml", lock_path_for(doc_path).name, yaml_snapshot.snapshot_path(doc_path).name]
+    )
+
+
+def test_transaction_aborts_on_error(doc_path):
+    store = DocumentStore()
+    before = doc_path.read_text(encoding="utf-8")
+
+    with pytest.raises(KeyError):
+        with store.transaction(doc_path) as data:
+            data["pipeline"].clear()
+            raise KeyError("not found")
+
+    assert doc_path.read_text(encoding="utf-8") == before
+    assert len(store.get(doc_path)["pipeline"]) == 1
+
+
+def test_transaction_default_replaces_empty_or_missing_document(doc_path):
+    store = DocumentStore()
+    doc_path.write_text("", encoding="utf-8")
+
+    async def track(path):
+        async with store.atransaction(path, default={}) as data:
+            data.setdefault("opportunities", []).append({"id": "acme-001"})
+
+    asyncio.run(track(doc_path))
+    assert DocumentStore().get(doc_path) == {"opportunities": [{"id": "acme-001"}]}
+
+    missing = doc_path.with_name("missing.yaml")
+    with store.transaction(missing, default={"opportunities": []}) as data:
+        data["opportunities"].append({"id": "acme-002"})
+    assert DocumentStore().get(missing) == {"opportunities": [{"id": "acme-002"}]}
+
+    with pytest.raises(FileNotFoundError):
+        with store.transaction(doc_path.with_name("other.yaml")):
+            pass
+
+
+def test_concurrent_transactions_do_not_lose_updates(doc_path):
+    store = DocumentStore()
+
+    def add(index):
+        with store.transaction(doc_path) as data:
+            data["pipeline"].append({"id": f"worker-{index:03d}"})
+
+    threads = [threading.Thread(target=add, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # A fresh store re-reads from disk
+    assert len(DocumentStore().get(doc_path)["pipeline"]) == 9
+
+
+def test_async_transactions_serialize(doc_path):
+    store = DocumentStore()
+
+    async def add(index):
+        async with store.atransaction(doc_path) as data:
+            await asyncio.sleep(0)
+            data["pipeline"].append({"id": f"task-{index:03d}"})
+
+    async def scenario():
+        await asyncio.gather(*(add(i) for i in range(5)))
+
+    asyncio.run(scenario())
+    assert len(DocumentStore().get(doc_path)["pipeline"]) == 6
+
+
+def test_watched_directory_skips_stat_until_event(doc_path):
+    store = DocumentStore()
+    store.get(doc_path)
+    store.set_watched(doc_path.parent, True)
+
+    # First read after the watcher starts revalidates (changes before it were missed)
+    store.get(doc_path)
+    assert store.stats()["hits"] == 1
+
+    doc_path.write_text("meta:\n  version: '2.0.0'\n", encoding="utf-8")
+    # No event yet: the cached snapshot is trusted
+    assert store.get(doc_path)["meta"]["version"] == "1.0.0"
+    assert store.stats()["unchecked_hits"] == 1
+
+    store.files_changed([doc_path])
+    assert store.get(doc_path)["meta"]["version"] == "2.0.0"
+    assert store.get(doc_path)["meta"]["version"] == "2.0.0"
+    assert store.stats()["unchecked_hits"] == 2
+
+
+def test_unwatched_directory_revalidates_every_read(doc_path):
+    store = DocumentStore()
+    store.set_watched(doc_path.parent, True)
+    store.set_watched(doc_path.parent, False)
+    store.get(doc_path)
+
+    doc_path.write_text("meta:\n  version: '2.0.0'\n", encoding="utf-8")
+    assert store.get(doc_path)["meta"]["version"] == "2.0.0"
+    assert store.stats()["unchecked_hits"] == 0
+
+
+def test_cold_start_loads_from_snapshot(doc_path):
+    DocumentStore().get(doc_path)  # parses and snapshots
+
+    store = DocumentStore()
+    assert store.get(doc_path)["pipeline"][0]["id"] == "acme-001"
+    assert store.stats()["snapshot_loads"] == 1
+    assert store.stats()["parses"] == 0
+
+
+def test_write_refreshes_snapshot(doc_path):
+    DocumentStore().write(doc_path, {"pipeline": []})
+
+    store = DocumentStore()
+    assert store.get(doc_path) == {"pipeline": []}
+    assert store.stats()["snapshot_loads"] == 1
+
+
+def test_transaction_revalidates_watched_document(doc_path):
+    store = DocumentStore()
+    doc_path.write_text("n: 1\n", encoding="utf-8")
+    store.get(doc_path)
+    store.set_watched(doc_path.parent, True)
+    store.get(doc_path)  # catch-up revalidation
+
+    # External write; the watcher event hasn't arrived yet
+    doc_path.write_text("n: 5\nother: x\n", encoding="utf-8")
+    with store.transaction(doc_path) as data:
+        data["n"] += 1
+
+    assert DocumentStore().get(doc_path) == {"n": 6, "other": "x"}
+
+
+def test_lock_and_atransaction_revalidate_watched_document(doc_path):
+    store = DocumentStore()
+    doc_path.write_text("n: 1\n", encoding="utf-8")
+    store.get(doc_path)
+    store.set_watched(doc_path.parent, True)
+    store.get(doc_path)
+
+    doc_path.write_text("n: 5\n", encoding="utf-8")
+    assert store.get(doc_path)["n"] == 1  # unlocked read trusts the watcher
+    with store.lock(doc_path):
+        assert store.get_entry(doc_path).data["n"] == 5
+
+    doc_path.write_text("n: 7\n", encoding="utf-8")
+
+    async def increment():
+        async with store.atransaction(doc_path) as data:
+            data["n"] += 1
+
+    asyncio.run(increment())
+    assert DocumentStore().get(doc_path)["n"] == 8
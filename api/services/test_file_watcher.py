@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the file watcher and the watched directory index
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.directory_index import DirectoryIndex
+from services.file_watcher import FileWatcher
+
+
+def write(path: Path, text: str, mtime: float = None) -> Path:
+    path.write_text(text, encoding="utf-8")
+    if mtime is not None:
+        import os
+        os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_index_lists_matching_files_newest_first(tmp_path):
+    now = time.time()
+    write(tmp_path / "cv_old.pdf", "old", now - 100)
+    write(tmp_path / "cv_new.html", "new", now)
+    write(tmp_path / "cv_new.html.gz", "compressed sibling", now)
+    write(tmp_path / "notes.txt", "ignored", now)
+
+    index = DirectoryIndex(tmp_path, ("cv_*.pdf", "cv_*.html"))
+    assert [info.name for info in index.files()] == ["cv_new.html", "cv_old.pdf"]
+    assert index.newest().suffix == ".html"
+    assert index.get("cv_old.pdf").size == 3
+
+
+def test_unwatched_index_rescans_every_read(tmp_path):
+    index = DirectoryIndex(tmp_path, ("*.yaml",))
+    assert index.files() == []
+    digest = index.digest()
+
+    write(tmp_path / "conv_1.yaml", "session: {}")
+    assert [info.name for info in index.files()] == ["conv_1.yaml"]
+    assert index.digest() != digest
+
+
+def test_watched_index_applies_events_without_rescanning(tmp_path):
+    index = DirectoryIndex(tmp_path, ("*.yaml",))
+    index.set_watched(True)
+    index.files()  # catch-up rescan
+    rescans = index.stats()["rescans"]
+
+    created = write(tmp_path / "conv_1.yaml", "session: {}")
+    assert index.files() == []  # not reported yet
+    index.apply_changes([created])
+    assert [info.name for info in index.files()] == ["conv_1.yaml"]
+
+    created.unlink()
+    index.apply_changes([created, tmp_path / "other.txt"])
+    assert index.files() == []
+    assert index.stats()["rescans"] == rescans
+
+
+def test_watched_index_tracks_newest_across_events(tmp_path):
+    index = DirectoryIndex(tmp_path, ("*.yaml",))
+    older = write(tmp_path / "conv_1.yaml", "session: {}", mtime=1_000)
+    newer = write(tmp_path / "conv_2.yaml", "session: {}", mtime=2_000)
+    index.set_watched(True)
+    assert index.newest().name == "conv_2.yaml"
+
+    index.apply_changes([write(older, "session: {name: x}", mtime=3_000)])
+    assert index.newest().name == "conv_1.yaml"
+
+    older.unlink()
+    index.apply_changes([older])
+    assert index.newest().name == "conv_2.yaml"
+
+    newer.unlink()
+    index.apply_changes([newer])
+    assert index.newest() is None
+
+
+def test_polling_watcher_dispatches_changes(tmp_path):
+    watched_dir = tmp_path / "watched"
+    watched_dir.mkdir()
+    index = DirectoryIndex(watched_dir, ("*.yaml",))
+    received = []
+
+    async def scenario():
+        watcher = FileWatcher(mode="polling", debounce_ms=10, poll_interval=0.05)
+        watcher.subscribe(watched_dir, received.extend)
+        watcher.subscribe(index.directory, index.apply_changes, index.set_watched)
+        await watcher.start()
+        try:
+            for _ in range(100):
+                if index.stats()["watched"]:
+                    break
+                await asyncio.sleep(0.02)
+            assert index.stats()["watched"]
+            index.files()
+
+            write(watched_dir / "conv_1.yaml", "session: {}")
+            write(watched_dir / ".conv_1.yaml.lock", "")
+            for _ in range(200):
+                if received:
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            await watcher.stop()
+        return watcher
+
+    watcher = asyncio.run(scenario())
+
+    assert [path.name for path in received] == ["conv_1.yaml"]
+    assert not watcher.running
+    assert not index.stats()["watched"]
+    assert [info.name for info in index.files()] == ["conv_1.yaml"]
+
+
+def test_off_mode_never_starts(tmp_path):
+    async def scenario():
+        watcher = FileWatcher(mode="off")
+        watcher.subscribe(tmp_path, lambda paths: None)
+        await watcher.start()
+        return watcher.running
+
+    assert asyncio.run(scenario()) is False
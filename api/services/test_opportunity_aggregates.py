@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Unit tests for incremental opportunity aggregates
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.opportunity_aggregates import StageAggregates
+
+
+def recount(pipeline):
+    """The full recount the endpoints used to run"""
+    stage_counts = {}
+    for opp in pipeline:
+        stage = opp.get('stage', 'discovered')
+        stage_counts[stage] = stage_counts.get(stage, 0) + 1
+    return {
+        'discovered': stage_counts.get('discovered', 0),
+        'applied': stage_counts.get('applied', 0),
+        'interviewing': stage_counts.get('interviewing', 0),
+        'offer': stage_counts.get('offer', 0),
+        'closed': stage_counts.get('closed', 0),
+        'total': sum(1 for opp in pipeline if opp.get('stage') != 'closed')
+    }
+
+
+def test_deltas_match_full_recount():
+    pipeline = [
+        {"id": "a-001", "stage": "applied", "priority": "high"},
+        {"id": "b-001", "stage": "closed", "priority": "low", "outcome": "rejected"},
+        {"id": "c-001", "priority": "medium"},  # no stage -> discovered
+    ]
+    counts = StageAggregates()
+    for opp in pipeline:
+        counts.add(opp)
+    assert counts.active_count() == recount(pipeline)
+
+    # Stage change
+    updated = dict(pipeline[0], stage="offer")
+    counts.replace(pipeline[0], updated)
+    pipeline[0] = updated
+    assert counts.active_count() == recount(pipeline)
+
+    # Delete
+    counts.remove(pipeline.pop(1))
+    assert counts.active_count() == recount(pipeline)
+
+    summary = counts.summary()
+    assert summary["by_priority"] == {"high": 1, "medium": 1}
+    assert summary["by_outcome"] == {"none": 2}
+
+
+def test_active_follows_notification_rule():
+    counts = StageAggregates()
+    for opp in [{"stage": "applied"}, {"stage": "Closed"}, {"status": "declined"}, {"stage": "offer"}]:
+        counts.add(opp)
+    assert counts.active == 2
+    assert counts.open == 4  # active_count "total" only excludes the exact stage "closed"
+
+
+def test_copy_is_independent():
+    counts = StageAggregates()
+    counts.add({"stage": "applied"})
+    clone = counts.copy()
+    clone.add({"stage": "applied"})
+    assert counts.stages["applied"] == 1
+    assert clone.stages["applied"] == 2
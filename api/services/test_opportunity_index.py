@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the incremental opportunity index
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.document_store import freeze
+from services.opportunity_index import BatchIdAllocator, OpportunityIndex
+
+
+def pipeline():
+    return [
+        {"id": "acme-001", "company": "Acme", "stage": "applied"},
+        {"id": "acme-002", "company": "Acme", "stage": "interviewing"},
+        {"id": "globex-001", "company": "Globex", "stage": "applied"},
+    ]
+
+
+def test_build_and_lookups():
+    index = OpportunityIndex()
+    changes = index.refresh(freeze(pipeline()), version=1)
+
+    assert changes == {"added": 3, "changed": 0, "removed": 0}
+    assert index.get("globex-001")["company"] == "Globex"
+    assert index.stage_ids("applied") == {"acme-001", "globex-001"}
+    assert index.next_id("Acme") == "acme-003"
+    assert index.position("globex-001") == 2
+
+
+def test_refresh_only_reindexes_changed_records():
+    index = OpportunityIndex()
+    index.refresh(freeze(pipeline()), version=1)
+
+    updated = pipeline()
+    updated[0]["stage"] = "offer"
+    del updated[2]
+    updated.append({"id": "acme-010", "company": "Acme", "stage": "discovered"})
+
+    changes = index.refresh(freeze(updated), version=2)
+
+    assert changes == {"added": 1, "changed": 1, "removed": 1}
+    assert index.stage_ids("applied") == set()
+    assert index.stage_ids("offer") == {"acme-001"}
+    assert index.get("globex-001") is None
+    assert index.next_id("Acme") == "acme-011"
+
+
+def test_removing_the_highest_id_lowers_the_next_id():
+    index = OpportunityIndex()
+    index.refresh(pipeline(), version=1)
+    assert index.next_id("Acme") == "acme-003"
+
+    index.refresh(pipeline()[:1], version=2)
+    assert index.next_id("Acme") == "acme-002"
+    assert index.next_id("Globex") == "globex-001"
+
+
+def test_batch_allocator_continues_within_a_transaction():
+    index = OpportunityIndex()
+    index.refresh(freeze(pipeline()), version=1)
+    allocator = BatchIdAllocator(index.next_id)
+
+    assert allocator.next_id("Acme") == "acme-003"
+    assert allocator.next_id("Acme") == "acme-004"
+    assert allocator.next_id("Globex") == "globex-002"
+    assert allocator.next_id("Initech") == "initech-001"
+    # A longer company name sharing the prefix still sees the batch's ids
+    assert allocator.next_id("Acme Corp") == "acme-corp-001"
+    assert allocator.next_id("Acme") == "acme-005"
+
+
+def test_priority_ids_follow_changes():
+    index = OpportunityIndex()
+    records = pipeline()
+    records[0]["priority"] = "high"
+    index.refresh(freeze(records), version=1)
+    assert index.priority_ids("high") == {"acme-001"}
+
+    records[0]["priority"] = "low"
+    index.refresh(freeze(records), version=2)
+    assert index.priority_ids("high") == set()
+    assert index.priority_ids("low") == {"acme-001"}
+
+
+def test_refresh_write_compares_only_touched_records():
+    index = OpportunityIndex()
+    index.refresh(freeze(pipeline()), version=1)
+
+    updated = pipeline()
+    updated[0]["stage"] = "offer"
+    updated.append({"id": "initech-001", "company": "Initech", "stage": "applied"})
+    changes = index.refresh_write(freeze(updated), version=2, base=1, touched=["acme-001"])
+    assert changes == {"added": 1, "changed": 1, "removed": 0}
+    assert index.stage_ids("offer") == {"acme-001"}
+
+    # An edit the index hasn't seen (base 3, index at 2): every record is compared
+    edited = [dict(record) for record in updated]
+    edited[2]["stage"] = "closed"
+    edited[0]["stage"] = "applied"
+    changes = index.refresh_write(freeze(edited), version=4, base=3, touched=["acme-001"])
+    assert changes == {"added": 0, "changed": 2, "removed": 0}
+    assert index.stage_ids("closed") == {"globex-001"}
+    assert index.refresh_write(freeze(edited), version=4, base=3, touched=[]) is None
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Unit tests for opportunity list queries (sort, cursor pagination, projection)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.opportunity_query import QueryError, paginate, parse_fields, project
+
+
+def records():
+    return [
+        {"id": f"co-{i:03d}", "company": f"Company {i % 4}", "stage": stage, "priority": priority,
+         "details": {"location": "Remote", "description": "long text"}}
+        for i, (stage, priority) in enumerate([
+            ("applied", "low"), ("offer", "high"), ("discovered", None), ("closed", "medium"),
+            ("interviewing", "high"), ("applied", "medium"), ("discovered", "low"),
+        ])
+    ]
+
+
+def walk(items, sort, limit):
+    ids, cursor = [], None
+    while True:
+        page = paginate(items, range(len(items)), sort=sort, limit=limit, cursor=cursor)
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids
+
+
+def walk_from(items, sort, cursor):
+    page = paginate(items, range(len(items)), sort=sort, limit=100, cursor=cursor)
+    return [item["id"] for item in page["items"]]
+
+
+@pytest.mark.parametrize("sort", ["position", "-position", "company", "-company", "stage", "-priority"])
+def test_cursor_pages_cover_every_record_once(sort):
+    items = records()
+    single = paginate(items, range(len(items)), sort=sort, limit=100)
+    assert single["next_cursor"] is None and single["total"] == len(items)
+    assert walk(items, sort, limit=2) == [item["id"] for item in single["items"]]
+
+
+def test_ranked_sort_orders():
+    items = records()
+    by_stage = paginate(items, range(len(items)), sort="stage", limit=100)["items"]
+    assert [item["stage"] for item in by_stage] == [
+        "discovered", "discovered", "applied", "applied", "interviewing", "offer", "closed"
+    ]
+    by_priority = paginate(items, range(len(items)), sort="priority", limit=100)["items"]
+    # Missing priority sorts last
+    assert [item["priority"] for item in by_priority][:2] == ["high", "high"]
+    assert by_priority[-1]["priority"] is None
+
+
+def test_cursor_skips_deleted_records():
+    items = records()
+    first = paginate(items, range(len(items)), sort="company", limit=3)
+    served = {item["id"] for item in first["items"]}
+    remaining = [item for item in items if item["id"] != first["items"][-1]["id"]]
+    rest = walk_from(remaining, "company", first["next_cursor"])
+    assert served.isdisjoint(rest) and len(served) + len(rest) == len(items)
+
+
+def test_projection():
+    fields = parse_fields("company, details.location,missing")
+    assert fields == ["id", "company", "details.location", "missing"]
+    assert project(records()[0], fields) == {"id": "co-000", "company": "Company 0", "details": {"location": "Remote"}}
+    assert parse_fields("*") is None
+
+
+def test_invalid_parameters():
+    items = records()
+    with pytest.raises(QueryError):
+        paginate(items, range(len(items)), sort="salary")
+    with pytest.raises(QueryError):
+        paginate(items, range(len(items)), cursor="not-a-cursor")
+    cursor = paginate(items, range(len(items)), sort="company", limit=1)["next_cursor"]
+    with pytest.raises(QueryError):
+        paginate(items, range(len(items)), sort="-company", cursor=cursor)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the opportunity store (YAML and SQLite backends)
+"""
+
+import copy
+import shutil
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.document_store import DocumentStore
+from services.opportunity_store import SqliteOpportunityStore, YamlOpportunityStore
+
+REAL_OPPORTUNITIES = Path(__file__).parent.parent.parent / "opportunities" / "structure.yaml"
+
+
+@pytest.fixture
+def yaml_path(tmp_path):
+    path = tmp_path / "structure.yaml"
+    shutil.copy(REAL_OPPORTUNITIES, path)
+    return path
+
+
+@pytest.fixture(params=["yaml", "sqlite"])
+def store(request, yaml_path):
+    if request.param == "yaml":
+        return YamlOpportunityStore(yaml_path, DocumentStore())
+    return SqliteOpportunityStore(yaml_path, documents=DocumentStore())
+
+
+def test_document_matches_yaml(store, yaml_path):
+    expected = copy.deepcopy(DocumentStore().get(yaml_path))
+    assert copy.deepcopy(store.document()) == expected
+    # Key order is preserved too (export must round-trip)
+    assert list(store.document()["pipeline"][0]) == list(expected["pipeline"][0])
+
+
+def test_get_and_query(store):
+    first = store.document()["pipeline"][0]
+
+    assert store.get(first["id"]) == first
+    assert store.get("does-not-exist") is None
+    assert [opp["id"] for opp in store.get_many([first["id"], "nope", first["id"]])] == [first["id"], first["id"]]
+
+    interviewing = store.query(stage="interviewing")
+    assert interviewing and all(opp["stage"] == "interviewing" for opp in interviewing)
+
+    company = first["company"].split()[0].upper()
+    assert first["id"] in [opp["id"] for opp in store.query(company=company)]
+
+
+def test_transaction_updates_and_exports(store, yaml_path):
+    first_id = store.document()["pipeline"][0]["id"]
+
+    with store.transaction() as data:
+        data["pipeline"][0]["stage"] = "offer"
+        data["pipeline"][0]["notes"].append({"date": "2025-11-01", "content": "Offer call"})
+        data["pipeline"].append({"id": "newco-001", "company": "NewCo", "stage": "discovered", "timeline": {}})
+
+    assert store.get(first_id)["stage"] == "offer"
+    assert store.get(first_id)["notes"][-1]["content"] == "Offer call"
+    assert store.get("newco-001")["company"] == "NewCo"
+
+    # YAML file is the source of truth and reflects the change
+    on_disk = DocumentStore().get(yaml_path)
+    assert on_disk["pipeline"][0]["stage"] == "offer"
+    assert on_disk["pipeline"][-1]["id"] == "newco-001"
+
+
+def test_transaction_aborts_on_error(store, yaml_path):
+    before = yaml_path.read_bytes()
+    first_id = store.document()["pipeline"][0]["id"]
+
+    with pytest.raises(KeyError):
+        with store.transaction() as data:
+            data["pipeline"] = []
+            raise KeyError("not found")
+
+    assert yaml_path.read_bytes() == before
+    assert store.get(first_id) is not None
+
+
+def test_sqlite_reimports_manual_yaml_edits(yaml_path):
+    store = SqliteOpportunityStore(yaml_path, documents=DocumentStore())
+    first_id = store.document()["pipeline"][0]["id"]
+
+    text = yaml_path.read_text(encoding="utf-8")
+    yaml_path.write_text(text.replace(f'id: "{first_id}"', 'id: "edited-001"', 1), encoding="utf-8")
+
+    assert store.get(first_id) is None
+    assert store.get("edited-001") is not None
+
+
+def test_sqlite_writes_only_changed_rows(yaml_path):
+    store = SqliteOpportunityStore(yaml_path, documents=DocumentStore())
+    store.document()
+
+    conn = sqlite3.connect(store.db_path)
+    before = dict(conn.execute("SELECT seq, fingerprint FROM opportunities"))
+    last_id = store.document()["pipeline"][-1]["id"]
+
+    with store.transaction() as data:
+        data["pipeline"][-1]["priority"] = "low" if data["pipeline"][-1]["priority"] != "low" else "high"
+
+    after = dict(conn.execute("SELECT seq, fingerprint FROM opportunities"))
+    changed = [seq for seq in before if before[seq] != after[seq]]
+    assert len(changed) == 1
+    assert conn.execute("SELECT id FROM opportunities WHERE seq = ?", changed).fetchone()[0] == last_id
+
+
+def test_sqlite_export_round_trips(yaml_path):
+    store = SqliteOpportunityStore(yaml_path, documents=DocumentStore())
+    expected = copy.deepcopy(store.document())
+
+    yaml_path.unlink()
+    yaml_path.write_text("meta: {}\n", encoding="utf-8")
+    store._documents.invalidate()
+    # Database still holds the last import until the YAML is read again
+    store.export_yaml()
+
+    assert copy.deepcopy(DocumentStore().get(yaml_path)) == expected
+
+
+def test_next_id_matches_prefix_scan(store):
+    with store.transaction() as data:
+        data["pipeline"].append({"id": "acme-007", "company": "Acme", "stage": "applied"})
+        data["pipeline"].append({"id": "acme-corp-012", "company": "Acme Corp", "stage": "applied"})
+        data["pipeline"].append({"id": "acme-notes", "company": "Acme", "stage": "applied"})
+
+    # Same rule as the original scan: ids starting with the prefix, numeric suffix
+    assert store.next_id("Acme") == "acme-013"
+    assert store.next_id("Acme Corp") == "acme-corp-013"
+    assert store.next_id("Brand New") == "brand-new-001"
+
+    with store.transaction() as data:
+        data["pipeline"] = [opp for opp in data["pipeline"] if opp["id"] != "acme-corp-012"]
+
+    assert store.next_id("Acme") == "acme-008"
+
+
+def test_aggregates_follow_transactions(store):
+    def full_count():
+        pipeline = store.document()["pipeline"]
+        return {stage: sum(1 for opp in pipeline if opp.get("stage") == stage) for stage in ("applied", "offer", "closed")}
+
+    assert store.aggregates().total == len(store.document()["pipeline"])
+
+    with store.transaction() as data:
+        data["pipeline"][0]["stage"] = "offer"
+        data["pipeline"].append({"id": "newco-001", "stage": "applied"})
+        del data["pipeline"][1]
+
+    aggregates = store.aggregates()
+    assert {stage: aggregates.stages[stage] for stage in ("applied", "offer", "closed")} == full_count()
+    assert aggregates.total == len(store.document()["pipeline"])
+
+
+def test_write_behind_reads_pending_edits(yaml_path):
+    store = YamlOpportunityStore(yaml_path, DocumentStore(), write_behind=True, flush_delay=60)
+    first_id = store.document()["pipeline"][0]["id"]
+    before = yaml_path.read_bytes()
+
+    with store.transaction() as data:
+        data["pipeline"][0]["stage"] = "offer"
+
+    assert yaml_path.read_bytes() == before
+    assert store.get(first_id)["stage"] == "offer"
+    assert store.aggregates().stages["offer"] >= 1
+
+    store.close()
+    assert DocumentStore().get(yaml_path)["pipeline"][0]["stage"] == "offer"
+    assert store.get(first_id)["stage"] == "offer"
+
+
+def test_touched_transaction_keeps_external_edits_indexed(store, yaml_path):
+    first_id, second_id = [opp["id"] for opp in store.document()["pipeline"][:2]]
+    store.aggregates()
+
+    # Edited by hand: the next write must not trust its touched ids alone
+    document = DocumentStore().get_copy(yaml_path)
+    document["pipeline"][1]["stage"] = "closed"
+    DocumentStore().write(yaml_path, document)
+
+    with store.transaction(touched=[first_id]) as data:
+        data["pipeline"][0]["stage"] = "offer"
+    assert store.index().get(first_id)["stage"] == "offer"
+    assert second_id in store.index().stage_ids("closed")
+
+    with store.transaction(touched=[second_id]) as data:
+        data["pipeline"][1]["stage"] = "applied"
+    assert second_id in store.index().stage_ids("applied")
+    assert first_id in store.index().stage_ids("offer")
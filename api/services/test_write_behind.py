@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Unit tests for write-behind coalescing of document edits
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from services.document_store import DocumentStore
+from services.write_behind import CoalescingWriter
+
+
+@pytest.fixture
+def doc_path(tmp_path):
+    path = tmp_path / "structure.yaml"
+    path.write_text("pipeline:\n- id: acme-001\n  stage: applied\n", encoding="utf-8")
+    return path
+
+
+def test_edits_are_coalesced_into_one_write(doc_path):
+    writer = CoalescingWriter(doc_path, DocumentStore(), delay=60, max_pending=100)
+    before = doc_path.read_text(encoding="utf-8")
+
+    for stage in ("interviewing", "offer", "closed"):
+        with writer.transaction() as data:
+            data["pipeline"][0]["stage"] = stage
+
+    # Acknowledged in memory, nothing written yet
+    assert doc_path.read_text(encoding="utf-8") == before
+    assert writer.pending_snapshot()[1]["pipeline"][0]["stage"] == "closed"
+
+    assert writer.flush() is True
+    assert "stage: closed" in doc_path.read_text(encoding="utf-8")
+    assert writer.stats()["flushes"] == 1
+    assert writer.pending_snapshot() is None
+
+
+def test_max_pending_forces_a_flush(doc_path):
+    writer = CoalescingWriter(doc_path, DocumentStore(), delay=60, max_pending=2)
+
+    with writer.transaction() as data:
+        data["pipeline"].append({"id": "beta-001"})
+    with writer.transaction() as data:
+        data["pipeline"].append({"id": "gamma-001"})
+
+    assert "gamma-001" in doc_path.read_text(encoding="utf-8")
+    assert writer.stats()["pending"] == 0
+
+
+def test_debounce_timer_flushes(doc_path):
+    writer = CoalescingWriter(doc_path, DocumentStore(), delay=0.05, max_pending=100)
+
+    with writer.transaction() as data:
+        data["pipeline"][0]["stage"] = "offer"
+
+    deadline = time.monotonic() + 2
+    while writer.stats()["flushes"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert "stage: offer" in doc_path.read_text(encoding="utf-8")
+
+
+def test_failed_mutation_is_discarded(doc_path):
+    writer = CoalescingWriter(doc_path, DocumentStore(), delay=60, max_pending=100)
+
+    with writer.transaction() as data:
+        data["pipeline"][0]["stage"] = "offer"
+    with pytest.raises(KeyError):
+        with writer.transaction() as data:
+            data["pipeline"].clear()
+            raise KeyError("not found")
+
+    writer.close()
+    text = doc_path.read_text(encoding="utf-8")
+    assert "stage: offer" in text and "acme-001" in text
+
+
+def test_direct_writers_wait_for_the_flush(doc_path):
+    documents = DocumentStore()
+    writer = CoalescingWriter(doc_path, documents, delay=0.1, max_pending=100)
+
+    with writer.transaction() as data:
+        data["pipeline"][0]["stage"] = "offer"
+
+    # Blocks on the file lock until the deferred write lands, then builds on it
+    with documents.transaction(doc_path) as data:
+        assert data["pipeline"][0]["stage"] == "offer"
+        data["pipeline"].append({"id": "beta-001"})
+
+    text = doc_path.read_text(encoding="utf-8")
+    assert "stage: offer" in text and "beta-001" in text
@@ -0,0 +1,174 @@
+"""
+Write-Behind Service
+
+Coalesces rapid edits of one YAML document into a single atomic write.
+
+- Mutations are applied to an in-memory copy and acknowledged immediately
+- The file is written once the edits pause for `delay` seconds, or after
+  `max_pending` mutations, whichever comes first
+- While edits are pending the document's file lock is held, so other
+  workers (and direct DocumentStore writers) wait for the flush instead of
+  overwriting it
+- flush() / close() persist pending edits; close() runs on API shutdown
+  and at interpreter exit
+"""
+
+import atexit
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .document_store import DocumentStore, acquire_file_lock, release_file_lock, freeze, thaw
+
+
+class CoalescingWriter:
+    """
+    Write-behind buffer for one document
+
+    Usage:
+        writer = CoalescingWriter(OPPORTUNITIES_PATH, documents, delay=0.5, max_pending=20)
+        with writer.transaction() as data:     # applied in memory, flushed later
+            data["pipeline"].append(...)
+        writer.pending_snapshot()              # what readers should see
+        writer.flush()                         # force the write now
+    """
+
+    def __init__(self, path: Path, documents: DocumentStore, delay: float = 0.5, max_pending: int = 20):
+        self.path = Path(path)
+        self.delay = delay
+        self.max_pending = max(1, max_pending)
+        self._documents = documents
+        self._lock = threading.RLock()
+        self._data: Any = None           # pending mutable document (never handed out)
+        self._snapshot: Any = None       # frozen view of _data for readers
+        self._pending = 0
+        self._version = 0
+        self._timer: Optional[threading.Timer] = None
+        self._lock_handle = None
+        self._stats = {"mutations": 0, "flushes": 0, "failed_flushes": 0, "last_flush": None}
+        atexit.register(self.close)
+
+    @property
+    def dirty(self) -> bool:
+        return self._pending > 0
+
+    def pending_snapshot(self) -> Optional[Tuple[Any, Any]]:
+        """(version, read-only document) while edits are unflushed, else None"""
+        with self._lock:
+            if not self.dirty:
+                return None
+            return ("pending", self._version), self._snapshot
+
+    @contextmanager
+    def transaction(self) -> Iterator[Any]:
+        """
+        Read-modify-write against the in-memory document.
+
+        The first mutation after a flush loads the latest file under its
+        lock; later ones build on the pending copy. Raising inside the block
+        discards that mutation only.
+        """
+        with self._lock:
+            took_lock = False
+            if not self.dirty:
+                self._lock_handle = acquire_file_lock(self.path)
+                took_lock = True
+                try:
+                    document = self._documents.get_copy(self.path, verify=True)
+                except BaseException:
+                    self._release()
+                    raise
+            else:
+                document = thaw(self._snapshot)
+
+            try:
+                yield document
+            except BaseException:
+                if took_lock:
+                    self._release()
+                raise
+
+            self._data = document
+            self._snapshot = freeze(document)
+            self._pending += 1
+            self._version += 1
+            self._stats["mutations"] += 1
+
+            if self._pending < self.max_pending:
+                self._schedule()
+                return
+            try:
+                self._flush_locked()
+            except Exception as e:
+                # The edit is kept in memory; retry after the debounce delay
+                print(f"Warning: Write of {self.path} failed, retrying: {e}")
+                self._schedule()
+
+    def _schedule(self) -> None:
+        # Debounce: every mutation pushes the write back by `delay`
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.delay, self._flush_from_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_from_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Warning: Deferred write of {self.path} failed, retrying: {e}")
+            with self._lock:
+                if self.dirty:
+                    self._schedule()
+
+    def flush(self) -> bool:
+        """
+        Write pending edits now (one atomic write).
+
+        Returns:
+            True if something was written
+        """
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> bool:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self.dirty:
+            return False
+
+        try:
+            self._documents.write(self.path, self._data, lock=False)
+        except Exception:
+            self._stats["failed_flushes"] += 1
+            raise
+
+        self._stats["flushes"] += 1
+        self._stats["last_flush"] = datetime.now().isoformat()
+        self._data = self._snapshot = None
+        self._pending = 0
+        self._release()
+        return True
+
+    def _release(self) -> None:
+        if self._lock_handle is not None:
+            release_file_lock(self._lock_handle)
+            self._lock_handle = None
+
+    def close(self) -> None:
+        """Flush pending edits and stop the timer (shutdown / exit)"""
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Warning: Could not flush pending edits to {self.path}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "pending": self._pending,
+            "delay_seconds": self.delay,
+            "max_pending": self.max_pending,
+        }
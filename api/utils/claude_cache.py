@@ -2,6 +2,7 @@
 Caching for Claude API responses using Redis
 
 Reduces redundant API calls by caching responses with TTL.
+Uses the shared connection pool from utils.redis_pool (binary responses).
 Falls back gracefully if Redis is not available.
 """
 
@@ -11,6 +12,7 @@ import hashlib
 import logging
 from typing import Optional, Any
 from dotenv import load_dotenv
+from .redis_pool import get_redis_client, report_redis_error
 
 # Load environment variables
 load_dotenv()
@@ -20,24 +22,9 @@ logger = logging.getLogger(__name__)
 
 # Configuration
 ttl = int(os.getenv("CLAUDE_CACHE_TTL", "180"))  # 3 minutes default
-redis_url = os.getenv("RATE_LIMIT_REDIS_URL")
+redis_url = os.getenv("RATE_LIMIT_REDIS_URL") or os.getenv("REDIS_URL")
 
-# Initialize Redis client (or None if not available)
-redis_client: Optional[any] = None
-
-if redis_url:
-    try:
-        import redis
-        redis_client = redis.from_url(redis_url, decode_responses=False)  # Binary mode for JSON
-        redis_client.ping()
-        logger.info(f"[Redis] Claude cache connected with TTL={ttl}s")
-    except ImportError:
-        logger.warning("[Redis] redis package not installed - caching disabled")
-        redis_client = None
-    except Exception as e:
-        logger.warning(f"[Redis] Could not connect for caching: {e}")
-        redis_client = None
-else:
+if not redis_url:
     logger.info("[Redis] Caching disabled (no RATE_LIMIT_REDIS_URL)")
 
 
@@ -71,6 +58,7 @@ def get_cached_response(prompt: str, model: str = "default") -> Optional[dict]:
         - Returns None if Redis is not available (graceful degradation)
         - Returns None if cache miss or expired
     """
+    redis_client = get_redis_client()
     if not redis_client:
         return None
 
@@ -88,6 +76,7 @@ def get_cached_response(prompt: str, model: str = "default") -> Optional[dict]:
 
     except Exception as e:
         logger.error(f"[Redis] Error retrieving from cache: {e}")
+        report_redis_error(e)
         return None
 
 
@@ -105,6 +94,7 @@ def set_cached_response(prompt: str, response: dict, model: str = "default", cus
         - Silently fails if Redis is not available (graceful degradation)
         - Uses SETEX for atomic set with expiry
     """
+    redis_client = get_redis_client()
     if not redis_client:
         return
 
@@ -121,6 +111,7 @@ def set_cached_response(prompt: str, response: dict, model: str = "default", cus
 
     except Exception as e:
         logger.error(f"[Redis] Error storing in cache: {e}")
+        report_redis_error(e)
 
 
 def invalidate_cache(prompt: str, model: str = "default") -> bool:
@@ -134,6 +125,7 @@ def invalidate_cache(prompt: str, model: str = "default") -> bool:
     Returns:
         True if key was deleted, False otherwise
     """
+    redis_client = get_redis_client()
     if not redis_client:
         return False
 
@@ -145,6 +137,7 @@ def invalidate_cache(prompt: str, model: str = "default") -> bool:
         return bool(deleted)
     except Exception as e:
         logger.error(f"[Redis] Error invalidating cache: {e}")
+        report_redis_error(e)
         return False
 
 
@@ -158,6 +151,7 @@ def clear_all_cache() -> int:
     Warning:
         This deletes ALL keys matching the pattern "claude:cache:*"
     """
+    redis_client = get_redis_client()
     if not redis_client:
         return 0
 
@@ -171,6 +165,7 @@ def clear_all_cache() -> int:
         return 0
     except Exception as e:
         logger.error(f"[Redis] Error clearing cache: {e}")
+        report_redis_error(e)
         return 0
 
 
@@ -181,6 +176,7 @@ def get_cache_stats() -> dict:
     Returns:
         dict with keys: enabled, total_keys, estimated_memory_bytes
     """
+    redis_client = get_redis_client()
     if not redis_client:
         return {
             "enabled": False,
@@ -207,6 +203,7 @@ def get_cache_stats() -> dict:
         }
     except Exception as e:
         logger.error(f"[Redis] Error getting cache stats: {e}")
+        report_redis_error(e)
         return {
             "enabled": False,
             "total_keys": 0,
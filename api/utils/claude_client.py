@@ -23,7 +23,8 @@ def call_claude_with_protection(
     messages: List[Dict[str, str]],
     user_id: str = "default",
     use_cache: bool = False,
-    cache_ttl: Optional[int] = None
+    cache_ttl: Optional[int] = None,
+    quota_class: Optional[str] = "default"
 ) -> Any:
     """
     Call Claude API with rate limiting and optional caching.
@@ -36,6 +37,8 @@ def call_claude_with_protection(
         user_id: User identifier for rate limiting (default: "default" for single-user system)
         use_cache: Whether to use caching for this request
         cache_ttl: Custom TTL for cache (seconds)
+        quota_class: Rate limit budget to charge (chat, analysis, generation, bulk).
+            Pass None when the route already enforces a quota via rate_limit()
 
     Returns:
         Claude API response object
@@ -45,12 +48,13 @@ def call_claude_with_protection(
         Exception: Any other API errors
 
     Notes:
-        - Rate limiting is always applied (if Redis available)
+        - Rate limiting is applied per quota class (if Redis available)
         - Caching is optional and only used if use_cache=True
         - Falls back gracefully if Redis is not available
     """
     # Apply rate limiting
-    check_rate_limit(user_id=user_id, limit=60, window=60)
+    if quota_class:
+        check_rate_limit(user_id=user_id, quota_class=quota_class)
 
     # Generate cache key from first user message (for simple caching)
     cache_prompt = None
@@ -0,0 +1,243 @@
+"""
+Response compression
+
+- CompressionMiddleware: gzip / brotli negotiation (Accept-Encoding) for
+  dynamic JSON, HTML and text responses above a size threshold
+- Precompressed siblings (cv.html.gz, cv.html.br) for immutable files such
+  as generated CVs: compressed once at maximum level, then served as-is
+
+Brotli is optional (pip install brotli); without it only gzip is offered.
+"""
+
+import gzip
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Responses smaller than this aren't worth compressing (framing overhead)
+MINIMUM_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+
+# Dynamic responses favor speed; static files are compressed once, so use the maximum
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4
+STATIC_GZIP_LEVEL = 9
+STATIC_BROTLI_QUALITY = 11
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+COMPRESSIBLE_SUFFIXES = (".html", ".md", ".txt", ".json", ".svg", ".css", ".js")
+
+# Precompressed sibling suffix per encoding
+SIBLING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def available_encodings() -> List[str]:
+    """Encodings this server can produce, in preference order (ties go to the first)"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: Optional[str], offered: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header.
+
+    "gzip, deflate, br" -> "br"; "gzip;q=1, br;q=0.5" -> "gzip"; None -> None
+    """
+    if not accept_encoding:
+        return None
+    offered = offered if offered is not None else available_encodings()
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        weight = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        if name:
+            weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in offered:
+        weight = weights.get(encoding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=STATIC_BROTLI_QUALITY if static else BROTLI_QUALITY)
+    # mtime=0 keeps output deterministic (same bytes for the same body)
+    return gzip.compress(body, compresslevel=STATIC_GZIP_LEVEL if static else GZIP_LEVEL, mtime=0)
+
+
+def _is_compressible(content_type: str) -> bool:
+    content_type = content_type.lower()
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Compress complete (non-streaming) responses the client can decode
+
+    Skips responses that are small, already encoded (precompressed files),
+    not text-like (PDFs, images) or streamed in several chunks. ETags are
+    left unchanged: they identify the document version, which is what
+    If-Match / If-None-Match compare.
+
+    Usage:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            headers = [(name, value) for name, value in start_message.get("headers", [])]
+            names = {name.lower() for name, _ in headers}
+            content_type = next((value.decode("latin-1") for name, value in headers if name.lower() == b"content-type"), "")
+            body = message.get("body", b"")
+            compressible = _is_compressible(content_type) and b"content-encoding" not in names
+
+            if compressible:
+                headers = _add_vary(headers)
+            if (
+                not compressible
+                or message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or start_message["status"] in (204, 304)
+            ):
+                passthrough = True
+                await send({**start_message, "headers": headers})
+                await send(message)
+                return
+
+            body = compress(body, encoding)
+            headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+            headers += [(b"content-encoding", encoding.encode()), (b"content-length", str(len(body)).encode())]
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+            passthrough = True
+
+        await self.app(scope, receive, send_compressed)
+
+
+def _add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    for position, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[position] = (name, value + b", Accept-Encoding")
+            return headers
+    return headers + [(b"vary", b"Accept-Encoding")]
+
+
+# ---------- precompressed files ----------
+
+def sibling_path(path: Path, encoding: str) -> Path:
+    """cv.html -> cv.html.gz / cv.html.br"""
+    return path.with_name(path.name + SIBLING_SUFFIXES[encoding])
+
+
+def precompress_file(path: Path, minimum_size: int = MINIMUM_SIZE) -> Dict[str, Path]:
+    """
+    Create (or refresh) the .gz / .br siblings of an immutable file.
+
+    Siblings are rebuilt only when missing or older than the source, so
+    this is cheap to call on every request.
+
+    Returns:
+        encoding -> sibling path (empty if the file isn't worth compressing)
+    """
+    path = Path(path)
+    source = path.stat()
+    if path.suffix.lower() not in COMPRESSIBLE_SUFFIXES or source.st_size < minimum_size:
+        return {}
+
+    siblings: Dict[str, Path] = {}
+    raw: Optional[bytes] = None
+    for encoding in available_encodings():
+        sibling = sibling_path(path, encoding)
+        try:
+            fresh = sibling.stat().st_mtime_ns >= source.st_mtime_ns
+        except FileNotFoundError:
+            fresh = False
+        if not fresh:
+            raw = path.read_bytes() if raw is None else raw
+            # Temp file + rename: concurrent requests never see a partial sibling
+            fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{sibling.name}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(compress(raw, encoding, static=True))
+                os.replace(tmp_name, sibling)
+            except BaseException:
+                try:
+                    os.unlink(tmp_name)
+                except FileNotFoundError:
+                    pass
+                raise
+        siblings[encoding] = sibling
+    return siblings
+
+
+def precompressed_variant(path: Path, accept_encoding: Optional[str]) -> Optional[Tuple[Path, str]]:
+    """
+    (sibling path, encoding) to serve instead of `path`, or None for the original.
+    """
+    if negotiate_encoding(accept_encoding) is None:
+        return None
+    siblings = precompress_file(path)
+    encoding = negotiate_encoding(accept_encoding, offered=list(siblings))
+    return (siblings[encoding], encoding) if encoding else None
+
+
+def remove_precompressed(path: Path) -> None:
+    """Delete the siblings of a removed file"""
+    for encoding in SIBLING_SUFFIXES:
+        try:
+            sibling_path(Path(path), encoding).unlink()
+        except FileNotFoundError:
+            pass
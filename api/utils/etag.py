@@ -0,0 +1,115 @@
+"""
+ETag helpers for optimistic concurrency
+
+- Strong ETags for whole documents (from the file's sha256) and for single
+  records (from their JSON serialization)
+- If-Match checking with 412 Precondition Failed on mismatch
+- Conditional GET: If-None-Match / If-Modified-Since -> 304 Not Modified
+"""
+
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, Response
+
+# Hex characters kept from the digest (128 bits)
+ETAG_LENGTH = 32
+
+
+def etag_from_digest(digest: str) -> str:
+    """Strong ETag for a document whose content hash is already known"""
+    return f'"{digest[:ETAG_LENGTH]}"'
+
+
+def record_etag(record: Any) -> str:
+    """Strong ETag for a JSON-serializable record (key order matters)"""
+    raw = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    return etag_from_digest(hashlib.sha256(raw).hexdigest())
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """
+    Strong comparison of an If-Match header against the current ETag.
+
+    "*" matches any existing representation; weak validators never match.
+    """
+    if header is None:
+        return True
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return "*" in candidates or etag in candidates
+
+
+def check_if_match(header: Optional[str], etag: str) -> None:
+    """
+    Enforce If-Match (no header = unconditional request).
+
+    Raises:
+        HTTPException: 412 if the client's copy is stale
+    """
+    if not etag_matches(header, etag):
+        raise HTTPException(
+            status_code=412,
+            detail={
+                "error": "precondition_failed",
+                "message": "The resource was modified since you loaded it. Reload and retry.",
+                "etag": etag
+            },
+            headers={"ETag": etag}
+        )
+
+
+def http_date(timestamp: float) -> str:
+    """Last-Modified value for a Unix timestamp (IMF-fixdate, GMT)"""
+    return formatdate(timestamp, usegmt=True)
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith('W/') else tag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    Evaluate GET preconditions (RFC 9110 section 13.2.2).
+
+    If-None-Match uses weak comparison and takes precedence; If-Modified-Since
+    is only consulted when If-None-Match is absent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [_opaque(candidate.strip()) for candidate in if_none_match.split(',')]
+        return "*" in candidates or _opaque(etag) in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    # HTTP dates have one-second resolution
+    return int(last_modified) <= since
+
+
+def conditional_get(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: Optional[float] = None
+) -> Optional[Response]:
+    """
+    Set validators on `response`; return a 304 response if the client's copy is current.
+
+    Usage:
+        not_modified = conditional_get(request, response, etag, mtime)
+        if not_modified:
+            return not_modified      # before loading or serializing anything
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
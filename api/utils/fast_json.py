@@ -0,0 +1,104 @@
+"""
+Fast JSON serialization and request parsing
+
+- FastJSONResponse: orjson-rendered JSONResponse (app-wide default class)
+- json_response(): return a document directly, skipping FastAPI's
+  jsonable_encoder walk (orjson serializes dicts, lists, dates and
+  datetimes natively)
+- json_body(Model): parse a request body with Model.model_validate_json()
+  straight from the raw bytes (no intermediate dict from json.loads)
+
+orjson is optional (pip install orjson); without it the stdlib json
+module is used and behaviour is unchanged.
+"""
+
+import json
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Optional, Type, TypeVar
+
+from fastapi import Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _default(value: Any) -> Any:
+    """Types orjson doesn't handle natively (same results as jsonable_encoder)"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, (Path, Decimal)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON"""
+    if ORJSON_AVAILABLE:
+        # YAML documents may have non-string keys (e.g., years)
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_response(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Serialize `content` directly (no jsonable_encoder pass).
+
+    Args:
+        content: Plain JSON-like data (dicts, lists, scalars, dates)
+        response: The endpoint's injected Response; headers set on it
+            (ETag, Last-Modified, ...) are carried over
+        status_code: HTTP status
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def body_validation_error(error: ValidationError, raw: bytes) -> RequestValidationError:
+    """422 error for a body validated by hand (same shape as a declared body parameter)"""
+    errors = [{**item, "loc": ("body", *item["loc"])} for item in error.errors(include_url=False)]
+    return RequestValidationError(errors, body=raw)
+
+
+async def raw_body(request: Request) -> bytes:
+    """Dependency returning the undecoded request body (for TypeAdapter.validate_json)"""
+    return await request.body()
+
+
+def json_body(model: Type[ModelT]) -> Callable[[Request], Any]:
+    """
+    Dependency parsing the request body into `model` from raw bytes.
+
+    Invalid bodies produce the same 422 response as a declared body parameter.
+
+    Usage:
+        def update(curriculum: Curriculum = Depends(json_body(Curriculum))): ...
+    """
+    async def parse(request: Request) -> ModelT:
+        raw = await request.body()
+        try:
+            return model.model_validate_json(raw)
+        except ValidationError as e:
+            raise body_validation_error(e, raw)
+
+    return parse
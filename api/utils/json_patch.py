@@ -0,0 +1,209 @@
+"""
+JSON Patch (RFC 6902) for SerenityOps documents
+
+Applies add / remove / replace / move / copy / test operations addressed
+with JSON Pointers (RFC 6901) to plain dicts and lists. Only the
+containers on each operation's path are touched.
+
+Errors:
+    JsonPatchError: The patch document itself is malformed (HTTP 400)
+    JsonPatchConflict: The patch is well-formed but can't be applied to
+        this document - missing path, failed test (HTTP 409)
+"""
+
+import copy
+from typing import Any, Dict, List, Set, Tuple
+
+OPERATIONS = ("add", "remove", "replace", "move", "copy", "test")
+
+
+class JsonPatchError(ValueError):
+    """Malformed patch document"""
+
+
+class JsonPatchConflict(JsonPatchError):
+    """Patch can't be applied to the target document"""
+
+
+def parse_pointer(pointer: str) -> List[str]:
+    """
+    Split a JSON Pointer into unescaped reference tokens.
+
+    "" -> [], "/a~1b/0" -> ["a/b", "0"]
+    """
+    if not isinstance(pointer, str):
+        raise JsonPatchError(f"JSON Pointer must be a string: {pointer!r}")
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise JsonPatchError(f"JSON Pointer must start with '/': {pointer!r}")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _list_index(container: List[Any], token: str, pointer: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith("0")):
+        raise JsonPatchConflict(f"Invalid array index '{token}' in {pointer}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise JsonPatchConflict(f"Array index {index} out of range in {pointer}")
+    return index
+
+
+def _resolve(document: Any, tokens: List[str], pointer: str) -> Any:
+    """Value at a token path"""
+    current = document
+    for token in tokens:
+        if isinstance(current, dict):
+            if token not in current:
+                raise JsonPatchConflict(f"Path not found: {pointer}")
+            current = current[token]
+        elif isinstance(current, list):
+            current = current[_list_index(current, token, pointer, allow_end=False)]
+        else:
+            raise JsonPatchConflict(f"Path not found: {pointer}")
+    return current
+
+
+def _parent(document: Any, pointer: str) -> Tuple[Any, str]:
+    tokens = parse_pointer(pointer)
+    return _resolve(document, tokens[:-1], pointer), tokens[-1]
+
+
+def _add(document: Any, pointer: str, value: Any) -> Any:
+    if pointer == "":
+        return value
+    parent, token = _parent(document, pointer)
+    if isinstance(parent, dict):
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent.insert(_list_index(parent, token, pointer, allow_end=True), value)
+    else:
+        raise JsonPatchConflict(f"Parent of {pointer} is not an object or array")
+    return document
+
+
+def _remove(document: Any, pointer: str) -> Tuple[Any, Any]:
+    """Remove the target; returns (document, removed value)"""
+    if pointer == "":
+        raise JsonPatchConflict("Can't remove the whole document")
+    parent, token = _parent(document, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchConflict(f"Path not found: {pointer}")
+        return document, parent.pop(token)
+    if isinstance(parent, list):
+        return document, parent.pop(_list_index(parent, token, pointer, allow_end=False))
+    raise JsonPatchConflict(f"Path not found: {pointer}")
+
+
+def _replace(document: Any, pointer: str, value: Any) -> Any:
+    if pointer == "":
+        return value
+    parent, token = _parent(document, pointer)
+    if isinstance(parent, dict):
+        if token not in parent:
+            raise JsonPatchConflict(f"Path not found: {pointer}")
+        parent[token] = value
+    elif isinstance(parent, list):
+        parent[_list_index(parent, token, pointer, allow_end=False)] = value
+    else:
+        raise JsonPatchConflict(f"Path not found: {pointer}")
+    return document
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """Equality with JSON types (True != 1, 1 == 1.0, objects unordered)"""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[key], b[key]) for key in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    return type(a) is type(b) and a == b
+
+
+def validate_patch(patch: Any) -> List[Dict[str, Any]]:
+    """
+    Check the shape of a patch document (before touching any data).
+
+    Raises:
+        JsonPatchError: If the patch is malformed
+    """
+    if not isinstance(patch, list):
+        raise JsonPatchError("JSON Patch must be an array of operations")
+    for position, operation in enumerate(patch):
+        if not isinstance(operation, dict):
+            raise JsonPatchError(f"Operation {position} must be an object")
+        op = operation.get("op")
+        if op not in OPERATIONS:
+            raise JsonPatchError(f"Operation {position}: unknown op {op!r} (expected one of: {', '.join(OPERATIONS)})")
+        parse_pointer(operation.get("path"))
+        if op in ("add", "replace", "test") and "value" not in operation:
+            raise JsonPatchError(f"Operation {position} ({op}) requires 'value'")
+        if op in ("move", "copy"):
+            parse_pointer(operation.get("from"))
+    return patch
+
+
+def apply_patch(document: Any, patch: List[Dict[str, Any]]) -> Any:
+    """
+    Apply a JSON Patch in place.
+
+    Operations are applied in order; if one fails the caller must discard
+    the document (run inside a transaction that aborts on exceptions).
+
+    Returns:
+        The patched document (a new object only if the root was replaced)
+
+    Raises:
+        JsonPatchError: Malformed patch
+        JsonPatchConflict: An operation can't be applied or a test failed
+    """
+    for position, operation in enumerate(validate_patch(patch)):
+        op, path = operation["op"], operation["path"]
+        try:
+            if op == "add":
+                document = _add(document, path, copy.deepcopy(operation["value"]))
+            elif op == "remove":
+                document, _ = _remove(document, path)
+            elif op == "replace":
+                document = _replace(document, path, copy.deepcopy(operation["value"]))
+            elif op == "move":
+                source = operation["from"]
+                if path != source and path.startswith(source + "/"):
+                    raise JsonPatchConflict(f"Can't move {source} into its own child {path}")
+                document, value = _remove(document, source)
+                document = _add(document, path, value)
+            elif op == "copy":
+                value = copy.deepcopy(_resolve(document, parse_pointer(operation["from"]), operation["from"]))
+                document = _add(document, path, value)
+            elif op == "test":
+                if not _json_equal(_resolve(document, parse_pointer(path), path), operation["value"]):
+                    raise JsonPatchConflict(f"Test failed at {path}")
+        except JsonPatchConflict as e:
+            raise JsonPatchConflict(f"Operation {position} ({op}): {e}") from None
+    return document
+
+
+def touched_roots(patch: List[Dict[str, Any]]) -> Set[str]:
+    """
+    Top-level keys a patch writes to ("" if it replaces the whole document).
+
+    Used to validate only the sections a patch changed.
+    """
+    roots = set()
+    for operation in patch:
+        if operation.get("op") == "test":
+            continue
+        pointers = [operation.get("path")]
+        if operation.get("op") == "move":
+            pointers.append(operation.get("from"))
+        for pointer in pointers:
+            tokens = parse_pointer(pointer)
+            roots.add(tokens[0] if tokens else "")
+    return roots
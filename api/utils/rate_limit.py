@@ -1,15 +1,31 @@
 """
 Rate limiting for Claude API calls using Redis
 
-Implements atomic rate limiting with sliding window.
+Implements atomic fixed-window rate limiting per quota class.
+Each class (chat, analysis, generation, bulk) has an independent budget so
+cheap endpoints don't compete with expensive generation calls.
+
+Two admission modes:
+- reject: over-limit requests get an immediate 429 (default)
+- queue:  over-limit requests wait in a fair FIFO queue until a slot frees,
+          up to a maximum wait, then time out with a 429
+
 Falls back gracefully if Redis is not available.
 """
 
 import os
+import time
+import asyncio
 import logging
-from typing import Optional
-from fastapi import HTTPException
+from collections import deque
+from typing import Optional, Dict, Deque
+from fastapi import HTTPException, Response
 from dotenv import load_dotenv
+from .redis_pool import (
+    get_redis_client,
+    get_async_redis_client,
+    report_redis_error
+)
 
 # Load environment variables
 load_dotenv()
@@ -17,81 +33,198 @@ load_dotenv()
 # Setup logging
 logger = logging.getLogger(__name__)
 
-# Initialize Redis client (or None if not available)
-redis_client: Optional[any] = None
-redis_url = os.getenv("RATE_LIMIT_REDIS_URL")
+if not os.getenv("RATE_LIMIT_REDIS_URL") and not os.getenv("REDIS_URL"):
+    logger.info("[Redis] RATE_LIMIT_REDIS_URL not set - rate limiting disabled")
+
+
+def _parse_quota(value: str, fallback: str) -> Dict[str, int]:
+    """
+    Parse a "<limit>/<window_seconds>" quota string.
+
+    Args:
+        value: Quota definition (e.g., "30/60")
+        fallback: Definition used when value is malformed
 
-if redis_url:
+    Returns:
+        dict with keys: limit, window
+    """
     try:
-        import redis
-        redis_client = redis.from_url(redis_url, decode_responses=True)
-        redis_client.ping()
-        logger.info(f"[Redis] Rate limiter connected to {redis_url}")
-    except ImportError:
-        logger.warning("[Redis] redis package not installed - rate limiting disabled")
-        redis_client = None
-    except Exception as e:
-        logger.warning(f"[Redis] Could not connect for rate limiting: {e}")
-        redis_client = None
-else:
-    logger.info("[Redis] RATE_LIMIT_REDIS_URL not set - rate limiting disabled")
+        limit, window = value.split("/", 1)
+        return {"limit": int(limit), "window": int(window)}
+    except (ValueError, AttributeError):
+        logger.warning(f"[Redis] Invalid quota definition '{value}', using {fallback}")
+        return _parse_quota(fallback, fallback)
+
+
+# Quota classes: name -> {"limit": max requests, "window": seconds}
+# Override with RATE_LIMIT_<CLASS>="<limit>/<window>" (e.g., RATE_LIMIT_CHAT="30/60")
+_DEFAULT_QUOTAS = {
+    "default": "60/60",      # Legacy budget for call_claude_with_protection
+    "chat": "30/60",         # Conversational turns (~2k tokens)
+    "analysis": "20/60",     # JD analysis, pitch, mock interview, comparisons
+    "generation": "5/60",    # CV tailoring / generation (up to 8k tokens)
+    "bulk": "2/300",         # Multi-call jobs (portfolio sync, bulk imports)
+}
+
+QUOTA_CLASSES: Dict[str, Dict[str, int]] = {
+    name: _parse_quota(os.getenv(f"RATE_LIMIT_{name.upper()}", default), default)
+    for name, default in _DEFAULT_QUOTAS.items()
+}
+
+# Admission mode defaults (per-route override via rate_limit(..., mode=...))
+ADMISSION_MODE = os.getenv("RATE_LIMIT_MODE", "reject")  # reject | queue
+QUEUE_MAX_WAIT = float(os.getenv("RATE_LIMIT_QUEUE_MAX_WAIT", "30"))  # seconds
+QUEUE_MAX_LENGTH = int(os.getenv("RATE_LIMIT_QUEUE_MAX_LENGTH", "50"))
+
+# Headers the frontend needs to read (exposed through CORS)
+RATE_LIMIT_HEADERS = [
+    "RateLimit-Limit",
+    "RateLimit-Remaining",
+    "RateLimit-Reset",
+    "RateLimit-Policy",
+    "Retry-After",
+    "X-Queue-Position",
+    "X-Queue-Wait",
+]
+
+
+def _rate_key(quota_class: str, user_id: str) -> str:
+    return f"rate:{quota_class}:{user_id}"
+
+
+def get_quota(quota_class: str) -> Dict[str, int]:
+    """
+    Get limit/window for a quota class.
+
+    Raises:
+        ValueError: If quota_class is unknown
+    """
+    if quota_class not in QUOTA_CLASSES:
+        raise ValueError(
+            f"Unknown quota class '{quota_class}'. Available: {', '.join(QUOTA_CLASSES)}"
+        )
+    return QUOTA_CLASSES[quota_class]
+
+
+def rate_limit_headers(state: dict) -> Dict[str, str]:
+    """
+    Build standard RateLimit-* headers from a rate limit state.
+
+    Args:
+        state: dict returned by check_rate_limit()
+
+    Returns:
+        Header name -> value (empty if rate limiting is disabled)
+    """
+    if not state.get("enabled"):
+        return {}
+
+    headers = {
+        "RateLimit-Limit": str(state["limit"]),
+        "RateLimit-Remaining": str(state["remaining"]),
+        "RateLimit-Reset": str(state["reset_in_seconds"]),
+        "RateLimit-Policy": f"{state['limit']};w={state['window']}",
+    }
+    if state["remaining"] <= 0 and state.get("exceeded"):
+        headers["Retry-After"] = str(max(1, state["reset_in_seconds"]))
+    return headers
 
 
 def check_rate_limit(
     user_id: str,
-    limit: int = 60,
-    window: int = 60
-) -> None:
+    limit: Optional[int] = None,
+    window: Optional[int] = None,
+    quota_class: str = "default"
+) -> dict:
     """
-    Check if user has exceeded rate limit for Claude API calls.
+    Check if user has exceeded rate limit for a quota class.
 
     Args:
         user_id: Unique identifier for the user (e.g., "default" for single-user system)
-        limit: Maximum number of requests allowed in the window
-        window: Time window in seconds (default: 60s)
+        limit: Maximum number of requests allowed in the window (default: from quota class)
+        window: Time window in seconds (default: from quota class)
+        quota_class: Named budget (default, chat, analysis, generation, bulk)
+
+    Returns:
+        dict with keys: enabled, quota_class, limit, window, current_count,
+        remaining, reset_in_seconds
 
     Raises:
-        HTTPException: 429 if rate limit exceeded
+        HTTPException: 429 with Retry-After / RateLimit-* headers if rate limit exceeded
 
     Notes:
         - If Redis is not available, this function does nothing (graceful degradation)
-        - Uses atomic INCR with EXPIRE for sliding window rate limiting
+        - Uses atomic INCR with EXPIRE in a single pipeline round-trip
+        - Uses the shared lazily-connected pool (utils.redis_pool)
     """
+    quota = get_quota(quota_class)
+    limit = limit if limit is not None else quota["limit"]
+    window = window if window is not None else quota["window"]
+
+    state = {
+        "enabled": False,
+        "quota_class": quota_class,
+        "limit": limit,
+        "window": window,
+        "current_count": 0,
+        "remaining": limit,
+        "reset_in_seconds": 0,
+    }
+
+    redis_client = get_redis_client()
     if not redis_client:
         # Rate limiting disabled - allow all requests
-        return
+        return state
 
     try:
-        key = f"rate:claude:{user_id}"
+        key = _rate_key(quota_class, user_id)
 
-        # Atomic increment
-        current = redis_client.incr(key)
+        # Atomic increment + TTL lookup in one round-trip
+        pipe = redis_client.pipeline()
+        pipe.incr(key)
+        pipe.ttl(key)
+        current, remaining_ttl = pipe.execute()
 
-        # Set expiry on first request
-        if current == 1:
+        # Set expiry on first request (or if a previous EXPIRE was lost)
+        if remaining_ttl is None or remaining_ttl < 0:
             redis_client.expire(key, window)
+            remaining_ttl = window
+
+        state.update({
+            "enabled": True,
+            "current_count": current,
+            "remaining": max(0, limit - current),
+            "reset_in_seconds": remaining_ttl,
+        })
 
         # Check if limit exceeded
         if current > limit:
-            remaining_ttl = redis_client.ttl(key)
+            state["exceeded"] = True
             logger.warning(
-                f"[Redis] Rate limit exceeded for user={user_id}: "
+                f"[Redis] Rate limit exceeded for user={user_id} class={quota_class}: "
                 f"{current}/{limit} requests. Resets in {remaining_ttl}s"
             )
             raise HTTPException(
                 status_code=429,
                 detail={
                     "error": "Rate limit exceeded",
+                    "quota_class": quota_class,
                     "limit": limit,
                     "window": window,
                     "reset_in_seconds": remaining_ttl,
                     "message": f"Too many Claude API requests. Try again in {remaining_ttl} seconds."
-                }
+                },
+                headers=rate_limit_headers(state)
             )
 
         # Log successful check
         if current % 10 == 0:  # Log every 10th request to reduce noise
-            logger.info(f"[Redis] Rate limit check passed: {current}/{limit} for user={user_id}")
+            logger.info(
+                f"[Redis] Rate limit check passed: {current}/{limit} "
+                f"for user={user_id} class={quota_class}"
+            )
+
+        return state
 
     except HTTPException:
         # Re-raise HTTP exceptions (rate limit exceeded)
@@ -99,41 +232,344 @@ def check_rate_limit(
     except Exception as e:
         # Log error but don't block the request
         logger.error(f"[Redis] Rate limit check failed: {e}")
+        report_redis_error(e)
         # Continue without rate limiting
+        return state
+
+
+class RateLimitQuota:
+    """
+    FastAPI dependency enforcing a named quota class on a route.
+
+    Usage:
+        @app.post("/api/chat/message", dependencies=[Depends(rate_limit("chat"))])
+
+    Successful responses carry RateLimit-* headers; rejected requests get a
+    429 with Retry-After so the client can back off.
+    """
+
+    def __init__(self, quota_class: str, user_id: str = "default"):
+        get_quota(quota_class)  # Fail fast on typos at route registration
+        self.quota_class = quota_class
+        self.user_id = user_id
+
+    def __call__(self, response: Response) -> dict:
+        state = check_rate_limit(self.user_id, quota_class=self.quota_class)
+        for name, value in rate_limit_headers(state).items():
+            response.headers[name] = value
+        return state
+
+
+class _Ticket:
+    """A request waiting in an admission queue"""
+
+    __slots__ = ("event", "enqueued_at")
+
+    def __init__(self):
+        self.event = asyncio.Event()
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionQueue:
+    """
+    Fair FIFO waiting room for over-limit requests.
+
+    Only the head of each (quota_class, user_id) queue polls Redis; everyone
+    else sleeps on an Event until the head is admitted or gives up. A waiter
+    sleeps until the window resets (PTTL) instead of hammering Redis.
+
+    Notes:
+        - FIFO order is per process; across workers the Redis counter still
+          enforces the limit
+        - Rejected attempts roll back their INCR so waiting never burns budget
+    """
+
+    def __init__(self, max_length: int = QUEUE_MAX_LENGTH):
+        self.max_length = max_length
+        self._queues: Dict[str, Deque[_Ticket]] = {}
+
+    def waiting(self, quota_class: str, user_id: str) -> int:
+        """Number of requests currently queued for a class"""
+        return len(self._queues.get(_rate_key(quota_class, user_id), ()))
+
+    async def _try_acquire(self, client, key: str, limit: int, window: int) -> tuple:
+        """
+        Try to take one slot.
+
+        Returns:
+            (current_count, reset_in_ms, admitted)
+        """
+        pipe = client.pipeline()
+        pipe.incr(key)
+        pipe.pttl(key)
+        current, reset_ms = await pipe.execute()
+
+        if reset_ms is None or reset_ms < 0:
+            await client.expire(key, window)
+            reset_ms = window * 1000
+
+        if current > limit:
+            await client.decr(key)
+            return current - 1, reset_ms, False
+
+        return current, reset_ms, True
+
+    def _state(self, quota_class: str, limit: int, window: int, current: int, reset_ms: int) -> dict:
+        return {
+            "enabled": True,
+            "quota_class": quota_class,
+            "limit": limit,
+            "window": window,
+            "current_count": current,
+            "remaining": max(0, limit - current),
+            "reset_in_seconds": max(0, -(-reset_ms // 1000)),
+        }
+
+    def _timeout(self, state: dict, position: int, waited: float, reason: str) -> HTTPException:
+        state["exceeded"] = True
+        state["remaining"] = 0
+        headers = rate_limit_headers(state)
+        headers["X-Queue-Position"] = str(position)
+        headers["X-Queue-Wait"] = f"{waited:.3f}"
+        return HTTPException(
+            status_code=429,
+            detail={
+                "error": "Rate limit exceeded",
+                "quota_class": state["quota_class"],
+                "limit": state["limit"],
+                "window": state["window"],
+                "reset_in_seconds": state["reset_in_seconds"],
+                "queue_position": position,
+                "waited_seconds": round(waited, 3),
+                "message": reason
+            },
+            headers=headers
+        )
+
+    async def admit(
+        self,
+        user_id: str,
+        quota_class: str,
+        max_wait: float = QUEUE_MAX_WAIT
+    ) -> dict:
+        """
+        Wait (FIFO) until a slot is available for this quota class.
+
+        Args:
+            user_id: Unique identifier for the user
+            quota_class: Named budget (chat, analysis, generation, bulk)
+            max_wait: Maximum seconds to wait before giving up
+
+        Returns:
+            Rate limit state plus queue_position (1 = head on arrival) and
+            waited_seconds
+
+        Raises:
+            HTTPException: 429 if the queue is full or max_wait is exceeded
+        """
+        quota = get_quota(quota_class)
+        limit, window = quota["limit"], quota["window"]
+
+        client = get_async_redis_client()
+        if not client:
+            # Rate limiting disabled - admit immediately
+            state = check_rate_limit(user_id, quota_class=quota_class)
+            state.update({"queue_position": 0, "waited_seconds": 0.0})
+            return state
+
+        key = _rate_key(quota_class, user_id)
+        queue = self._queues.setdefault(key, deque())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+
+        if len(queue) >= self.max_length:
+            state = self._state(quota_class, limit, window, limit, window * 1000)
+            raise self._timeout(state, len(queue) + 1, 0.0, "Admission queue is full. Try again later.")
+
+        ticket = _Ticket()
+        queue.append(ticket)
+        position = len(queue)
+        if position == 1:
+            ticket.event.set()
+
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                waited = time.monotonic() - ticket.enqueued_at
+
+                # Wait for our turn at the head of the queue
+                if not ticket.event.is_set():
+                    if remaining <= 0:
+                        state = self._state(quota_class, limit, window, limit, 0)
+                        raise self._timeout(state, position, waited, "Timed out waiting in admission queue.")
+                    try:
+                        await asyncio.wait_for(ticket.event.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        continue
+
+                try:
+                    current, reset_ms, admitted = await self._try_acquire(client, key, limit, window)
+                except Exception as e:
+                    # Redis trouble: don't block the request
+                    logger.error(f"[Redis] Admission queue check failed: {e}")
+                    report_redis_error(e)
+                    return {
+                        "enabled": False,
+                        "quota_class": quota_class,
+                        "limit": limit,
+                        "window": window,
+                        "current_count": 0,
+                        "remaining": limit,
+                        "reset_in_seconds": 0,
+                        "queue_position": position,
+                        "waited_seconds": round(time.monotonic() - ticket.enqueued_at, 3)
+                    }
+
+                state = self._state(quota_class, limit, window, current, reset_ms)
+                waited = time.monotonic() - ticket.enqueued_at
+
+                if admitted:
+                    state.update({"queue_position": position, "waited_seconds": round(waited, 3)})
+                    if waited > 0.05:
+                        logger.info(
+                            f"[Redis] Admitted user={user_id} class={quota_class} "
+                            f"after {waited:.2f}s (position {position})"
+                        )
+                    return state
+
+                # Give up early if the window can't reset before our deadline
+                remaining = deadline - loop.time()
+                if reset_ms / 1000 > remaining:
+                    raise self._timeout(
+                        state, position, waited,
+                        f"Too many Claude API requests. Try again in {state['reset_in_seconds']} seconds."
+                    )
+
+                await asyncio.sleep(reset_ms / 1000)
+        finally:
+            was_head = bool(queue) and queue[0] is ticket
+            try:
+                queue.remove(ticket)
+            except ValueError:
+                pass
+            if queue:
+                if was_head:
+                    queue[0].event.set()
+            else:
+                self._queues.pop(key, None)
+
+
+# Global admission queue (per process)
+admission_queue = AdmissionQueue()
+
+
+class QueuedRateLimitQuota(RateLimitQuota):
+    """
+    Route dependency that queues over-limit requests instead of rejecting.
+
+    Adds X-Queue-Position / X-Queue-Wait headers so the client can show
+    progress; times out with a regular 429 + Retry-After.
+    """
+
+    def __init__(self, quota_class: str, user_id: str = "default", max_wait: float = QUEUE_MAX_WAIT):
+        super().__init__(quota_class, user_id=user_id)
+        self.max_wait = max_wait
+
+    async def __call__(self, response: Response) -> dict:
+        state = await admission_queue.admit(self.user_id, self.quota_class, max_wait=self.max_wait)
+        for name, value in rate_limit_headers(state).items():
+            response.headers[name] = value
+        if state.get("enabled"):
+            response.headers["X-Queue-Position"] = str(state["queue_position"])
+            response.headers["X-Queue-Wait"] = f"{state['waited_seconds']:.3f}"
+        return state
+
+
+def rate_limit(
+    quota_class: str,
+    user_id: str = "default",
+    mode: Optional[str] = None,
+    max_wait: Optional[float] = None
+) -> RateLimitQuota:
+    """
+    Create a route dependency for the given quota class.
+
+    Args:
+        quota_class: Named budget (chat, analysis, generation, bulk)
+        user_id: User identifier (default: "default" for single-user system)
+        mode: "reject" (immediate 429) or "queue" (wait for a slot);
+            default from RATE_LIMIT_MODE
+        max_wait: Queue mode only - maximum seconds to wait
+    """
+    mode = mode or ADMISSION_MODE
+    if mode == "queue":
+        return QueuedRateLimitQuota(
+            quota_class,
+            user_id=user_id,
+            max_wait=max_wait if max_wait is not None else QUEUE_MAX_WAIT
+        )
+    if mode != "reject":
+        raise ValueError(f"Unknown rate limit mode '{mode}'. Available: reject, queue")
+    return RateLimitQuota(quota_class, user_id=user_id)
 
 
 def get_rate_limit_status(user_id: str) -> dict:
     """
-    Get current rate limit status for a user.
+    Get current rate limit status for a user across all quota classes.
 
     Args:
         user_id: Unique identifier for the user
 
     Returns:
-        dict with keys: enabled, current_count, reset_in_seconds
+        dict with keys: enabled, classes (quota_class -> limit, window,
+        current_count, remaining, reset_in_seconds, queued)
+
+    Notes:
+        - All classes are read in a single pipelined round-trip
     """
+    classes = {
+        name: {
+            "limit": quota["limit"],
+            "window": quota["window"],
+            "current_count": 0,
+            "remaining": quota["limit"],
+            "reset_in_seconds": 0,
+            "queued": admission_queue.waiting(name, user_id)
+        }
+        for name, quota in QUOTA_CLASSES.items()
+    }
+
+    redis_client = get_redis_client()
     if not redis_client:
         return {
             "enabled": False,
-            "current_count": 0,
-            "reset_in_seconds": 0
+            "classes": classes
         }
 
     try:
-        key = f"rate:claude:{user_id}"
-        current = redis_client.get(key)
-        ttl = redis_client.ttl(key) if current else 0
+        pipe = redis_client.pipeline(transaction=False)
+        for name in classes:
+            key = _rate_key(name, user_id)
+            pipe.get(key)
+            pipe.ttl(key)
+        results = pipe.execute()
+
+        for i, (name, status) in enumerate(classes.items()):
+            current, ttl = results[2 * i], results[2 * i + 1]
+            count = int(current) if current else 0
+            status["current_count"] = count
+            status["remaining"] = max(0, status["limit"] - count)
+            status["reset_in_seconds"] = max(0, ttl or 0) if current else 0
 
         return {
             "enabled": True,
-            "current_count": int(current) if current else 0,
-            "reset_in_seconds": max(0, ttl)
+            "classes": classes
         }
     except Exception as e:
         logger.error(f"[Redis] Could not get rate limit status: {e}")
+        report_redis_error(e)
         return {
             "enabled": False,
-            "current_count": 0,
-            "reset_in_seconds": 0,
+            "classes": classes,
             "error": str(e)
         }
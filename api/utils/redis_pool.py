@@ -0,0 +1,371 @@
+"""
+Shared Redis connection pool for SerenityOps
+
+Single place that owns Redis connections for the rate limiter, the Claude
+response cache and Celery health checks:
+- Lazy: nothing connects at import time, so an unreachable Redis never
+  delays API startup
+- Short connect/socket timeouts so a dead Redis costs milliseconds per call
+- Background reconnect: after a failure the client is reported as
+  unavailable (callers degrade gracefully) while a daemon thread retries
+- Sync client (redis.Redis) and async client (redis.asyncio.Redis)
+- Pool utilization metrics
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Optional, Dict, Any, List
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Setup logging
+logger = logging.getLogger(__name__)
+
+# Configuration
+DEFAULT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL") or os.getenv("REDIS_URL")
+MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.5"))  # seconds
+SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "1.0"))  # seconds
+RETRY_INTERVAL = float(os.getenv("REDIS_RETRY_INTERVAL", "5"))  # seconds
+MAX_RETRY_INTERVAL = float(os.getenv("REDIS_MAX_RETRY_INTERVAL", "60"))  # seconds
+
+
+class RedisPoolManager:
+    """
+    Lazily-connected, pooled Redis client with background reconnect.
+
+    States:
+        unknown: pool created, no command has run yet (clients are handed out)
+        up:      last health check or command succeeded
+        down:    last command failed; clients are withheld until the
+                 background reconnect thread gets a successful PING
+    """
+
+    def __init__(
+        self,
+        url: Optional[str],
+        max_connections: int = MAX_CONNECTIONS,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        socket_timeout: float = SOCKET_TIMEOUT,
+        retry_interval: float = RETRY_INTERVAL
+    ):
+        self.url = url
+        self.max_connections = max_connections
+        self.connect_timeout = connect_timeout
+        self.socket_timeout = socket_timeout
+        self.retry_interval = retry_interval
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._client = None
+        self._async_pool = None
+        self._async_client = None
+        # Async pools dropped outside their event loop, disconnected from it later
+        self._retired_async_pools: List[Any] = []
+        self._disconnect_tasks: set = set()
+        self._state = "unknown"
+        self._last_error: Optional[str] = None
+        self._failures = 0
+        self._reconnect_thread: Optional[threading.Thread] = None
+        self._redis = None
+
+        if not url:
+            self._state = "disabled"
+            return
+
+        try:
+            import redis
+            self._redis = redis
+        except ImportError:
+            logger.warning("[Redis] redis package not installed - Redis features disabled")
+            self._state = "disabled"
+
+    @property
+    def enabled(self) -> bool:
+        return self._state != "disabled"
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def _pool_kwargs(self) -> Dict[str, Any]:
+        return {
+            "max_connections": self.max_connections,
+            "socket_connect_timeout": self.connect_timeout,
+            "socket_timeout": self.socket_timeout,
+            "health_check_interval": 30,
+        }
+
+    def get_client(self):
+        """
+        Get the shared sync client.
+
+        Returns:
+            redis.Redis (binary responses) or None if Redis is disabled/down
+
+        Notes:
+            - No connection is opened here; the pool connects on first command
+        """
+        if self._state in ("disabled", "down"):
+            return None
+
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._pool = self._redis.ConnectionPool.from_url(self.url, **self._pool_kwargs())
+                    self._client = self._redis.Redis(connection_pool=self._pool)
+                    logger.info(f"[Redis] Connection pool created for {self.url} (lazy)")
+        return self._client
+
+    def get_async_client(self):
+        """
+        Get the shared asyncio client for use inside async endpoints.
+
+        Returns:
+            redis.asyncio.Redis (binary responses) or None if Redis is disabled/down
+        """
+        if self._state in ("disabled", "down"):
+            return None
+
+        if self._retired_async_pools:
+            self._disconnect_retired_async_pools()
+
+        if self._async_client is None:
+            with self._lock:
+                if self._async_client is None:
+                    import redis.asyncio as aioredis
+                    self._async_pool = aioredis.ConnectionPool.from_url(self.url, **self._pool_kwargs())
+                    self._async_client = aioredis.Redis(connection_pool=self._async_pool)
+        return self._async_client
+
+    def _retire_async_pool(self) -> None:
+        """Drop the async pool (caller holds _lock); the next client gets a fresh one"""
+        if self._async_pool is not None:
+            self._retired_async_pools.append(self._async_pool)
+        self._async_pool = None
+        self._async_client = None
+
+    def _take_retired_async_pools(self) -> List[Any]:
+        with self._lock:
+            pools, self._retired_async_pools = self._retired_async_pools, []
+        return pools
+
+    def _disconnect_retired_async_pools(self) -> None:
+        """Schedule disconnects of retired async pools on the running event loop"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # not inside the loop; aclose() or the next async caller does it
+        for pool in self._take_retired_async_pools():
+            task = loop.create_task(pool.disconnect())
+            # The loop only keeps weak references to tasks
+            self._disconnect_tasks.add(task)
+            task.add_done_callback(self._disconnect_tasks.discard)
+
+    def report_success(self) -> None:
+        """Mark Redis as reachable (called after a successful command)"""
+        if self._state != "up" and self.enabled:
+            self._state = "up"
+            self._failures = 0
+            self._last_error = None
+
+    def report_failure(self, error: Exception) -> None:
+        """
+        Mark Redis as unreachable and start background reconnect.
+
+        Callers should invoke this when a command raises a connection error;
+        until the reconnect succeeds get_client() returns None.
+        """
+        if not self.enabled:
+            return
+
+        is_connection_error = isinstance(
+            error, (self._redis.ConnectionError, self._redis.TimeoutError)
+        )
+        if not is_connection_error:
+            return
+
+        with self._lock:
+            self._failures += 1
+            self._last_error = str(error)
+            if self._state == "down":
+                return
+            self._state = "down"
+            logger.warning(f"[Redis] Marked unavailable: {error}. Reconnecting in background")
+            self._start_reconnect()
+
+    def _start_reconnect(self) -> None:
+        if self._reconnect_thread and self._reconnect_thread.is_alive():
+            return
+        self._reconnect_thread = threading.Thread(
+            target=self._reconnect_loop,
+            name="redis-reconnect",
+            daemon=True
+        )
+        self._reconnect_thread.start()
+
+    def _reconnect_loop(self) -> None:
+        delay = self.retry_interval
+        while self._state == "down":
+            time.sleep(delay)
+            try:
+                probe = self._redis.Redis.from_url(
+                    self.url,
+                    socket_connect_timeout=self.connect_timeout,
+                    socket_timeout=self.socket_timeout
+                )
+                probe.ping()
+                probe.close()
+                # Drop stale sockets so the next command opens fresh ones
+                # (async sockets belong to the event loop: that pool is
+                # replaced here and disconnected from the loop)
+                if self._pool is not None:
+                    self._pool.disconnect()
+                with self._lock:
+                    self._retire_async_pool()
+                self._state = "up"
+                self._failures = 0
+                self._last_error = None
+                logger.info(f"[Redis] Reconnected to {self.url}")
+            except Exception as e:
+                self._last_error = str(e)
+                delay = min(delay * 2, MAX_RETRY_INTERVAL)
+
+    def check(self) -> bool:
+        """
+        PING Redis now (blocking, bounded by connect timeout).
+
+        Returns:
+            True if Redis answered
+        """
+        client = self.get_client()
+        if client is None:
+            return False
+        try:
+            client.ping()
+            self.report_success()
+            return True
+        except Exception as e:
+            self.report_failure(e)
+            return False
+
+    def check_in_background(self) -> None:
+        """Warm up the pool with a PING on a daemon thread (never blocks startup)"""
+        if not self.enabled:
+            return
+        threading.Thread(target=self.check, name="redis-warmup", daemon=True).start()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get pool utilization metrics.
+
+        Returns:
+            dict with keys: enabled, state, max_connections, created, in_use,
+            available, utilization, failures, last_error (+ async pool counts)
+        """
+        result = {
+            "enabled": self.enabled,
+            "state": self._state,
+            "max_connections": self.max_connections,
+            "created": 0,
+            "in_use": 0,
+            "available": 0,
+            "utilization": 0.0,
+            "failures": self._failures,
+            "last_error": self._last_error,
+        }
+
+        if self._pool is not None:
+            in_use = len(getattr(self._pool, "_in_use_connections", []))
+            available = len(getattr(self._pool, "_available_connections", []))
+            result.update({
+                "created": getattr(self._pool, "_created_connections", in_use + available),
+                "in_use": in_use,
+                "available": available,
+                "utilization": round(in_use / self.max_connections, 3) if self.max_connections else 0.0,
+            })
+
+        if self._async_pool is not None:
+            result["async_in_use"] = len(getattr(self._async_pool, "_in_use_connections", []))
+            result["async_available"] = len(getattr(self._async_pool, "_available_connections", []))
+
+        return result
+
+    def close(self) -> None:
+        """
+        Release all pooled connections.
+
+        The async pool is dropped; its sockets are closed by aclose() or,
+        when called inside the event loop, by a scheduled disconnect.
+        """
+        if self._pool is not None:
+            self._pool.disconnect()
+        with self._lock:
+            self._retire_async_pool()
+        self._disconnect_retired_async_pools()
+
+    async def aclose(self) -> None:
+        """Release all pooled connections, awaiting the async pool's disconnect (API shutdown)"""
+        if self._pool is not None:
+            self._pool.disconnect()
+        with self._lock:
+            self._retire_async_pool()
+        for pool in self._take_retired_async_pools():
+            try:
+                await pool.disconnect()
+            except Exception as e:
+                logger.warning(f"[Redis] Could not disconnect async pool: {e}")
+
+
+# Global pool managers, one per Redis URL
+_managers: Dict[str, RedisPoolManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_redis_manager(url: Optional[str] = None) -> RedisPoolManager:
+    """
+    Get or create the pool manager for a Redis URL.
+
+    Args:
+        url: Redis URL (default: RATE_LIMIT_REDIS_URL, then REDIS_URL)
+    """
+    url = url if url is not None else DEFAULT_REDIS_URL
+    key = url or ""
+    manager = _managers.get(key)
+    if manager is None:
+        with _managers_lock:
+            manager = _managers.get(key)
+            if manager is None:
+                manager = RedisPoolManager(url)
+                _managers[key] = manager
+    return manager
+
+
+def get_redis_client():
+    """Shared sync client for the default Redis URL (or None if unavailable)"""
+    return get_redis_manager().get_client()
+
+
+def get_async_redis_client():
+    """Shared asyncio client for the default Redis URL (or None if unavailable)"""
+    return get_redis_manager().get_async_client()
+
+
+def report_redis_error(error: Exception) -> None:
+    """Report a failed command so the shared pool can back off and reconnect"""
+    get_redis_manager().report_failure(error)
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Pool utilization metrics for every configured Redis URL"""
+    if not _managers:
+        get_redis_manager()
+    return {
+        (manager.url or "disabled"): manager.metrics()
+        for manager in _managers.values()
+    }
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit tests for response compression and precompressed file siblings
+"""
+
+import gzip
+import os
+import sys
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.responses import HTMLResponse, Response
+from fastapi.testclient import TestClient
+
+# Add api dir to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.compression import (
+    CompressionMiddleware,
+    negotiate_encoding,
+    precompress_file,
+    precompressed_variant,
+    remove_precompressed,
+)
+
+
+def make_client():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    def big():
+        return {"items": [{"id": i, "company": "Acme"} for i in range(100)]}
+
+    @app.get("/small")
+    def small():
+        return {"ok": True}
+
+    @app.get("/html")
+    def html():
+        return HTMLResponse("<p>hello</p>" * 100)
+
+    @app.get("/pdf")
+    def pdf():
+        return Response(b"%PDF" * 100, media_type="application/pdf")
+
+    return TestClient(app)
+
+
+def test_negotiation():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("gzip, deflate", offered=["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("gzip, br", offered=["br", "gzip"]) == "br"
+    assert negotiate_encoding("gzip;q=1, br;q=0.5", offered=["br", "gzip"]) == "gzip"
+    assert negotiate_encoding("*", offered=["br", "gzip"]) == "br"
+    assert negotiate_encoding("identity, gzip;q=0", offered=["br", "gzip"]) is None
+
+
+def test_middleware_compresses_large_text_responses():
+    client = make_client()
+
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.json()["items"][99]["id"] == 99
+
+    assert client.get("/html", headers={"Accept-Encoding": "gzip"}).headers["content-encoding"] == "gzip"
+
+    for path in ("/small", "/pdf"):
+        assert "content-encoding" not in client.get(path, headers={"Accept-Encoding": "gzip"}).headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "identity"}).headers
+
+
+def test_precompressed_siblings(tmp_path):
+    source = tmp_path / "cv_acme.html"
+    source.write_text("<section>experience</section>\n" * 200, encoding="utf-8")
+
+    siblings = precompress_file(source)
+    assert gzip.decompress(siblings["gzip"].read_bytes()) == source.read_bytes()
+
+    # Up to date siblings aren't rebuilt
+    built_at = siblings["gzip"].stat().st_mtime_ns
+    assert precompress_file(source)["gzip"].stat().st_mtime_ns == built_at
+
+    path, encoding = precompressed_variant(source, "gzip")
+    assert (path, encoding) == (siblings["gzip"], "gzip")
+    assert precompressed_variant(source, None) is None
+
+    # A rewritten source gets fresh siblings
+    source.write_text("<section>updated</section>\n" * 200, encoding="utf-8")
+    os.utime(source, ns=(built_at + 10**9, built_at + 10**9))
+    assert gzip.decompress(precompress_file(source)["gzip"].read_bytes()) == source.read_bytes()
+
+    remove_precompressed(source)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["cv_acme.html"]
+
+    pdf = tmp_path / "cv_acme.pdf"
+    pdf.write_bytes(b"%PDF" * 1000)
+    assert precompress_file(pdf) == {}
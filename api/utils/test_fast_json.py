@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the orjson response class and raw-bytes body parsing
+"""
+
+import json
+import sys
+from datetime import date, datetime
+from pathlib import Path
+from typing import List
+
+from fastapi import Depends, FastAPI
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+# Add api dir to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.fast_json import FastJSONResponse, dumps, json_body, json_response
+
+
+class Item(BaseModel):
+    name: str
+    tags: List[str] = []
+
+
+def test_dumps_matches_jsonable_encoder():
+    document = {
+        "date": date(2025, 10, 1),
+        "when": datetime(2025, 10, 1, 12, 30),
+        "years": {2024: "a", 2025: "b"},
+        "tags": {"python"},
+        "item": Item(name="x"),
+        "path": Path("curriculum/versions"),
+        "text": "señor ✓",
+    }
+    expected = json.loads(json.dumps(jsonable_encoder(document)))
+    assert json.loads(dumps(document)) == expected
+
+
+def test_response_class_and_body_parsing():
+    app = FastAPI(default_response_class=FastJSONResponse)
+
+    @app.get("/document")
+    def document():
+        return {"updated": date(2025, 10, 1)}
+
+    @app.get("/direct")
+    def direct():
+        return json_response({"ok": True}, status_code=201)
+
+    @app.put("/item")
+    def put_item(item: Item = Depends(json_body(Item))):
+        return {"name": item.name, "tags": item.tags}
+
+    client = TestClient(app)
+    assert client.get("/document").json() == {"updated": "2025-10-01"}
+    assert client.get("/direct").status_code == 201
+
+    assert client.put("/item", content=b'{"name": "cv", "tags": ["a"]}').json() == {"name": "cv", "tags": ["a"]}
+    invalid = client.put("/item", content=b'{"tags": "not-a-list"}')
+    assert invalid.status_code == 422
+    assert {tuple(error["loc"]) for error in invalid.json()["detail"]} == {("body", "name"), ("body", "tags")}
+    assert client.put("/item", content=b"{broken").status_code == 422
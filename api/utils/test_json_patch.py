@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Unit tests for JSON Patch (RFC 6902) and ETag helpers
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, Request, Response
+
+# Add api dir to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.etag import check_if_match, conditional_get, http_date, record_etag
+from utils.json_patch import JsonPatchConflict, JsonPatchError, apply_patch, parse_pointer, touched_roots
+
+
+def doc():
+    return {"stage": "applied", "notes": [{"content": "a"}], "timeline": {"applied": "2025-10-01"}, "a/b": 1}
+
+
+def test_pointer_unescaping():
+    assert parse_pointer("") == []
+    assert parse_pointer("/a~1b/m~0n/0") == ["a/b", "m~n", "0"]
+    with pytest.raises(JsonPatchError):
+        parse_pointer("stage")
+
+
+def test_all_operations():
+    result = apply_patch(doc(), [
+        {"op": "test", "path": "/stage", "value": "applied"},
+        {"op": "replace", "path": "/stage", "value": "interviewing"},
+        {"op": "add", "path": "/notes/-", "value": {"content": "b"}},
+        {"op": "add", "path": "/notes/0", "value": {"content": "first"}},
+        {"op": "remove", "path": "/a~1b"},
+        {"op": "copy", "from": "/timeline/applied", "path": "/timeline/first_interview"},
+        {"op": "move", "from": "/notes/2", "path": "/pinned"},
+    ])
+    assert result == {
+        "stage": "interviewing",
+        "notes": [{"content": "first"}, {"content": "a"}],
+        "timeline": {"applied": "2025-10-01", "first_interview": "2025-10-01"},
+        "pinned": {"content": "b"},
+    }
+
+
+def test_conflicts_and_malformed_patches():
+    with pytest.raises(JsonPatchConflict):
+        apply_patch(doc(), [{"op": "test", "path": "/stage", "value": "offer"}])
+    with pytest.raises(JsonPatchConflict):
+        apply_patch(doc(), [{"op": "replace", "path": "/missing", "value": 1}])
+    with pytest.raises(JsonPatchConflict):
+        apply_patch(doc(), [{"op": "add", "path": "/notes/5", "value": {}}])
+    with pytest.raises(JsonPatchConflict):
+        apply_patch(doc(), [{"op": "move", "from": "/timeline", "path": "/timeline/nested"}])
+    # JSON types: true is not 1
+    with pytest.raises(JsonPatchConflict):
+        apply_patch({"flag": True}, [{"op": "test", "path": "/flag", "value": 1}])
+
+    with pytest.raises(JsonPatchError) as exc:
+        apply_patch(doc(), [{"op": "replace", "path": "/stage"}])
+    assert not isinstance(exc.value, JsonPatchConflict)
+    with pytest.raises(JsonPatchError):
+        apply_patch(doc(), {"op": "remove", "path": "/stage"})
+
+
+def test_root_replace_and_touched_roots():
+    assert apply_patch(doc(), [{"op": "replace", "path": "", "value": {"x": 1}}]) == {"x": 1}
+    patch = [
+        {"op": "test", "path": "/skills/0", "value": {}},
+        {"op": "replace", "path": "/summary", "value": "..."},
+        {"op": "move", "from": "/projects/0", "path": "/experience/0"},
+    ]
+    assert touched_roots(patch) == {"summary", "projects", "experience"}
+
+
+def test_if_match():
+    etag = record_etag({"id": "acme-001", "stage": "applied"})
+    assert etag.startswith('"') and len(etag) == 34
+    assert etag != record_etag({"id": "acme-001", "stage": "offer"})
+
+    check_if_match(None, etag)
+    check_if_match(etag, etag)
+    check_if_match(f'"other", {etag}', etag)
+    check_if_match("*", etag)
+    with pytest.raises(HTTPException) as exc:
+        check_if_match(f"W/{etag}", etag)
+    assert exc.value.status_code == 412
+    assert exc.value.headers["ETag"] == etag
+
+
+def get_request(**headers):
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+def test_conditional_get():
+    etag, mtime = '"abc"', 1_700_000_000.5
+
+    response = Response()
+    assert conditional_get(get_request(), response, etag, mtime) is None
+    assert response.headers["etag"] == etag
+    assert response.headers["last-modified"] == http_date(mtime)
+
+    assert conditional_get(get_request(if_none_match=f'"x", W/{etag}'), Response(), etag, mtime).status_code == 304
+    assert conditional_get(get_request(if_modified_since=http_date(mtime)), Response(), etag, mtime).status_code == 304
+    assert conditional_get(get_request(if_modified_since=http_date(mtime - 10)), Response(), etag, mtime) is None
+    # If-None-Match wins over a matching If-Modified-Since
+    assert conditional_get(
+        get_request(if_none_match='"stale"', if_modified_since=http_date(mtime)), Response(), etag, mtime
+    ) is None
+    assert conditional_get(get_request(if_modified_since="garbage"), Response(), etag, mtime) is None
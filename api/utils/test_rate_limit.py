@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Unit tests for per-class rate limiting, RateLimit-* headers and the
+queue-and-wait admission mode
+"""
+
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+# Add api dir to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import rate_limit
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for the redis commands the limiter uses"""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def get(self, key):
+        value = self.values.get(key)
+        return str(value) if value is not None else None
+
+    def ttl(self, key):
+        if key not in self.values:
+            return -2
+        return self.ttls.get(key, -1)
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.calls.append((name, args))
+            return self
+        return queue
+
+    def execute(self):
+        return [getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = FakeRedis()
+    monkeypatch.setattr(rate_limit, "get_redis_client", lambda: client)
+    return client
+
+
+def test_disabled_without_redis(monkeypatch):
+    monkeypatch.setattr(rate_limit, "get_redis_client", lambda: None)
+    state = rate_limit.check_rate_limit("default", quota_class="generation")
+    assert state["enabled"] is False
+    assert rate_limit.rate_limit_headers(state) == {}
+
+
+def test_unknown_quota_class_rejected():
+    with pytest.raises(ValueError):
+        rate_limit.rate_limit("does-not-exist")
+
+
+def test_classes_have_independent_budgets(fake_redis):
+    generation = rate_limit.get_quota("generation")["limit"]
+    for _ in range(generation):
+        rate_limit.check_rate_limit("default", quota_class="generation")
+
+    with pytest.raises(HTTPException) as exc:
+        rate_limit.check_rate_limit("default", quota_class="generation")
+    assert exc.value.status_code == 429
+    assert "Retry-After" in exc.value.headers
+
+    # Chat budget is untouched by generation calls
+    state = rate_limit.check_rate_limit("default", quota_class="chat")
+    assert state["current_count"] == 1
+
+
+def test_dependency_sets_headers(fake_redis):
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(rate_limit.rate_limit("bulk"))])
+    def limited():
+        return {"ok": True}
+
+    client = TestClient(app)
+    limit = rate_limit.get_quota("bulk")["limit"]
+
+    response = client.get("/limited")
+    assert response.status_code == 200
+    assert response.headers["RateLimit-Limit"] == str(limit)
+    assert response.headers["RateLimit-Remaining"] == str(limit - 1)
+
+    for _ in range(limit):
+        response = client.get("/limited")
+    assert response.status_code == 429
+    assert response.headers["RateLimit-Remaining"] == "0"
+    assert int(response.headers["Retry-After"]) >= 1
+
+
+def test_status_reports_every_class(fake_redis):
+    rate_limit.check_rate_limit("default", quota_class="analysis")
+    status = rate_limit.get_rate_limit_status("default")
+
+    assert status["enabled"] is True
+    assert set(status["classes"]) == set(rate_limit.QUOTA_CLASSES)
+    assert status["classes"]["analysis"]["current_count"] == 1
+    assert status["classes"]["chat"]["current_count"] == 0
+
+
+class FakeAsyncRedis:
+    """In-memory async stand-in with real expiry (for admission queue tests)"""
+
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+
+    def _purge(self, key):
+        if key in self.expires and time.monotonic() >= self.expires[key]:
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+
+    async def incr(self, key):
+        self._purge(key)
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    async def decr(self, key):
+        self.values[key] = self.values.get(key, 0) - 1
+        return self.values[key]
+
+    async def pttl(self, key):
+        self._purge(key)
+        if key not in self.values:
+            return -2
+        if key not in self.expires:
+            return -1
+        return int((self.expires[key] - time.monotonic()) * 1000)
+
+    async def expire(self, key, seconds):
+        self.expires[key] = time.monotonic() + seconds
+        return True
+
+    def pipeline(self, transaction=True):
+        return FakeAsyncPipeline(self)
+
+
+class FakeAsyncPipeline(FakePipeline):
+    async def execute(self):
+        return [await getattr(self.client, name)(*args) for name, args in self.calls]
+
+
+@pytest.fixture
+def queue_env(monkeypatch):
+    client = FakeAsyncRedis()
+    monkeypatch.setattr(rate_limit, "get_async_redis_client", lambda: client)
+    monkeypatch.setitem(rate_limit.QUOTA_CLASSES, "tiny", {"limit": 1, "window": 1})
+    return rate_limit.AdmissionQueue(max_length=5)
+
+
+def test_queue_admits_in_fifo_order_after_window_reset(queue_env):
+    async def scenario():
+        first = await queue_env.admit("default", "tiny", max_wait=5)
+        second = asyncio.create_task(queue_env.admit("default", "tiny", max_wait=5))
+        await asyncio.sleep(0.05)
+        assert queue_env.waiting("tiny", "default") == 1
+        return first, await second
+
+    first, second = asyncio.run(scenario())
+    assert first["waited_seconds"] < 0.05
+    assert second["queue_position"] == 1
+    assert second["waited_seconds"] >= 0.5
+    assert second["current_count"] == 1
+
+
+def test_queue_times_out_cleanly(queue_env):
+    async def scenario():
+        await queue_env.admit("default", "tiny", max_wait=5)
+        with pytest.raises(HTTPException) as exc:
+            await queue_env.admit("default", "tiny", max_wait=0.1)
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 429
+    assert "Retry-After" in error.headers
+    assert error.detail["queue_position"] == 1
+    assert queue_env.waiting("tiny", "default") == 0
+
+
+def test_queue_mode_dependency(queue_env, monkeypatch):
+    monkeypatch.setattr(rate_limit, "admission_queue", queue_env)
+    dependency = rate_limit.rate_limit("tiny", mode="queue", max_wait=2)
+    assert isinstance(dependency, rate_limit.QueuedRateLimitQuota)
+
+    with pytest.raises(ValueError):
+        rate_limit.rate_limit("tiny", mode="sometimes")
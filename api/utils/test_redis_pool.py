@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the shared Redis pool manager's async pool lifecycle
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add api dir to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("redis")
+
+from utils.redis_pool import RedisPoolManager
+
+UNREACHABLE = "redis://127.0.0.1:1/0"
+
+
+def track_disconnects(pool, disconnected):
+    async def disconnect():
+        disconnected.append(pool)
+    pool.disconnect = disconnect
+
+
+def test_aclose_disconnects_and_resets_async_pool():
+    manager = RedisPoolManager(UNREACHABLE)
+    disconnected = []
+
+    async def scenario():
+        client = manager.get_async_client()
+        pool = manager._async_pool
+        track_disconnects(pool, disconnected)
+        await manager.aclose()
+        return client, pool, manager.get_async_client()
+
+    client, pool, fresh = asyncio.run(scenario())
+    assert disconnected == [pool]
+    assert fresh is not client and manager._async_pool is not pool
+
+
+def test_reconnect_replaces_async_pool(monkeypatch):
+    manager = RedisPoolManager(UNREACHABLE, retry_interval=0)
+    disconnected = []
+    probe = SimpleNamespace(ping=lambda: True, close=lambda: None)
+    monkeypatch.setattr(manager, "_redis", SimpleNamespace(Redis=SimpleNamespace(from_url=lambda *args, **kwargs: probe)))
+
+    async def scenario():
+        client = manager.get_async_client()
+        pool = manager._async_pool
+        track_disconnects(pool, disconnected)
+
+        manager._state = "down"
+        manager._reconnect_loop()  # on the loop's thread here; runs in a daemon thread in the API
+        assert manager.state == "up" and manager._async_pool is None
+
+        fresh = manager.get_async_client()  # schedules the old pool's disconnect
+        await asyncio.sleep(0)
+        return client, pool, fresh
+
+    client, pool, fresh = asyncio.run(scenario())
+    assert disconnected == [pool]
+    assert fresh is not client
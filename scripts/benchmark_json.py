@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+JSON Benchmark - FastAPI default path vs orjson fast path
+
+Before: jsonable_encoder + stdlib json (FastAPI's default response path)
+        and json.loads + Model.model_validate (declared body parameter)
+After:  orjson via utils.fast_json.dumps (json_response / FastJSONResponse)
+        and Model.model_validate_json on the raw bytes (json_body)
+
+Responses are measured for the curriculum, opportunities and conversation
+documents, plus synthetic 10x / 100x inflated versions. Request parsing is
+measured for the PUT /api/curriculum body. Both paths must produce the
+same JSON.
+
+Usage:
+    python scripts/benchmark_json.py
+    python scripts/benchmark_json.py --repeat 10 --factors 1 10 100
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(PROJECT_ROOT / "api"))
+from benchmark_yaml import best_of, inflate
+
+from fastapi.encoders import jsonable_encoder
+from utils.fast_json import ORJSON_AVAILABLE, dumps
+
+
+def conversation_path() -> Path:
+    """Largest saved conversation"""
+    conversations = sorted((PROJECT_ROOT / "logs" / "conversations").glob("*.yaml"), key=lambda p: p.stat().st_size)
+    return conversations[-1] if conversations else None
+
+
+def stdlib_render(document) -> bytes:
+    """What FastAPI does for a plain dict return value (JSONResponse.render)"""
+    return json.dumps(
+        jsonable_encoder(document), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def run(repeat: int, factors) -> int:
+    if not ORJSON_AVAILABLE:
+        print("orjson not installed - the fast path falls back to stdlib json (pip install orjson).")
+        return 1
+
+    documents = [
+        PROJECT_ROOT / "curriculum" / "curriculum.yaml",
+        PROJECT_ROOT / "opportunities" / "structure.yaml",
+        conversation_path(),
+    ]
+
+    print("Responses (serialize document to JSON bytes)")
+    print(f"{'document':<44} {'size':>9} {'before':>10} {'after':>10} {'x':>6}  same")
+    print("-" * 90)
+
+    all_identical = True
+    for path in [p for p in documents if p is not None]:
+        base = yaml.load(path.read_text(encoding='utf-8'), Loader=yaml.CSafeLoader)
+
+        for factor in factors:
+            document = inflate(base, factor) if factor > 1 else base
+            before = best_of(repeat, lambda: stdlib_render(document))
+            after = best_of(repeat, lambda: dumps(document))
+
+            raw = stdlib_render(document)
+            identical = json.loads(raw) == json.loads(dumps(document))
+            all_identical = all_identical and identical
+
+            label = f"{path.name} x{factor}"
+            print(
+                f"{label:<44} {len(raw) / 1024:>7.0f}KB "
+                f"{before:>8.2f}ms {after:>8.2f}ms {before / after:>5.1f}x  {'yes' if identical else 'NO'}"
+            )
+
+    # Request parsing - the Curriculum model lives in the API module
+    from main import Curriculum
+
+    print()
+    print("Requests (PUT /api/curriculum body -> Curriculum)")
+    print(f"{'body':<44} {'size':>9} {'before':>10} {'after':>10} {'x':>6}  same")
+    print("-" * 90)
+
+    base = yaml.load(documents[0].read_text(encoding='utf-8'), Loader=yaml.CSafeLoader)
+    for factor in factors:
+        body = stdlib_render(inflate(base, factor) if factor > 1 else base)
+        before = best_of(repeat, lambda: Curriculum.model_validate(json.loads(body)))
+        after = best_of(repeat, lambda: Curriculum.model_validate_json(body))
+
+        identical = Curriculum.model_validate(json.loads(body)) == Curriculum.model_validate_json(body)
+        all_identical = all_identical and identical
+
+        label = f"curriculum.json x{factor}"
+        print(
+            f"{label:<44} {len(body) / 1024:>7.0f}KB "
+            f"{before:>8.2f}ms {after:>8.2f}ms {before / after:>5.1f}x  {'yes' if identical else 'NO'}"
+        )
+
+    print()
+    print("Output identical across paths" if all_identical else "WARNING: paths differ")
+    return 0 if all_identical else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FastAPI's default JSON path vs orjson")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best time is reported)")
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 10, 100], help="Inflation factors")
+    args = parser.parse_args()
+    sys.exit(run(args.repeat, args.factors))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+YAML Benchmark - pure-Python PyYAML vs libyaml C bindings
+
+Measures load and dump times for the real data files and for synthetic
+10x / 100x inflated versions (every top-level list replicated), and checks
+that both implementations produce identical documents and identical output.
+
+Usage:
+    python scripts/benchmark_yaml.py
+    python scripts/benchmark_yaml.py --repeat 10 --factors 1 10 100
+"""
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(Path(__file__).parent))
+from yaml_io import DUMP_OPTIONS, LIBYAML_AVAILABLE
+
+DOCUMENTS = [
+    PROJECT_ROOT / "curriculum" / "curriculum.yaml",
+    PROJECT_ROOT / "opportunities" / "structure.yaml",
+]
+
+
+def inflate(document: Dict[str, Any], factor: int) -> Dict[str, Any]:
+    """Replicate every top-level list `factor` times"""
+    inflated = copy.deepcopy(document)
+    for key, value in inflated.items():
+        if isinstance(value, list) and value:
+            inflated[key] = [copy.deepcopy(item) for _ in range(factor) for item in value]
+    return inflated
+
+
+def best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    """Best wall time in milliseconds over `repeat` runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run(repeat: int, factors: List[int]) -> int:
+    if not LIBYAML_AVAILABLE:
+        print("libyaml bindings not available - only the pure-Python path can be measured.")
+        print("Install PyYAML with libyaml (e.g., apt-get install libyaml-dev && pip install --force-reinstall pyyaml).")
+        return 1
+
+    print(f"{'document':<34} {'size':>9} {'load py':>10} {'load C':>10} {'x':>6} {'dump py':>10} {'dump C':>10} {'x':>6}  same")
+    print("-" * 110)
+
+    all_identical = True
+    for path in DOCUMENTS:
+        base = yaml.load(path.read_text(encoding='utf-8'), Loader=yaml.CSafeLoader)
+
+        for factor in factors:
+            document = inflate(base, factor) if factor > 1 else base
+            text = yaml.dump(document, Dumper=yaml.CSafeDumper, **DUMP_OPTIONS)
+
+            load_py = best_of(repeat, lambda: yaml.load(text, Loader=yaml.SafeLoader))
+            load_c = best_of(repeat, lambda: yaml.load(text, Loader=yaml.CSafeLoader))
+            dump_py = best_of(repeat, lambda: yaml.dump(document, Dumper=yaml.SafeDumper, **DUMP_OPTIONS))
+            dump_c = best_of(repeat, lambda: yaml.dump(document, Dumper=yaml.CSafeDumper, **DUMP_OPTIONS))
+
+            identical = (
+                yaml.load(text, Loader=yaml.SafeLoader) == yaml.load(text, Loader=yaml.CSafeLoader)
+                and yaml.dump(document, Dumper=yaml.SafeDumper, **DUMP_OPTIONS) == text
+            )
+            all_identical = all_identical and identical
+
+            label = f"{path.parent.name}/{path.name} x{factor}"
+            print(
+                f"{label:<34} {len(text) / 1024:>7.0f}KB "
+                f"{load_py:>8.1f}ms {load_c:>8.1f}ms {load_py / load_c:>5.1f}x "
+                f"{dump_py:>8.1f}ms {dump_c:>8.1f}ms {dump_py / dump_c:>5.1f}x  {'yes' if identical else 'NO'}"
+            )
+
+    print()
+    print("Output identical across implementations" if all_identical else "WARNING: implementations differ")
+    return 0 if all_identical else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PyYAML pure-Python vs libyaml")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best time is reported)")
+    parser.add_argument("--factors", type=int, nargs="+", default=[1, 10, 100], help="Inflation factors")
+    args = parser.parse_args()
+    sys.exit(run(args.repeat, args.factors))
+
+
+if __name__ == "__main__":
+    main()
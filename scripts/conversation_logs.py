@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Conversation Logs - maintenance for the append-only conversation storage
+
+The API converts a YAML conversation on its first write and compacts a log
+when it stops matching its sidecar; this tool converts every remaining
+conv_*.yaml file at once, compacts all logs, flattens duplicated chats,
+moves chats archived before cold storage existed into the archive bundles,
+and reports storage state.
+
+Usage:
+    python scripts/conversation_logs.py migrate              # conv_*.yaml -> .jsonl + .json
+    python scripts/conversation_logs.py migrate --dry-run
+    python scripts/conversation_logs.py migrate --keep-yaml  # leave the YAML files in place
+    python scripts/conversation_logs.py compact              # only logs that need it
+    python scripts/conversation_logs.py compact --all
+    python scripts/conversation_logs.py flatten              # give duplicated chats their own copy
+    python scripts/conversation_logs.py archive              # move chats flagged archived to cold storage
+    python scripts/conversation_logs.py repack               # reclaim space of restored/deleted archived chats
+    python scripts/conversation_logs.py stats
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(PROJECT_ROOT / "api"))
+from services.conversation_archive import ConversationArchive
+from services.conversation_index import ConversationIndex
+from services.conversation_search import SEARCH_DB_NAME, ConversationSearch
+from services.conversation_store import ConversationStore, read_listing_document
+from services.directory_index import DirectoryIndex
+
+DEFAULT_DIR = PROJECT_ROOT / "logs" / "conversations"
+DEFAULT_ARCHIVE_DIR = PROJECT_ROOT / "logs" / "conversations_archive"
+
+
+def open_store(directory: Path, archive_directory: Path) -> ConversationStore:
+    """Store that keeps the API's conversation manifest and search index up to date"""
+    files = DirectoryIndex(directory, ("*.json", "*.yaml"))
+    return ConversationStore(
+        directory,
+        ConversationIndex(files, read_listing_document),
+        ConversationSearch(directory / SEARCH_DB_NAME) if directory.is_dir() else None,
+        ConversationArchive(archive_directory)
+    )
+
+
+def migrate(store: ConversationStore, dry_run: bool, keep_yaml: bool) -> int:
+    ids = store.legacy_ids()
+    failed = 0
+    for conversation_id in ids:
+        if dry_run:
+            print(f"would migrate {conversation_id}")
+            continue
+        try:
+            sidecar = store.migrate(conversation_id, keep_legacy=keep_yaml)
+            print(f"migrated {conversation_id} ({sidecar['message_count']} messages)")
+        except Exception as e:
+            failed += 1
+            print(f"FAILED {conversation_id}: {e}")
+    print(f"{len(ids) - failed} of {len(ids)} conversations {'to migrate' if dry_run else 'migrated'}")
+    return 1 if failed else 0
+
+
+def compact(store: ConversationStore, compact_all: bool) -> int:
+    compacted = 0
+    for conversation_id in store.ids():
+        if compact_all or store.needs_compaction(conversation_id):
+            sidecar = store.compact(conversation_id)
+            compacted += 1
+            print(f"compacted {conversation_id} ({sidecar['message_count']} messages, {sidecar['log_bytes']} bytes)")
+    print(f"{compacted} logs compacted")
+    return 0
+
+
+def flatten(store: ConversationStore) -> int:
+    flattened = 0
+    for conversation_id in store.ids():
+        if store.load_own(conversation_id)["start"] > 0:
+            sidecar = store.flatten(conversation_id)
+            flattened += 1
+            print(f"flattened {conversation_id} ({sidecar['message_count']} messages)")
+    print(f"{flattened} forks flattened")
+    return 0
+
+
+def archive(store: ConversationStore, dry_run: bool) -> int:
+    ids = [
+        conversation_id for conversation_id in store.ids() + store.legacy_ids()
+        if store.session(conversation_id).get("archived")
+    ]
+    for conversation_id in ids:
+        if dry_run:
+            print(f"would archive {conversation_id}")
+            continue
+        entry = store.archive(conversation_id)
+        print(f"archived {conversation_id} ({entry['log_bytes']} -> {entry['length']} bytes)")
+    print(f"{len(ids)} conversations {'to archive' if dry_run else 'archived'}")
+    return 0
+
+
+def repack(store: ConversationStore) -> int:
+    print(f"{store.cold.repack()} bytes reclaimed")
+    return 0
+
+
+def stats(store: ConversationStore) -> int:
+    ids = store.ids()
+    print(json.dumps({
+        "directory": str(store.directory),
+        "conversations": len(ids),
+        "legacy_yaml": len(store.legacy_ids()),
+        "needing_compaction": sum(1 for conversation_id in ids if store.needs_compaction(conversation_id)),
+        "forks": sum(1 for conversation_id in ids if store.load_own(conversation_id)["start"] > 0),
+        "log_bytes": sum(store.log_path(conversation_id).stat().st_size for conversation_id in ids if store.log_path(conversation_id).exists()),
+        "archive": store.cold.stats(),
+    }, indent=2))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate, compact and inspect conversation logs")
+    parser.add_argument("command", choices=["migrate", "compact", "flatten", "archive", "repack", "stats"])
+    parser.add_argument("--dir", type=Path, default=DEFAULT_DIR, help="Conversations directory")
+    parser.add_argument("--archive-dir", type=Path, default=DEFAULT_ARCHIVE_DIR, help="Archived conversations directory")
+    parser.add_argument("--dry-run", action="store_true", help="migrate/archive: list conversations without moving them")
+    parser.add_argument("--keep-yaml", action="store_true", help="migrate: keep the YAML files")
+    parser.add_argument("--all", action="store_true", help="compact: rewrite every log, not only inconsistent ones")
+    args = parser.parse_args()
+
+    store = open_store(args.dir, args.archive_dir)
+    if args.command == "migrate":
+        sys.exit(migrate(store, args.dry_run, args.keep_yaml))
+    elif args.command == "compact":
+        sys.exit(compact(store, args.all))
+    elif args.command == "flatten":
+        sys.exit(flatten(store))
+    elif args.command == "archive":
+        sys.exit(archive(store, args.dry_run))
+    elif args.command == "repack":
+        sys.exit(repack(store))
+    sys.exit(stats(store))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,7 +17,10 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
 
-import yaml
+try:
+    from scripts.yaml_io import load_file as load_yaml_file, safe_dump
+except ImportError:
+    from yaml_io import load_file as load_yaml_file, safe_dump
 
 try:
     from anthropic import Anthropic
@@ -63,8 +66,7 @@ def load_curriculum(path: Path = CURRICULUM_PATH) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"Curriculum file not found: {path}")
 
-    with open(path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+    return load_yaml_file(path)
 
 
 def generate_html_with_claude(cv_data: Dict[str, Any]) -> str:
@@ -78,8 +80,7 @@ def generate_html_with_claude(cv_data: Dict[str, Any]) -> str:
         Complete HTML document as string
     """
     # Convert YAML data to formatted string for prompt
-    import yaml
-    yaml_string = yaml.dump(cv_data, default_flow_style=False, allow_unicode=True)
+    yaml_string = safe_dump(cv_data, sort_keys=True)
 
     prompt = f"""Generate a professional, modern CV in HTML based on this YAML data:
 
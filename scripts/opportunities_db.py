@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Opportunities DB - YAML <-> SQLite sync for the opportunity CRM
+
+The API keeps the database in sync automatically when it runs with
+OPPORTUNITIES_BACKEND=sqlite; this tool is for one-off imports, exporting
+after editing the database by hand, and inspecting it.
+
+Usage:
+    python scripts/opportunities_db.py import          # YAML -> SQLite
+    python scripts/opportunities_db.py export          # SQLite -> YAML
+    python scripts/opportunities_db.py stats
+    python scripts/opportunities_db.py import --yaml path/to/structure.yaml --db path/to/structure.db
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(PROJECT_ROOT / "api"))
+from services.opportunity_store import SqliteOpportunityStore
+
+DEFAULT_YAML = PROJECT_ROOT / "opportunities" / "structure.yaml"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync opportunities between YAML and SQLite")
+    parser.add_argument("command", choices=["import", "export", "stats"])
+    parser.add_argument("--yaml", type=Path, default=DEFAULT_YAML, help="Opportunities YAML file")
+    parser.add_argument("--db", type=Path, default=os.getenv("OPPORTUNITIES_DB_PATH"), help="SQLite database (default: next to the YAML file)")
+    args = parser.parse_args()
+
+    store = SqliteOpportunityStore(args.yaml, args.db)
+
+    if args.command == "import":
+        count = store.import_yaml()
+        print(f"Imported {count} opportunities from {args.yaml} into {store.db_path}")
+    elif args.command == "export":
+        count = store.export_yaml()
+        print(f"Exported {count} opportunities from {store.db_path} to {args.yaml}")
+    else:
+        print(json.dumps(store.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,16 @@ Architecture:
 - Support for multiple templates (classic, compact, modern)
 """
 
-import yaml
 import html
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+try:
+    from scripts.yaml_io import load_file as load_yaml_file
+except ImportError:
+    from yaml_io import load_file as load_yaml_file
+
 
 class TemplateEngine:
     """
@@ -138,8 +142,7 @@ class TemplateEngine:
                 f"Templates config not found: {self.templates_config_path}"
             )
 
-        with open(self.templates_config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+        return load_yaml_file(self.templates_config_path)
 
     def get_template_config(self, template_id: str) -> Dict[str, Any]:
         """
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the binary snapshot cache of parsed YAML files
+"""
+
+import datetime
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add scripts dir to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import yaml_snapshot
+from yaml_snapshot import snapshot_path, signature_of
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "structure.yaml"
+    path.write_text("meta:\n  updated: 2025-01-15\nitems:\n- id: 1\n  name: first\n", encoding="utf-8")
+    return path
+
+
+def test_first_load_parses_and_writes_snapshot(source):
+    document = yaml_snapshot.load(source)
+
+    assert document == {"meta": {"updated": datetime.date(2025, 1, 15)}, "items": [{"id": 1, "name": "first"}]}
+    assert snapshot_path(source).exists()
+    assert snapshot_path(source).name == ".structure.yaml.snapshot"
+
+
+def test_fresh_snapshot_is_used_without_parsing(source, monkeypatch):
+    expected, digest = yaml_snapshot.load_with_digest(source)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("YAML was parsed")
+
+    monkeypatch.setattr(yaml_snapshot.yaml_io, "safe_load", fail)
+    assert yaml_snapshot.load_with_digest(source) == (expected, digest)
+
+
+def test_edited_source_rebuilds_snapshot(source):
+    yaml_snapshot.load(source)
+    source.write_text("items: []\n", encoding="utf-8")
+
+    assert yaml_snapshot.load(source) == {"items": []}
+    assert yaml_snapshot.read(source, signature_of(os.stat(source)))[0] == {"items": []}
+
+
+def test_touched_source_reuses_snapshot_by_hash(source, monkeypatch):
+    expected = yaml_snapshot.load(source)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    monkeypatch.setattr(yaml_snapshot.yaml_io, "safe_load", lambda *a, **k: pytest.fail("YAML was parsed"))
+
+    assert yaml_snapshot.load(source) == expected
+    # Header refreshed: the next load matches on the signature alone
+    assert yaml_snapshot.read(source, signature_of(os.stat(source))) is not None
+
+
+def test_corrupt_or_foreign_snapshots_are_ignored(source):
+    snapshot_path(source).write_bytes(b"garbage")
+    assert yaml_snapshot.load(source)["items"][0]["name"] == "first"
+
+    class Payload:
+        def __reduce__(self):
+            return (os.system, ("echo unsafe",))
+
+    header = {"format": yaml_snapshot.SNAPSHOT_FORMAT, "signature": signature_of(os.stat(source)), "digest": "x"}
+    snapshot_path(source).write_bytes(yaml_snapshot.MAGIC + pickle.dumps(header) + pickle.dumps(Payload()))
+    assert yaml_snapshot.read(source, signature_of(os.stat(source))) is None
+    assert yaml_snapshot.load(source)["items"][0]["name"] == "first"
+
+
+def test_dump_writes_source_and_snapshot(tmp_path, monkeypatch):
+    path = tmp_path / "conv_1.yaml"
+    path.write_text("old: true\n", encoding="utf-8")
+    inode = path.stat().st_ino
+    yaml_snapshot.dump(path, {"session": {"id": "conv_1"}, "messages": []})
+    # Replaced by rename, not rewritten in place; no temp files left behind
+    assert path.stat().st_ino != inode
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(["conv_1.yaml", snapshot_path(path).name])
+    monkeypatch.setattr(yaml_snapshot.yaml_io, "safe_load", lambda *a, **k: pytest.fail("YAML was parsed"))
+
+    assert yaml_snapshot.load(path) == {"session": {"id": "conv_1"}, "messages": []}
+
+    path.unlink()
+    yaml_snapshot.remove(path)
+    assert not snapshot_path(path).exists()
+
+
+def test_disabled_snapshots_always_parse(source, monkeypatch):
+    monkeypatch.setattr(yaml_snapshot, "ENABLED", False)
+    assert yaml_snapshot.load(source)["items"][0]["id"] == 1
+    assert not snapshot_path(source).exists()
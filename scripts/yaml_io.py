@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+YAML I/O - single entry point for reading and writing SerenityOps YAML files
+
+Uses the libyaml C bindings (CSafeLoader / CSafeDumper) when PyYAML was built
+with them, which parse 5-10x faster than the pure-Python implementation.
+Falls back to SafeLoader / SafeDumper otherwise.
+
+Output formatting is identical in both modes: block style, unicode kept as-is,
+insertion key order preserved.
+
+Set YAML_PURE_PYTHON=1 to force the pure-Python implementation (debugging,
+benchmarks).
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Optional, TextIO, Union
+
+import yaml
+
+LIBYAML_AVAILABLE = bool(getattr(yaml, "__with_libyaml__", False))
+FORCE_PURE_PYTHON = os.getenv("YAML_PURE_PYTHON", "").lower() in ("1", "true", "yes")
+
+if LIBYAML_AVAILABLE and not FORCE_PURE_PYTHON:
+    Loader = yaml.CSafeLoader
+    Dumper = yaml.CSafeDumper
+else:
+    Loader = yaml.SafeLoader
+    Dumper = yaml.SafeDumper
+
+# Formatting used for every YAML file written by SerenityOps
+DUMP_OPTIONS = {
+    "default_flow_style": False,
+    "allow_unicode": True,
+    "sort_keys": False,
+}
+
+# Re-exported so callers don't need to import yaml for error handling
+YAMLError = yaml.YAMLError
+
+
+def backend() -> str:
+    """Name of the active implementation ("libyaml" or "python")"""
+    return "libyaml" if Loader is not yaml.SafeLoader else "python"
+
+
+def safe_load(stream: Union[str, bytes, TextIO]) -> Any:
+    """
+    Parse YAML from a string, bytes or file object (safe subset only).
+
+    Returns:
+        Parsed document (None for an empty document)
+    """
+    return yaml.load(stream, Loader=Loader)
+
+
+def safe_dump(data: Any, stream: Optional[TextIO] = None, **options) -> Optional[str]:
+    """
+    Serialize data to YAML with the standard SerenityOps formatting.
+
+    Args:
+        data: Document to serialize
+        stream: Optional file object; if omitted the YAML text is returned
+        **options: Overrides for DUMP_OPTIONS
+
+    Returns:
+        YAML text if stream is None, otherwise None
+    """
+    return yaml.dump(data, stream, Dumper=Dumper, **{**DUMP_OPTIONS, **options})
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """Load a YAML file (UTF-8)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return safe_load(f)
+
+
+def dump_file(path: Union[str, Path], data: Any) -> None:
+    """Write a YAML file (UTF-8) with the standard formatting"""
+    with open(path, 'w', encoding='utf-8') as f:
+        safe_dump(data, f)
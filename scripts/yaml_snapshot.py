@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+YAML Snapshots - binary cache of parsed YAML documents for fast cold loads
+
+Every parsed document is pickled next to its source as a hidden sibling
+(curriculum.yaml -> .curriculum.yaml.snapshot), so a restarted API or a new
+worker unpickles it instead of parsing the YAML again.
+
+A snapshot records the format version, the source's signature (mtime_ns,
+size, inode) and the sha256 of the source bytes:
+
+- Signature matches: used without reading the source at all
+- Signature differs but the content hash matches (touch, git checkout,
+  copy): used, and its header is refreshed
+- Anything else (edited file, other format version, unreadable snapshot):
+  the YAML is parsed and the snapshot rebuilt
+
+Only plain YAML types are stored (dict, list, str, numbers, dates), and
+loading refuses anything else, so a tampered snapshot can't run code.
+
+Set YAML_SNAPSHOTS=0 to disable (always parse, never write snapshots).
+"""
+
+import datetime
+import hashlib
+import io
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+try:
+    from scripts import yaml_io
+except ImportError:
+    import yaml_io
+
+# Bump when the snapshot layout changes; older snapshots are rebuilt
+SNAPSHOT_FORMAT = 1
+MAGIC = b"SERENITY-SNAPSHOT"
+
+ENABLED = os.getenv("YAML_SNAPSHOTS", "1").lower() not in ("0", "false", "no")
+
+Signature = Tuple[int, int, int]
+
+# The only classes safe_load produces besides builtins (dict and list also
+# appear when frozen document snapshots are pickled)
+_ALLOWED_CLASSES = {
+    ("datetime", "date"): datetime.date,
+    ("datetime", "datetime"): datetime.datetime,
+    ("datetime", "timedelta"): datetime.timedelta,
+    ("datetime", "timezone"): datetime.timezone,
+    ("builtins", "dict"): dict,
+    ("builtins", "list"): list,
+}
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        try:
+            return _ALLOWED_CLASSES[(module, name)]
+        except KeyError:
+            raise pickle.UnpicklingError(f"Unexpected class in snapshot: {module}.{name}") from None
+
+
+def snapshot_path(path: Union[str, Path]) -> Path:
+    """curriculum.yaml -> .curriculum.yaml.snapshot"""
+    path = Path(path)
+    return path.with_name(f".{path.name}.snapshot")
+
+
+def signature_of(stat: os.stat_result) -> Signature:
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def _read(path: Path) -> Optional[Tuple[dict, io.BufferedReader]]:
+    """Open a snapshot and read its header (the caller closes the handle)"""
+    try:
+        handle = open(snapshot_path(path), 'rb')
+    except OSError:
+        return None
+    try:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise pickle.UnpicklingError("Not a snapshot")
+        header = _SnapshotUnpickler(handle).load()
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise pickle.UnpicklingError("Other snapshot format")
+        return header, handle
+    except Exception:
+        handle.close()
+        return None
+
+
+def _body(handle: io.BufferedReader) -> Tuple[bool, Any]:
+    try:
+        return True, _SnapshotUnpickler(handle).load()
+    except Exception:
+        return False, None
+    finally:
+        handle.close()
+
+
+def read(path: Union[str, Path], signature: Signature) -> Optional[Tuple[Any, str]]:
+    """
+    Snapshot of `path` if the source's signature is unchanged.
+
+    The source file isn't opened.
+
+    Returns:
+        (document, sha256 of the source) or None (no fresh snapshot)
+    """
+    if not ENABLED:
+        return None
+    opened = _read(Path(path))
+    if opened is None:
+        return None
+    header, handle = opened
+    if tuple(header.get("signature", ())) != tuple(signature):
+        handle.close()
+        return None
+    ok, document = _body(handle)
+    return (document, header["digest"]) if ok else None
+
+
+def write(path: Union[str, Path], document: Any, digest: str, signature: Signature) -> bool:
+    """
+    Store the parsed document for `path` (atomic, best effort).
+
+    Args:
+        path: Source YAML file
+        document: Plain parsed data (not frozen)
+        digest: sha256 of the source bytes
+        signature: Source (mtime_ns, size, inode) after it was written
+
+    Returns:
+        False if snapshots are disabled or the snapshot couldn't be written
+        (read-only directory, unpicklable data)
+    """
+    if not ENABLED:
+        return False
+    target = snapshot_path(path)
+    header = {"format": SNAPSHOT_FORMAT, "signature": tuple(signature), "digest": digest}
+    try:
+        body = pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL) + \
+            pickle.dumps(document, protocol=pickle.HIGHEST_PROTOCOL)
+        fd, tmp_name = tempfile.mkstemp(dir=str(target.parent), prefix=f"{target.name}.", suffix=".tmp")
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        return False
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + body)
+        os.replace(tmp_name, target)
+        return True
+    except OSError:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        return False
+
+
+def parse(path: Union[str, Path], raw: bytes, digest: str, signature: Signature) -> Any:
+    """
+    Parsed document for source bytes already read from `path`.
+
+    Uses the snapshot when its content hash matches (refreshing its
+    signature), otherwise parses the YAML and rebuilds the snapshot.
+
+    Raises:
+        yaml_io.YAMLError: If the YAML can't be parsed
+    """
+    if ENABLED:
+        opened = _read(Path(path))
+        if opened is not None:
+            header, handle = opened
+            if header.get("digest") == digest:
+                ok, document = _body(handle)
+                if ok:
+                    if tuple(header.get("signature", ())) != tuple(signature):
+                        write(path, document, digest, signature)
+                    return document
+            else:
+                handle.close()
+
+    document = yaml_io.safe_load(raw.decode('utf-8'))
+    write(path, document, digest, signature)
+    return document
+
+
+def load_with_digest(path: Union[str, Path]) -> Tuple[Any, str]:
+    """
+    Load a YAML file through its snapshot.
+
+    Returns:
+        (document, sha256 of the source bytes)
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        yaml_io.YAMLError: If the YAML can't be parsed
+    """
+    signature = signature_of(os.stat(path))
+    cached = read(path, signature)
+    if cached is not None:
+        return cached
+    with open(path, 'rb') as f:
+        # Signature of the bytes actually read (the file may have been replaced meanwhile)
+        signature = signature_of(os.fstat(f.fileno()))
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    return parse(path, raw, digest, signature), digest
+
+
+def load(path: Union[str, Path]) -> Any:
+    """Drop-in for yaml_io.load_file() backed by the snapshot cache"""
+    return load_with_digest(path)[0]
+
+
+def dump(path: Union[str, Path], data: Any) -> None:
+    """
+    Write a YAML file (like yaml_io.dump_file()) and its snapshot.
+
+    The source is replaced atomically (temp file, fsync, rename), so a
+    crash leaves the old or the new document, never a truncated one. The
+    next load - in this process or another - is served from the snapshot.
+    """
+    path = Path(path)
+    raw = yaml_io.safe_dump(data).encode('utf-8')
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+            # The renamed file keeps this inode
+            signature = signature_of(os.fstat(f.fileno()))
+        try:
+            os.chmod(tmp_name, os.stat(path).st_mode & 0o777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    write(path, data, hashlib.sha256(raw).hexdigest(), signature)
+
+
+def remove(path: Union[str, Path]) -> None:
+    """Delete the snapshot of a removed source file"""
+    try:
+        snapshot_path(path).unlink()
+    except FileNotFoundError:
+        pass